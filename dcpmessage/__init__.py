@@ -1,5 +1,31 @@
 import logging
 
-from .dcp_message import DcpMessage
-
 logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+# Public names are imported on first access so that ``import dcpmessage`` stays
+# cheap (e.g. on serverless cold starts) and only the code paths used get loaded.
+_LAZY_ATTRIBUTES = {
+    "DcpMessage": ".dcp_message",
+    "RetrievalResult": ".dcp_message",
+    "SearchCriteria": ".search_criteria",
+    "LddsClient": ".ldds_client",
+    "ProtocolError": ".exceptions",
+    "DeadlineExceeded": ".exceptions",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,220 @@
+import logging
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Union
+
+from .dcp_message import DcpMessage
+from .ldds_message import LddsMessage
+
+if TYPE_CHECKING:
+    from .filters import MessageFilter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BlockArchiveConstants:
+    """
+    Constants of the block archive format.
+
+    An archive is a directory of segment files. Each segment starts with
+    ``SEGMENT_MAGIC`` followed by records of ``length (uint32) | block data``.
+
+    :param SEGMENT_MAGIC: Bytes at the start of every segment file.
+    :param RECORD_HEADER: Struct of the length preceding every block.
+    :param SEGMENT_SUFFIX: File suffix of segment files.
+    :param SEGMENT_SIZE: Default size in bytes after which a new segment is started.
+    """
+
+    SEGMENT_MAGIC: bytes = b"DCPBLK1\n"
+    RECORD_HEADER: struct.Struct = struct.Struct(">I")
+    SEGMENT_SUFFIX: str = ".dcpblk"
+    SEGMENT_SIZE: int = 256 * 1024 * 1024
+
+
+class BlockArchiveWriter:
+    """
+    Append raw DCP blocks to the segment files of an archive directory.
+
+    Writing resumes in the newest segment of an existing archive. A record torn by
+    a crash at the end of that segment is truncated first.
+
+    :param directory: The archive directory (created if missing).
+    :param segment_size: Size in bytes after which a new segment is started.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        segment_size: int = BlockArchiveConstants.SEGMENT_SIZE,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_size = segment_size
+        segments = BlockArchiveReader(self.directory).segments()
+        self.segment_index = int(segments[-1].stem) if segments else 0
+        self.file = None
+        self.__open_segment()
+
+    def __segment_path(self) -> Path:
+        suffix = BlockArchiveConstants.SEGMENT_SUFFIX
+        return self.directory / f"{self.segment_index:08d}{suffix}"
+
+    def __open_segment(self):
+        path = self.__segment_path()
+        if path.exists():
+            size = os.path.getsize(path)
+            magic = BlockArchiveConstants.SEGMENT_MAGIC
+            complete = _complete_length(path) if size >= len(magic) else 0
+            if complete < size:
+                logger.warning(
+                    f"Truncating torn record at {path}:{complete} ({size - complete} bytes)"
+                )
+                os.truncate(path, complete)
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(BlockArchiveConstants.SEGMENT_MAGIC)
+
+    def append(self, block: Union[LddsMessage, bytes, bytearray, memoryview]):
+        """
+        Append a DCP block to the archive.
+
+        :param block: An LddsMessage DCP block, or the block data itself.
+        :return: None
+        """
+        if isinstance(block, LddsMessage):
+            block = block.message_data[: block.message_length]
+        if self.file.tell() >= self.segment_size:
+            self.file.close()
+            self.segment_index += 1
+            self.__open_segment()
+        self.file.write(BlockArchiveConstants.RECORD_HEADER.pack(len(block)))
+        self.file.write(block)
+
+    def flush(self):
+        """
+        Flush buffered blocks to the current segment.
+
+        :return: None
+        """
+        self.file.flush()
+
+    def close(self):
+        """
+        Close the current segment.
+
+        :return: None
+        """
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class BlockArchiveReader:
+    """
+    Read a block archive through memory-mapped segments.
+
+    Blocks and messages are yielded as memoryview slices of the mapping, so
+    reading an archive needs no more memory than the pages currently in use.
+    A slice stays valid as long as it is referenced; copy it (``bytes(view)``)
+    to keep the data beyond that.
+
+    :param directory: The archive directory.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+
+    def segments(self) -> list[Path]:
+        """
+        List the segment files of the archive in write order.
+
+        :return: Sorted list of segment paths.
+        """
+        suffix = BlockArchiveConstants.SEGMENT_SUFFIX
+        return sorted(self.directory.glob(f"*{suffix}"))
+
+    @staticmethod
+    def block_offsets(segment: memoryview) -> Iterator[tuple[int, int]]:
+        """
+        Iterate over the (start, end) byte offsets of the blocks in a segment.
+
+        :param segment: The contents of a segment file.
+        :return: Iterator of (start, end) offsets of block data.
+        :raises ValueError: If the segment does not start with the segment magic.
+        """
+        magic = BlockArchiveConstants.SEGMENT_MAGIC
+        if bytes(segment[: len(magic)]) != magic:
+            raise ValueError("Not a dcpmessage block archive segment")
+
+        record_header = BlockArchiveConstants.RECORD_HEADER
+        offset, end_of_segment = len(magic), len(segment)
+        while offset + record_header.size <= end_of_segment:
+            (length,) = record_header.unpack_from(segment, offset)
+            start = offset + record_header.size
+            if start + length > end_of_segment:
+                logger.debug("Truncated block at end of segment")
+                return
+            yield start, start + length
+            offset = start + length
+
+    def iter_blocks(self) -> Iterator[memoryview]:
+        """
+        Iterate over all blocks of the archive.
+
+        :return: Iterator of memoryview slices, one per DCP block.
+        """
+        for segment_path in self.segments():
+            if os.path.getsize(segment_path) == 0:
+                continue
+            with open(segment_path, "rb") as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            segment = memoryview(mapping)
+            try:
+                for start, end in self.block_offsets(segment):
+                    yield segment[start:end]
+            finally:
+                segment.release()
+                try:
+                    mapping.close()
+                except BufferError:
+                    # slices are still referenced by the caller; the mapping
+                    # is closed once they are garbage collected
+                    pass
+
+    def iter_messages(
+        self, message_filter: "MessageFilter" = None
+    ) -> Iterator[memoryview]:
+        """
+        Iterate over all DCP messages of the archive.
+
+        :param message_filter: Yield only messages passing this filter (default: all).
+        :return: Iterator of memoryview slices, one per DCP message.
+        """
+        for block in self.iter_blocks():
+            yield from DcpMessage.split(block, message_filter)
+
+    def __iter__(self) -> Iterator[memoryview]:
+        return self.iter_messages()
+
+
+def _complete_length(path: Path) -> int:
+    """Size of a segment up to the end of its last complete record."""
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        end = len(BlockArchiveConstants.SEGMENT_MAGIC)
+        for _, end in BlockArchiveReader.block_offsets(mapping):
+            pass
+        return end
+    finally:
+        mapping.close()
@@ -0,0 +1,277 @@
+import logging
+from array import array
+from pathlib import Path
+from typing import Iterable, Union
+
+from .dcp_message import DcpMessage
+from .ldds_message import LddsMessage
+from .observers import SessionObserver
+from .search_criteria import SearchCriteria
+
+logger = logging.getLogger(__name__)
+
+Block = Union[LddsMessage, bytes, bytearray, memoryview]
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+    except ImportError as ex:
+        raise ImportError(
+            "Arrow export requires pyarrow; install with `pip install dcpmessage[arrow]`"
+        ) from ex
+    return pyarrow, pyarrow.compute
+
+
+def message_schema():
+    """
+    Return the Arrow schema of exploded DCP messages: the header fields as typed
+    columns and the message data as a binary column.
+
+    :return: ``pyarrow.Schema``
+    """
+    pa, _ = _require_pyarrow()
+    return pa.schema(
+        [
+            ("address", pa.string()),
+            # Parquet has no second resolution: milliseconds round-trip unchanged
+            ("transmit_time", pa.timestamp("ms", tz="UTC")),
+            ("failure_code", pa.string()),
+            ("signal_strength", pa.int16()),
+            ("frequency_offset", pa.string()),
+            ("modulation_index", pa.string()),
+            ("data_quality", pa.string()),
+            ("goes_channel", pa.int16()),
+            ("spacecraft", pa.string()),
+            ("data_source", pa.string()),
+            ("message_length", pa.int32()),
+            ("data", pa.binary()),
+        ]
+    )
+
+
+def block_to_record_batch(block: Block):
+    """
+    Convert a DCP block into an Arrow record batch with one row per message.
+
+    The messages of a block are contiguous, so the block buffer is wrapped as a
+    binary array using only the message offsets, without copying; the header
+    columns and the data column are then sliced and parsed by Arrow compute
+    kernels instead of per-row Python code. Memoryviews (e.g. from
+    :class:`dcpmessage.archive.BlockArchiveReader`) are copied once, since the
+    memory they point to may be unmapped after iteration.
+
+    :param block: An ``LddsMessage`` DCP block or the raw bytes of one.
+    :return: ``pyarrow.RecordBatch`` with the schema of :func:`message_schema`.
+    :raises ValueError: If a message length field is not numeric.
+    """
+    pa, pc = _require_pyarrow()
+    if isinstance(block, LddsMessage):
+        data = memoryview(block.message_data)[: block.message_length]
+    elif isinstance(block, memoryview):
+        data = bytes(block)
+    else:
+        data = block
+
+    data_length = DcpMessage.DATA_LENGTH
+    header_length = DcpMessage.HEADER_LENGTH
+    end_of_block = len(data)
+    offsets = array("i", [0])
+    start_index = 0
+    while start_index < end_of_block:
+        message_length = int(
+            bytes(data[start_index + data_length : start_index + header_length])
+        )
+        start_index = min(start_index + header_length + message_length, end_of_block)
+        offsets.append(start_index)
+
+    messages = pa.Array.from_buffers(
+        pa.binary(),
+        len(offsets) - 1,
+        [None, pa.py_buffer(offsets), pa.py_buffer(data)],
+    )
+
+    def text(start: int, stop: int):
+        return pc.cast(pc.binary_slice(messages, start, stop), pa.string())
+
+    def number(start: int, stop: int, type_=pa.int64()):
+        return pc.cast(text(start, stop), type_)
+
+    # YYDDDHHMMSS -> seconds since the epoch, valid for the years 2000-2099
+    year = pc.add(number(8, 10), 2000)
+    days = pc.add(
+        pc.multiply(pc.subtract(year, 1970), 365),
+        pc.add(
+            pc.subtract(
+                pc.divide(pc.subtract(year, 1969), 4),
+                pc.divide(pc.subtract(year, 1901), 100),
+            ),
+            pc.divide(pc.subtract(year, 1601), 400),
+        ),
+    )
+    days = pc.add(days, pc.subtract(number(10, 13), 1))
+    seconds = pc.add(
+        pc.add(pc.multiply(days, 86400), pc.multiply(number(13, 15), 3600)),
+        pc.add(pc.multiply(number(15, 17), 60), number(17, 19)),
+    )
+
+    return pa.RecordBatch.from_arrays(
+        [
+            text(0, 8),
+            pc.cast(pc.multiply(seconds, 1000), pa.timestamp("ms", tz="UTC")),
+            text(19, 20),
+            number(20, 22, pa.int16()),
+            text(22, 24),
+            text(24, 25),
+            text(25, 26),
+            number(26, 29, pa.int16()),
+            text(29, 30),
+            text(30, 32),
+            number(32, 37, pa.int32()),
+            pc.binary_slice(messages, header_length),
+        ],
+        schema=message_schema(),
+    )
+
+
+def blocks_to_table(blocks: Iterable[Block]):
+    """
+    Convert DCP blocks into an Arrow table, e.g. for ``table.to_pandas()`` or
+    ``polars.from_arrow(table)``.
+
+    :param blocks: DCP blocks, e.g. from ``LddsClient.iter_dcp_blocks()``.
+    :return: ``pyarrow.Table`` with the schema of :func:`message_schema`.
+    """
+    pa, _ = _require_pyarrow()
+    return pa.Table.from_batches(
+        [block_to_record_batch(block) for block in blocks], schema=message_schema()
+    )
+
+
+class ParquetExporter:
+    """
+    Write DCP blocks to a Parquet file as they arrive, one row group per
+    ``row_group_size`` messages.
+
+    Requires the optional ``arrow`` extra (``pip install dcpmessage[arrow]``).
+
+    :param path: Path of the Parquet file.
+    :param row_group_size: Number of messages buffered before a row group is written.
+    :param compression: Parquet compression codec.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        row_group_size: int = 100_000,
+        compression: str = "zstd",
+    ):
+        _require_pyarrow()
+        import pyarrow.parquet
+
+        self.path = Path(path)
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self.__pending = []
+        self.__pending_rows = 0
+        self.__writer = pyarrow.parquet.ParquetWriter(
+            str(self.path), message_schema(), compression=compression
+        )
+
+    def write_block(self, block: Block):
+        """
+        Add the messages of a DCP block.
+
+        :param block: An ``LddsMessage`` DCP block or the raw bytes of one.
+        :return: None
+        """
+        batch = block_to_record_batch(block)
+        self.__pending.append(batch)
+        self.__pending_rows += batch.num_rows
+        self.rows += batch.num_rows
+        if self.__pending_rows >= self.row_group_size:
+            self.flush()
+
+    def write_blocks(self, blocks: Iterable[Block]):
+        """
+        Add the messages of every DCP block of an iterable.
+
+        :param blocks: DCP blocks, e.g. from ``LddsClient.iter_dcp_blocks()``.
+        :return: None
+        """
+        for block in blocks:
+            self.write_block(block)
+
+    def flush(self):
+        """
+        Write the buffered messages as a row group.
+
+        :return: None
+        """
+        if not self.__pending:
+            return
+        pa, _ = _require_pyarrow()
+        table = pa.Table.from_batches(self.__pending, schema=message_schema())
+        self.__writer.write_table(table, row_group_size=self.row_group_size)
+        self.__pending = []
+        self.__pending_rows = 0
+
+    def close(self):
+        """
+        Write the buffered messages and close the file.
+
+        :return: None
+        """
+        self.flush()
+        self.__writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def export_parquet(
+    username: str,
+    password: str,
+    search_criteria: Union[dict, str, Path, SearchCriteria],
+    host: str,
+    path: Union[str, Path],
+    port: int = 16003,
+    timeout: int = 30,
+    observer: SessionObserver = None,
+    row_group_size: int = 100_000,
+) -> int:
+    """
+    Fetch DCP messages and write them to a Parquet file, block by block, without
+    building the list of messages returned by ``DcpMessage.get``.
+
+    :param username: Username for server authentication.
+    :param password: Password for server authentication.
+    :param search_criteria: File path to search criteria, search criteria as a dict,
+        or a SearchCriteria.
+    :param host: Hostname or IP address of the server.
+    :param path: Path of the Parquet file.
+    :param port: Port number for server connection (default: 16003).
+    :param timeout: Connection timeout in seconds (default: 30 seconds).
+    :param observer: Observer notified of session timings and volumes (default: no-op).
+    :param row_group_size: Number of messages per Parquet row group.
+    :return: Number of messages written.
+    """
+    criteria = SearchCriteria.load(search_criteria)
+    with ParquetExporter(path, row_group_size=row_group_size) as exporter:
+        with DcpMessage._session(
+            username=username,
+            password=password,
+            criteria=criteria,
+            host=host,
+            port=port,
+            timeout=timeout,
+            observer=observer,
+            capture=None,
+        ) as client:
+            exporter.write_blocks(client.iter_dcp_blocks())
+    logger.info(f"Exported {exporter.rows} messages to {path}")
+    return exporter.rows
@@ -0,0 +1,253 @@
+import heapq
+import logging
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, Union
+
+from .dcp_header import DcpHeader
+from .dcp_message import DcpMessage
+from .limiter import AimdLimiter, backoff_delays
+from .search_criteria import SearchCriteria
+from .utils import TimeUtil
+
+logger = logging.getLogger(__name__)
+
+
+class BackfillPlanner:
+    """
+    Retrieve a long history by splitting it into time windows that are fetched
+    concurrently on a bounded pool of sessions, and merge the windows into one
+    stream ordered by header transmit time.
+
+    LRGS selects messages by receive time, so a window may contain messages
+    transmitted shortly before it starts. A window is therefore merged in once
+    the stream reaches ``lookahead`` before its start; only the windows in
+    flight and the ones being merged are held in memory.
+
+    :param username: Username for server authentication.
+    :param password: Password for server authentication.
+    :param host: Hostname or IP address of the server.
+    :param port: Port number for server connection (default: 16003).
+    :param timeout: Socket timeout in seconds (default: 30 seconds).
+    :param window: Length of each time window (default: 6 hours).
+    :param max_sessions: Maximum number of concurrent sessions (default: 4).
+    :param retries: Number of times a failed window is retried (default: 2).
+    :param retry_delay: Upper bound of the first retry delay in seconds; retries use
+        jittered exponential delays (see :func:`dcpmessage.limiter.backoff_delays`).
+    :param lookahead: Maximum expected delay between transmit and receive time (default: 1 hour).
+    :param limiter: Adaptive session limiter shared with other multi-session features.
+        Sessions additionally wait for a slot of the limiter (default: no limiter).
+    """
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        host: str,
+        port: int = 16003,
+        timeout: int = 30,
+        window: timedelta = timedelta(hours=6),
+        max_sessions: int = 4,
+        retries: int = 2,
+        retry_delay: float = 5.0,
+        lookahead: timedelta = timedelta(hours=1),
+        limiter: AimdLimiter = None,
+    ):
+        assert window > timedelta(seconds=1), "window must be longer than one second"
+        assert max_sessions > 0, "max_sessions must be positive"
+        self.username = username
+        self.password = password
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.window = window
+        self.max_sessions = max_sessions
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.lookahead = lookahead
+        self.limiter = limiter
+
+    def plan(self, since: datetime, until: datetime) -> list[tuple[datetime, datetime]]:
+        """
+        Split a time range into consecutive, non-overlapping windows.
+
+        :param since: Start of the range; naive times are assumed to be UTC.
+        :param until: End of the range (inclusive); naive times are assumed to be UTC.
+        :return: List of (start, end) pairs; each end is one second before the next start.
+        """
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        if until.tzinfo is None:
+            until = until.replace(tzinfo=timezone.utc)
+        windows = []
+        start = since
+        while start <= until:
+            end = min(start + self.window - timedelta(seconds=1), until)
+            windows.append((start, end))
+            start = end + timedelta(seconds=1)
+        return windows
+
+    def fetch(self, criteria: SearchCriteria) -> list[str]:
+        """
+        Run one LRGS session for a window.
+
+        :param criteria: The criteria of the window.
+        :return: List of DCP messages.
+        """
+        return DcpMessage.get(
+            username=self.username,
+            password=self.password,
+            search_criteria=criteria,
+            host=self.host,
+            port=self.port,
+            timeout=self.timeout,
+        )
+
+    def fetch_window(self, criteria: SearchCriteria) -> list[str]:
+        """
+        Fetch a window, retrying it on its own if it fails.
+
+        :param criteria: The criteria of the window.
+        :return: The messages of the window sorted by transmit time.
+        """
+        delays = backoff_delays(self.retry_delay, cap=60 * self.retry_delay)
+        for attempt in range(self.retries + 1):
+            try:
+                with self.limiter.session() if self.limiter else nullcontext():
+                    messages = self.fetch(criteria)
+                break
+            except Exception as ex:
+                if attempt == self.retries:
+                    raise
+                delay = next(delays)
+                logger.warning(
+                    f"Window {criteria.lrgs_since} - {criteria.lrgs_until} failed "
+                    f"({ex}); retrying in {delay:.1f}s"
+                )
+                time.sleep(delay)
+        messages.sort(key=DcpHeader.transmit_timestamp)
+        return messages
+
+    def run(
+        self,
+        search_criteria: Union[dict, str, Path, SearchCriteria],
+        since: datetime,
+        until: datetime,
+    ) -> Iterator[str]:
+        """
+        Backfill the messages matching a criteria between two times.
+
+        The ``DRS_SINCE`` / ``DRS_UNTIL`` of the criteria are replaced by the windows.
+
+        :param search_criteria: Path to a JSON file, a dict, or a SearchCriteria.
+        :param since: Start of the history to retrieve; naive times are assumed to be UTC.
+        :param until: End of the history to retrieve; naive times are assumed to be UTC.
+        :return: Iterator of DCP messages in transmit time order.
+        """
+        criteria = SearchCriteria.load(search_criteria)
+        windows = self.plan(since, until)
+        lookahead = int(self.lookahead.total_seconds())
+        starts = [int(start.timestamp()) for start, _ in windows]
+
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_sessions, thread_name_prefix="dcp-backfill"
+        )
+        in_flight: deque[Future] = deque()
+        submitted = 0
+
+        def submit_ahead(merged: int):
+            nonlocal submitted
+            while (
+                submitted < len(windows) and submitted < merged + 2 * self.max_sessions
+            ):
+                start, end = windows[submitted]
+                window_criteria = SearchCriteria(
+                    TimeUtil.format_lrgs_time(start),
+                    TimeUtil.format_lrgs_time(end),
+                    criteria.dcp_address,
+                    criteria.sources[: criteria.num_sources],
+                )
+                in_flight.append(executor.submit(self.fetch_window, window_criteria))
+                submitted += 1
+
+        heap: list[tuple[int, int, str, Iterator[str]]] = []
+        merged = 0
+        try:
+            submit_ahead(merged)
+            while True:
+                # merge in every window whose messages may precede the next output
+                while merged < len(windows) and (
+                    not heap or heap[0][0] >= starts[merged] - lookahead
+                ):
+                    messages = iter(in_flight.popleft().result())
+                    for message in messages:
+                        timestamp = DcpHeader.transmit_timestamp(message)
+                        heapq.heappush(heap, (timestamp, merged, message, messages))
+                        break
+                    merged += 1
+                    submit_ahead(merged)
+                if not heap:
+                    return
+
+                _, window_index, message, messages = heap[0]
+                yield message
+                for next_message in messages:
+                    timestamp = DcpHeader.transmit_timestamp(next_message)
+                    heapq.heapreplace(
+                        heap, (timestamp, window_index, next_message, messages)
+                    )
+                    break
+                else:
+                    heapq.heappop(heap)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def backfill(
+    username: str,
+    password: str,
+    search_criteria: Union[dict, str, Path, SearchCriteria],
+    since: datetime,
+    until: datetime,
+    host: str,
+    port: int = 16003,
+    timeout: int = 30,
+    window: timedelta = timedelta(hours=6),
+    max_sessions: int = 4,
+    retries: int = 2,
+    limiter: AimdLimiter = None,
+) -> Iterator[str]:
+    """
+    Backfill the messages matching a criteria between two times using concurrent
+    sessions. See :class:`BackfillPlanner`.
+
+    :param username: Username for server authentication.
+    :param password: Password for server authentication.
+    :param search_criteria: Path to a JSON file, a dict, or a SearchCriteria.
+    :param since: Start of the history to retrieve.
+    :param until: End of the history to retrieve.
+    :param host: Hostname or IP address of the server.
+    :param port: Port number for server connection (default: 16003).
+    :param timeout: Socket timeout in seconds (default: 30 seconds).
+    :param window: Length of each time window (default: 6 hours).
+    :param max_sessions: Maximum number of concurrent sessions (default: 4).
+    :param retries: Number of times a failed window is retried (default: 2).
+    :param limiter: Adaptive session limiter (default: no limiter).
+    :return: Iterator of DCP messages in transmit time order.
+    """
+    planner = BackfillPlanner(
+        username=username,
+        password=password,
+        host=host,
+        port=port,
+        timeout=timeout,
+        window=window,
+        max_sessions=max_sessions,
+        retries=retries,
+        limiter=limiter,
+    )
+    return planner.run(search_criteria, since, until)
@@ -0,0 +1,160 @@
+import abc
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Hashable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache(abc.ABC):
+    """
+    Base class for caches of ``DcpMessage.get`` results keyed by canonical search criteria.
+
+    Entries expire ``ttl`` seconds after they are stored; the least recently used
+    entries are evicted beyond ``max_entries``.
+
+    :param ttl: Time to live of an entry in seconds.
+    :param max_entries: Maximum number of entries kept.
+    :param granularity: Relative criteria times of the cache key are resolved with ``now``
+        rounded down to this many seconds, so identical relative queries within the
+        interval share an entry. The server still gets the criteria as of ``now``.
+    """
+
+    def __init__(self, ttl: float = 60, max_entries: int = 128, granularity: int = 60):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.granularity = granularity
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def get(self, key: Hashable) -> Optional[list[str]]:
+        """
+        Return the cached messages for a key.
+
+        :param key: Canonical criteria key.
+        :return: The cached messages, or None if missing or expired.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def put(self, key: Hashable, messages: list[str]):
+        """
+        Cache the messages retrieved for a key.
+
+        :param key: Canonical criteria key.
+        :param messages: The retrieved DCP messages.
+        :return: None
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def clear(self):
+        """
+        Remove all entries.
+
+        :return: None
+        """
+        raise NotImplementedError
+
+
+class MemoryResultCache(ResultCache):
+    """
+    In-process result cache.
+
+    :param ttl: Time to live of an entry in seconds.
+    :param max_entries: Maximum number of entries kept.
+    :param granularity: Resolution in seconds of relative criteria times.
+    """
+
+    def __init__(self, ttl: float = 60, max_entries: int = 128, granularity: int = 60):
+        super().__init__(ttl=ttl, max_entries=max_entries, granularity=granularity)
+        self.__entries: OrderedDict[Hashable, tuple[float, list[str]]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[list[str]]:
+        with self._lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return None
+            expires, messages = entry
+            if expires < time.monotonic():
+                del self.__entries[key]
+                return None
+            self.__entries.move_to_end(key)
+            return list(messages)
+
+    def put(self, key: Hashable, messages: list[str]):
+        with self._lock:
+            self.__entries[key] = (time.monotonic() + self.ttl, list(messages))
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_entries:
+                self.__entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self.__entries.clear()
+
+
+class DiskResultCache(ResultCache):
+    """
+    Result cache stored as JSON files in a directory, shared between processes.
+
+    :param directory: The cache directory (created if missing).
+    :param ttl: Time to live of an entry in seconds.
+    :param max_entries: Maximum number of entries kept.
+    :param granularity: Resolution in seconds of relative criteria times.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        ttl: float = 60,
+        max_entries: int = 128,
+        granularity: int = 60,
+    ):
+        super().__init__(ttl=ttl, max_entries=max_entries, granularity=granularity)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def __path(self, key: Hashable) -> Path:
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def get(self, key: Hashable) -> Optional[list[str]]:
+        path = self.__path(key)
+        with self._lock:
+            try:
+                with open(path, "r") as cache_file:
+                    entry = json.load(cache_file)
+            except (OSError, ValueError):
+                return None
+            if entry["expires"] < time.time():
+                path.unlink(missing_ok=True)
+                return None
+            # mark as recently used for eviction
+            os.utime(path)
+            return entry["messages"]
+
+    def put(self, key: Hashable, messages: list[str]):
+        path = self.__path(key)
+        entry = {"expires": time.time() + self.ttl, "messages": list(messages)}
+        with self._lock:
+            temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(temp_path, "w") as cache_file:
+                json.dump(entry, cache_file)
+            os.replace(temp_path, path)
+            entries = sorted(
+                self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime
+            )
+            for stale_path in entries[: max(0, len(entries) - self.max_entries)]:
+                stale_path.unlink(missing_ok=True)
+
+    def clear(self):
+        with self._lock:
+            for path in self.directory.glob("*.json"):
+                path.unlink(missing_ok=True)
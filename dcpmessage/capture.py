@@ -0,0 +1,118 @@
+import logging
+import struct
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator, NamedTuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CaptureConstants:
+    """
+    Constants of the capture file format.
+
+    A capture file is the magic bytes followed by records of
+    ``timestamp (float64) | direction (1 byte) | length (uint32) | frame``.
+    Records are only ever appended, so a capture can be read while it is written.
+
+    :param MAGIC: Bytes at the start of every capture file.
+    :param RECORD_HEADER: Struct of the header preceding every frame.
+    :param SENT: Direction of frames sent to the server.
+    :param RECEIVED: Direction of frames received from the server.
+    """
+
+    MAGIC: bytes = b"DCPCAP1\n"
+    RECORD_HEADER: struct.Struct = struct.Struct(">dcI")
+    SENT: bytes = b">"
+    RECEIVED: bytes = b"<"
+
+
+class CaptureRecord(NamedTuple):
+    """A single frame of a capture file."""
+
+    timestamp: float
+    direction: bytes
+    data: bytes
+
+
+class CaptureWriter:
+    """
+    Append LDDS frames with timestamps to a capture file.
+
+    :param file: Path of the capture file, or a binary file object opened for appending.
+    :param flush: Flush after every record so that readers see frames immediately.
+    """
+
+    def __init__(self, file: Union[str, Path, BinaryIO], flush: bool = True):
+        if isinstance(file, (str, Path)):
+            self.file = open(file, "ab")
+            self.__owns_file = True
+        else:
+            self.file = file
+            self.__owns_file = False
+        self.flush = flush
+        if self.file.tell() == 0:
+            self.file.write(CaptureConstants.MAGIC)
+
+    def record(self, direction: bytes, data: Union[bytes, bytearray]):
+        """
+        Append a frame to the capture.
+
+        :param direction: ``CaptureConstants.SENT`` or ``CaptureConstants.RECEIVED``.
+        :param data: The frame bytes.
+        """
+        header = CaptureConstants.RECORD_HEADER.pack(time.time(), direction, len(data))
+        self.file.write(header + data)
+        if self.flush:
+            self.file.flush()
+
+    def close(self):
+        """
+        Close the capture file if it was opened by this writer.
+
+        :return: None
+        """
+        if self.__owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def read_capture(file: Union[str, Path, BinaryIO]) -> Iterator[CaptureRecord]:
+    """
+    Iterate over the records of a capture file.
+
+    A truncated trailing record (e.g. a capture still being written) ends the iteration.
+
+    :param file: Path of the capture file, or a binary file object.
+    :return: Iterator of CaptureRecord.
+    :raises ValueError: If the file is not a capture file.
+    """
+    if isinstance(file, (str, Path)):
+        with open(file, "rb") as f:
+            yield from read_capture(f)
+        return
+
+    magic = CaptureConstants.MAGIC
+    if file.read(len(magic)) != magic:
+        raise ValueError("Not a dcpmessage capture file")
+
+    record_header = CaptureConstants.RECORD_HEADER
+    while True:
+        header = file.read(record_header.size)
+        if len(header) < record_header.size:
+            return
+        timestamp, direction, length = record_header.unpack(header)
+        data = file.read(length)
+        if len(data) < length:
+            logger.debug("Truncated record at end of capture")
+            return
+        yield CaptureRecord(timestamp, direction, data)
@@ -0,0 +1,359 @@
+import argparse
+import itertools
+import json
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
+from pathlib import Path
+from typing import Callable, TextIO
+
+from .dcp_message import DcpMessage
+from .exceptions import ProtocolError, ServerErrorCode
+from .limiter import THROTTLE_CODES
+from .search_criteria import SearchCriteria
+from .sink import message_record
+
+logger = logging.getLogger(__name__)
+
+
+class ExitCode(IntEnum):
+    """
+    Exit status of the ``dcpmessage`` command, one per class of failure.
+
+    When several jobs fail, the status of the first failed job (in the order of
+    the criteria files) is returned.
+    """
+
+    OK = 0
+    ERROR = 1
+    USAGE = 2
+    CONNECTION = 3
+    AUTHENTICATION = 4
+    CRITERIA = 5
+    SERVER_BUSY = 6
+    SERVER_ERROR = 7
+
+
+AUTHENTICATION_CODES = frozenset(
+    code.value
+    for code in (
+        ServerErrorCode.DINVALIDUSER,
+        ServerErrorCode.DDDSAUTHFAILED,
+        ServerErrorCode.DBADPASSWORD,
+        ServerErrorCode.DSTRONGREQUIRED,
+    )
+)
+CRITERIA_CODES = frozenset(
+    code.value
+    for code in (
+        ServerErrorCode.DNOSRCHCRIT,
+        ServerErrorCode.DBADSINCE,
+        ServerErrorCode.DBADUNTIL,
+        ServerErrorCode.DBADNLIST,
+        ServerErrorCode.DBADADDR,
+        ServerErrorCode.DBADEMAIL,
+        ServerErrorCode.DBADRTRAN,
+        ServerErrorCode.DNLISTXCD,
+        ServerErrorCode.DADDRXCD,
+        ServerErrorCode.DBADDAPSSTAT,
+        ServerErrorCode.DBADTIMEOUT,
+        ServerErrorCode.DBADCHANNEL,
+        ServerErrorCode.DBADDCPNAME,
+        ServerErrorCode.DBADSEARCHCRIT,
+        ServerErrorCode.DBADKEYWORD,
+        ServerErrorCode.DPARSEERROR,
+        ServerErrorCode.DNOSUCHSOURCE,
+        ServerErrorCode.DTOOMANYDCPS,
+    )
+)
+
+
+def exit_code_for(error: BaseException) -> ExitCode:
+    """
+    Map the exception that ended a job to an exit status.
+
+    :param error: The exception raised by the job.
+    :return: The ExitCode of the class of the error.
+    """
+    cause = error
+    while cause is not None:
+        if isinstance(cause, ProtocolError) and cause.server_error is not None:
+            code = cause.server_error.server_code_no
+            if code in AUTHENTICATION_CODES:
+                return ExitCode.AUTHENTICATION
+            if code in CRITERIA_CODES:
+                return ExitCode.CRITERIA
+            if code in THROTTLE_CODES:
+                return ExitCode.SERVER_BUSY
+            return ExitCode.SERVER_ERROR
+        if isinstance(cause, OSError):
+            return ExitCode.CONNECTION
+        cause = cause.__cause__
+    return ExitCode.ERROR
+
+
+def format_message(message: str, output_format: str) -> str:
+    """
+    Format a DCP message as an output line.
+
+    :param message: The DCP message.
+    :param output_format: ``"raw"`` or ``"ndjson"``.
+    :return: The line, without the line separator.
+    """
+    if output_format == "raw":
+        return message
+    try:
+        return json.dumps(message_record(message))
+    except (ValueError, IndexError):
+        # keep messages with an unparsable header instead of dropping them
+        return json.dumps({"raw": message})
+
+
+class LineWriter:
+    """
+    Thread-safe writer of output lines, flushed after every line so that
+    messages are visible as they arrive.
+
+    :param stream: The text stream to write to.
+    """
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.__lock = threading.Lock()
+
+    def write(self, line: str):
+        """
+        Write a line and flush it.
+
+        :param line: The line, without the line separator.
+        :return: None
+        """
+        with self.__lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the argument parser of the ``dcpmessage`` command.
+
+    :return: The parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="dcpmessage",
+        description="Retrieve GOES DCS messages from LRGS servers.",
+    )
+    parser.add_argument(
+        "criteria", nargs="+", type=Path, help="search criteria JSON file(s)"
+    )
+    parser.add_argument(
+        "--host",
+        dest="hosts",
+        action="append",
+        required=True,
+        help="LRGS server; repeat for several servers",
+    )
+    parser.add_argument("--port", type=int, default=16003)
+    parser.add_argument(
+        "--timeout", type=int, default=30, help="socket timeout in seconds"
+    )
+    parser.add_argument(
+        "--host-strategy",
+        choices=("round-robin", "failover"),
+        default="round-robin",
+        help="spread jobs over the servers, or start every job on the first server; "
+        "in both cases a job that cannot connect is retried on the next server",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="number of concurrent sessions"
+    )
+    parser.add_argument("--format", choices=("raw", "ndjson"), default="raw")
+    parser.add_argument(
+        "--tolerant",
+        action="store_true",
+        help="skip corrupt messages of a DCP block instead of failing the job",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        help="write each job to <output-dir>/<criteria name>.<txt|ndjson> "
+        "instead of stdout",
+    )
+    parser.add_argument(
+        "--credentials",
+        type=Path,
+        help='JSON file with "username" and "password" (default: the '
+        "DCPMESSAGE_USERNAME and DCPMESSAGE_PASSWORD environment variables)",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="count",
+        default=0,
+        help="log INFO (-v) or DEBUG (-vv)",
+    )
+    return parser
+
+
+def load_credentials(credentials_file: Path = None) -> tuple[str, str]:
+    """
+    Read the LRGS username and password.
+
+    :param credentials_file: JSON file with ``username`` and ``password``
+        (default: environment variables).
+    :return: (username, password)
+    :raises ValueError: If the credentials are missing.
+    """
+    if credentials_file is not None:
+        with open(credentials_file, "r") as f:
+            credentials = json.load(f)
+        return credentials["username"], credentials["password"]
+    username = os.environ.get("DCPMESSAGE_USERNAME")
+    password = os.environ.get("DCPMESSAGE_PASSWORD")
+    if not username or not password:
+        raise ValueError(
+            "No credentials: use --credentials or set DCPMESSAGE_USERNAME "
+            "and DCPMESSAGE_PASSWORD"
+        )
+    return username, password
+
+
+def run_job(
+    name: str,
+    criteria: SearchCriteria,
+    hosts: list[str],
+    write: Callable[[str], None],
+    username: str,
+    password: str,
+    port: int,
+    timeout: int,
+    output_format: str,
+    tolerant: bool = False,
+) -> ExitCode:
+    """
+    Fetch the messages of a search criteria and write them as they arrive.
+
+    Servers are tried in the given order until one accepts the session; once
+    messages have been written the job is not retried, to avoid duplicates.
+
+    :param name: Name of the job in log messages.
+    :param criteria: The search criteria.
+    :param hosts: Servers to try, in order.
+    :param write: Function writing one output line.
+    :param username: Username for server authentication.
+    :param password: Password for server authentication.
+    :param port: Port number of the servers.
+    :param timeout: Socket timeout in seconds.
+    :param output_format: ``"raw"`` or ``"ndjson"``.
+    :param tolerant: Skip corrupt messages instead of failing the job.
+    :return: ExitCode of the job.
+    """
+    written = 0
+    for attempt, host in enumerate(hosts):
+        try:
+            for message in DcpMessage.stream(
+                username=username,
+                password=password,
+                search_criteria=criteria,
+                host=host,
+                port=port,
+                timeout=timeout,
+                tolerant=tolerant,
+            ):
+                write(format_message(message, output_format))
+                written += 1
+            logger.info(f"{name}: {written} messages from {host}")
+            return ExitCode.OK
+        except Exception as ex:
+            code = exit_code_for(ex)
+            retry = (
+                written == 0
+                and attempt + 1 < len(hosts)
+                and code in (ExitCode.CONNECTION, ExitCode.SERVER_BUSY)
+            )
+            if not retry:
+                logger.error(f"{name}: failed on {host}: {ex}")
+                return code
+            logger.warning(f"{name}: failed on {host} ({ex}); trying next server")
+    return ExitCode.ERROR
+
+
+def main(argv: list[str] = None) -> int:
+    """
+    Entry point of the ``dcpmessage`` command.
+
+    :param argv: Command line arguments (default: ``sys.argv[1:]``).
+    :return: The exit status, see ExitCode.
+    """
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=(logging.WARNING, logging.INFO, logging.DEBUG)[min(args.verbose, 2)],
+        format="[%(levelname)s]\t%(asctime)s\t%(name)s\t%(message)s",
+        stream=sys.stderr,
+    )
+    try:
+        username, password = load_credentials(args.credentials)
+    except (OSError, ValueError, KeyError) as ex:
+        logger.error(f"Cannot load credentials: {ex}")
+        return ExitCode.USAGE
+
+    try:
+        criteria_list = [SearchCriteria.load(path) for path in args.criteria]
+    except Exception as ex:
+        logger.error(f"Cannot load search criteria: {ex}")
+        return ExitCode.USAGE
+
+    output_files = []
+    writers = []
+    if args.output_dir is None:
+        writers = [LineWriter(sys.stdout)] * len(args.criteria)
+    else:
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+        extension = ".txt" if args.format == "raw" else ".ndjson"
+        names = set()
+        for criteria in args.criteria:
+            name = criteria.stem
+            for index in itertools.count(1):
+                if name not in names:
+                    break
+                name = f"{criteria.stem}-{index}"
+            names.add(name)
+            output_file = open(args.output_dir / f"{name}{extension}", "w")
+            output_files.append(output_file)
+            writers.append(LineWriter(output_file))
+
+    def hosts_for(job_index: int) -> list[str]:
+        if args.host_strategy == "failover":
+            return args.hosts
+        start = job_index % len(args.hosts)
+        return args.hosts[start:] + args.hosts[:start]
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+            futures = [
+                executor.submit(
+                    run_job,
+                    name=str(path),
+                    criteria=criteria,
+                    hosts=hosts_for(index),
+                    write=writers[index].write,
+                    username=username,
+                    password=password,
+                    port=args.port,
+                    timeout=args.timeout,
+                    output_format=args.format,
+                    tolerant=args.tolerant,
+                )
+                for index, (path, criteria) in enumerate(
+                    zip(args.criteria, criteria_list)
+                )
+            ]
+            codes = [future.result() for future in futures]
+    finally:
+        for output_file in output_files:
+            output_file.close()
+
+    return next((code for code in codes if code != ExitCode.OK), ExitCode.OK)
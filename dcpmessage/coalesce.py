@@ -0,0 +1,259 @@
+import logging
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Union
+
+from .dcp_header import DcpHeader
+from .dcp_message import DcpMessage
+from .limiter import AimdLimiter
+from .search_criteria import DcpAddress, SearchCriteria
+from .utils import TimeUtil
+
+logger = logging.getLogger(__name__)
+
+
+class CoalescedRequest:
+    """
+    A caller's search criteria waiting to be served by a combined session.
+
+    :param criteria: The caller's search criteria.
+    :param now: Reference time used to resolve relative times.
+    """
+
+    def __init__(self, criteria: SearchCriteria, now: datetime):
+        self.criteria = criteria
+        self.future: Future = Future()
+        self.addresses = frozenset(a.address.upper() for a in criteria.dcp_address)
+        self.sources = frozenset(criteria.sources[: criteria.num_sources])
+        try:
+            self.since, self.until = criteria.window(now)
+            self.resolved = criteria.resolve(now)
+        except ValueError:
+            # e.g. DRS_SINCE "last": cannot be merged, served on its own
+            self.since = self.until = self.resolved = None
+
+    @property
+    def coalescable(self) -> bool:
+        return self.resolved is not None
+
+
+class RequestCoalescer:
+    """
+    Merge search criteria submitted within a short window into a single LRGS
+    session and route each caller only the messages matching its own criteria.
+
+    Requests are only merged with requests of the same sources, because the
+    message type (e.g. self-timed or random) cannot be told from the header: a
+    batch runs one session per source set. The combined criteria is the union of
+    the DCP addresses with the widest time window. Messages are routed by DCP
+    address and header transmit time; LRGS selects by receive time, so a caller
+    may receive a message transmitted inside its window that its own session
+    would have returned on the next poll.
+
+    :param username: Username for server authentication.
+    :param password: Password for server authentication.
+    :param host: Hostname or IP address of the server.
+    :param port: Port number for server connection (default: 16003).
+    :param timeout: Socket timeout in seconds (default: 30 seconds).
+    :param window: Seconds to wait for more requests after the first one of a batch.
+    :param limiter: Adaptive session limiter; sessions wait for one of its slots and
+        throttled sessions are retried after jittered delays (default: no limiter).
+    :param get_kwargs: Further keyword arguments passed to ``DcpMessage.get``.
+    """
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        host: str,
+        port: int = 16003,
+        timeout: int = 30,
+        window: float = 0.25,
+        limiter: AimdLimiter = None,
+        **get_kwargs,
+    ):
+        self.username = username
+        self.password = password
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.window = window
+        self.limiter = limiter
+        self.get_kwargs = get_kwargs
+        self.__lock = threading.Lock()
+        self.__pending: list[CoalescedRequest] = []
+        self.__timer: threading.Timer = None
+
+    def fetch(self, criteria: SearchCriteria) -> list[str]:
+        """
+        Run one LRGS session for a (combined) criteria.
+
+        :param criteria: The criteria to fetch.
+        :return: List of DCP messages.
+        """
+
+        def session():
+            return DcpMessage.get(
+                username=self.username,
+                password=self.password,
+                search_criteria=criteria,
+                host=self.host,
+                port=self.port,
+                timeout=self.timeout,
+                **self.get_kwargs,
+            )
+
+        if self.limiter is not None:
+            return self.limiter.call(session)
+        return session()
+
+    def submit(self, search_criteria: Union[dict, str, Path, SearchCriteria]) -> Future:
+        """
+        Queue a search criteria for the next combined session.
+
+        :param search_criteria: Path to a JSON file, a dict, or a SearchCriteria.
+        :return: Future resolving to the list of DCP messages matching the criteria.
+        """
+        request = CoalescedRequest(
+            SearchCriteria.load(search_criteria), datetime.now(timezone.utc)
+        )
+        with self.__lock:
+            self.__pending.append(request)
+            if self.__timer is None:
+                self.__timer = threading.Timer(self.window, self.flush)
+                self.__timer.daemon = True
+                self.__timer.start()
+        return request.future
+
+    def get(self, search_criteria: Union[dict, str, Path, SearchCriteria]) -> list[str]:
+        """
+        Submit a search criteria and wait for its messages.
+
+        :param search_criteria: Path to a JSON file, a dict, or a SearchCriteria.
+        :return: List of DCP messages matching the criteria.
+        """
+        return self.submit(search_criteria).result()
+
+    def flush(self):
+        """
+        Serve all pending requests now.
+
+        :return: None
+        """
+        with self.__lock:
+            batch, self.__pending = self.__pending, []
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+
+        for request in batch:
+            if not request.coalescable:
+                self.__serve_alone(request)
+
+        groups: dict[frozenset[int], list[CoalescedRequest]] = {}
+        for request in batch:
+            if request.coalescable:
+                groups.setdefault(request.sources, []).append(request)
+        for group in groups.values():
+            self.__serve_group(group)
+
+    def __serve_group(self, batch: list[CoalescedRequest]):
+        combined = self.combine(batch)
+        logger.info(f"Coalesced {len(batch)} requests into one session.")
+
+        try:
+            messages = self.fetch(combined)
+        except Exception as ex:
+            for request in batch:
+                request.future.set_exception(ex)
+            return
+
+        for request, routed in self.route(batch, messages).items():
+            request.future.set_result(routed)
+
+    @staticmethod
+    def combine(batch: list[CoalescedRequest]) -> SearchCriteria:
+        """
+        Build the union of the criteria of a batch in a single pass. The requests
+        should share their sources, see :meth:`flush`.
+
+        Equivalent to folding :meth:`SearchCriteria.union` over the batch, without
+        rebuilding the address set for every request.
+
+        :param batch: Coalescable requests.
+        :return: The combined SearchCriteria with absolute times.
+        """
+        addresses, sources = set(), set()
+        all_addresses = all_sources = False
+        for request in batch:
+            if request.addresses:
+                addresses.update(request.addresses)
+            else:
+                all_addresses = True
+            criteria = request.resolved
+            request_sources = criteria.sources[: criteria.num_sources]
+            if request_sources:
+                sources.update(request_sources)
+            else:
+                all_sources = True
+        return SearchCriteria(
+            TimeUtil.format_lrgs_time(min(request.since for request in batch)),
+            TimeUtil.format_lrgs_time(max(request.until for request in batch)),
+            [] if all_addresses else [DcpAddress(a) for a in sorted(addresses)],
+            [] if all_sources else sorted(sources),
+        )
+
+    @staticmethod
+    def route(
+        batch: list[CoalescedRequest], messages: list[str]
+    ) -> dict[CoalescedRequest, list[str]]:
+        """
+        Distribute the messages of a combined session to the requests they match.
+
+        :param batch: The coalesced requests.
+        :param messages: Messages returned for the combined criteria.
+        :return: dict of request to its messages.
+        """
+        by_address: dict[str, list[CoalescedRequest]] = {}
+        any_address: list[CoalescedRequest] = []
+        for request in batch:
+            if request.addresses:
+                for address in request.addresses:
+                    by_address.setdefault(address, []).append(request)
+            else:
+                any_address.append(request)
+
+        routed = {request: [] for request in batch}
+        for message in messages:
+            candidates = by_address.get(message[:8].upper(), [])
+            if any_address:
+                candidates = candidates + any_address
+            if not candidates:
+                continue
+            transmit_time = DcpHeader.parse_transmit_time(message[8:19])
+            for request in candidates:
+                if request.since <= transmit_time <= request.until:
+                    routed[request].append(message)
+        return routed
+
+    def __serve_alone(self, request: CoalescedRequest):
+        try:
+            request.future.set_result(self.fetch(request.criteria))
+        except Exception as ex:
+            request.future.set_exception(ex)
+
+    def close(self):
+        """
+        Serve any pending requests and stop batching.
+
+        :return: None
+        """
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
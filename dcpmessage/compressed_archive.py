@@ -0,0 +1,504 @@
+import itertools
+import logging
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, NamedTuple, Union
+
+from .dcp_message import DcpMessage
+from .ldds_message import LddsMessage
+
+if TYPE_CHECKING:
+    import zstandard
+
+    from .filters import MessageFilter
+
+logger = logging.getLogger(__name__)
+
+Block = Union[LddsMessage, bytes, bytearray, memoryview]
+
+
+@dataclass
+class CompressedArchiveConstants:
+    """
+    Constants of the compressed archive format.
+
+    An archive is a directory of segment files and of the zstd dictionaries they
+    were compressed with. Each segment starts with ``SEGMENT_MAGIC`` and a
+    ``SEGMENT_HEADER`` (mode, dictionary id; id 0 for no dictionary), followed by
+    records of ``length (uint32) | zstd frame``. A record holds one DCP message
+    (mode ``"message"``) or one DCP block (mode ``"block"``). Frames are written
+    without magic number and dictionary id, which are the same for the whole
+    segment.
+
+    :param SEGMENT_MAGIC: Bytes at the start of every segment file.
+    :param SEGMENT_HEADER: Struct of the mode and dictionary id of a segment.
+    :param RECORD_HEADER: Struct of the length preceding every frame.
+    :param SEGMENT_SUFFIX: File suffix of segment files.
+    :param DICTIONARY_SUFFIX: File suffix of dictionary files.
+    :param DICTIONARY_DIRECTORY: Subdirectory of the dictionaries.
+    :param DICTIONARY_SIZE: Default size in bytes of a trained dictionary.
+    :param SEGMENT_SIZE: Default size in bytes after which a new segment is started.
+    :param MODES: Record modes and their code in the segment header.
+    """
+
+    SEGMENT_MAGIC: bytes = b"DCPZST1\n"
+    SEGMENT_HEADER: struct.Struct = struct.Struct(">BI")
+    RECORD_HEADER: struct.Struct = struct.Struct(">I")
+    SEGMENT_SUFFIX: str = ".dcpzst"
+    DICTIONARY_SUFFIX: str = ".zdict"
+    DICTIONARY_DIRECTORY: str = "dictionaries"
+    DICTIONARY_SIZE: int = 16 * 1024
+    SEGMENT_SIZE: int = 256 * 1024 * 1024
+    MODES = {"block": 0, "message": 1}
+
+
+class RecordPosition(NamedTuple):
+    """
+    Location of a DCP message in a compressed archive, for random access with
+    :meth:`CompressedArchiveReader.read`.
+
+    :param segment: Number of the segment file.
+    :param offset: Byte offset of the record in the segment.
+    :param message: Index of the message in the record (always 0 in mode ``"message"``).
+    """
+
+    segment: int
+    offset: int
+    message: int = 0
+
+
+def _block_data(block: Block) -> memoryview:
+    if isinstance(block, LddsMessage):
+        return memoryview(block.message_data)[: block.message_length]
+    return memoryview(block)
+
+
+def train_dictionary(
+    samples: Iterable[Block],
+    mode: str = "message",
+    size: int = CompressedArchiveConstants.DICTIONARY_SIZE,
+) -> "zstandard.ZstdCompressionDict":
+    """
+    Train a zstd dictionary on sample DCP blocks, e.g. a day of traffic. The
+    dictionary captures what messages have in common (header layout, recurring
+    addresses, pseudo-binary payloads), so that each message compresses well on
+    its own. Requires the ``zstandard`` package.
+
+    :param samples: Sample DCP blocks, as LddsMessage or block data.
+    :param mode: ``"message"`` to train on the messages of the blocks, ``"block"``
+        to train on whole blocks; use the mode of the writer.
+    :param size: Maximum size of the dictionary in bytes.
+    :return: The dictionary; its ``dict_id()`` identifies it in the archive.
+    :raises zstandard.ZstdError: If there are too few samples to train on.
+    """
+    import zstandard
+
+    assert mode in CompressedArchiveConstants.MODES, f"Unsupported mode '{mode}'"
+    if mode == "block":
+        data = [bytes(_block_data(block)) for block in samples]
+    else:
+        data = [
+            bytes(message)
+            for block in samples
+            for message in DcpMessage.split(_block_data(block))
+        ]
+    return zstandard.train_dictionary(size, data)
+
+
+class DictionaryStore:
+    """
+    Versioned zstd dictionaries of an archive, saved as
+    ``<directory>/dictionaries/<id>.zdict``. A dictionary is never modified:
+    retraining produces a new id, and segments keep pointing to the dictionary
+    they were written with.
+
+    :param directory: The archive directory.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = (
+            Path(directory) / CompressedArchiveConstants.DICTIONARY_DIRECTORY
+        )
+        self.__loaded: dict[int, "zstandard.ZstdCompressionDict"] = {}
+
+    def __path(self, dict_id: int) -> Path:
+        return (
+            self.directory
+            / f"{dict_id:010d}{CompressedArchiveConstants.DICTIONARY_SUFFIX}"
+        )
+
+    def save(self, dictionary: "zstandard.ZstdCompressionDict") -> int:
+        """
+        Save a dictionary, unless a dictionary with its id is already saved.
+
+        :param dictionary: The dictionary.
+        :return: The dictionary id.
+        """
+        dict_id = dictionary.dict_id()
+        path = self.__path(dict_id)
+        if not path.exists():
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_suffix(".tmp")
+            temporary.write_bytes(dictionary.as_bytes())
+            os.replace(temporary, path)
+        self.__loaded[dict_id] = dictionary
+        return dict_id
+
+    def load(self, dict_id: int) -> "zstandard.ZstdCompressionDict":
+        """
+        Load a dictionary.
+
+        :param dict_id: The dictionary id.
+        :return: The dictionary.
+        :raises FileNotFoundError: If the archive has no dictionary with this id.
+        """
+        dictionary = self.__loaded.get(dict_id)
+        if dictionary is None:
+            import zstandard
+
+            dictionary = zstandard.ZstdCompressionDict(
+                self.__path(dict_id).read_bytes()
+            )
+            self.__loaded[dict_id] = dictionary
+        return dictionary
+
+    def ids(self) -> list[int]:
+        """
+        List the ids of the saved dictionaries.
+
+        :return: Sorted list of dictionary ids.
+        """
+        suffix = CompressedArchiveConstants.DICTIONARY_SUFFIX
+        return sorted(int(path.stem) for path in self.directory.glob(f"*{suffix}"))
+
+
+def _segment_header(path: Path) -> tuple[int, int]:
+    """Mode code and dictionary id of a segment."""
+    magic = CompressedArchiveConstants.SEGMENT_MAGIC
+    segment_header = CompressedArchiveConstants.SEGMENT_HEADER
+    with open(path, "rb") as f:
+        head = f.read(len(magic) + segment_header.size)
+    if head[: len(magic)] != magic or len(head) < len(magic) + segment_header.size:
+        raise ValueError(f"Not a dcpmessage compressed archive segment: {path}")
+    return segment_header.unpack_from(head, len(magic))
+
+
+_HEADER_SIZE = (
+    len(CompressedArchiveConstants.SEGMENT_MAGIC)
+    + CompressedArchiveConstants.SEGMENT_HEADER.size
+)
+
+
+def _complete_length(path: Path) -> int:
+    """Size of a segment up to the end of its last complete record."""
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        end = _HEADER_SIZE
+        for _, _, end in CompressedArchiveReader.record_offsets(mapping):
+            pass
+        return end
+    finally:
+        mapping.close()
+
+
+def _frame_parameters(zstandard, level: int = 3):
+    return zstandard.ZstdCompressionParameters.from_level(
+        level,
+        format=zstandard.FORMAT_ZSTD1_MAGICLESS,
+        write_dict_id=False,
+        write_checksum=False,
+        write_content_size=True,
+    )
+
+
+class CompressedArchiveWriter:
+    """
+    Append DCP blocks to a zstd compressed archive, compressing every message
+    (mode ``"message"``) or every block (mode ``"block"``) as its own frame with
+    a shared dictionary. Mode ``"message"`` makes any message readable without
+    decompressing its neighbours; mode ``"block"`` compresses slightly better.
+    Requires the ``zstandard`` package.
+
+    Writing resumes in the newest segment of an existing archive if it has the
+    same mode and dictionary; otherwise a new segment is started. A record torn by
+    a crash at the end of the resumed segment is truncated first.
+
+    :param directory: The archive directory (created if missing).
+    :param dictionary: Dictionary from :func:`train_dictionary`, saved in the archive
+        (default: no dictionary).
+    :param mode: ``"message"`` or ``"block"``.
+    :param level: zstd compression level.
+    :param segment_size: Size in bytes after which a new segment is started.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        dictionary: "zstandard.ZstdCompressionDict" = None,
+        mode: str = "message",
+        level: int = 3,
+        segment_size: int = CompressedArchiveConstants.SEGMENT_SIZE,
+    ):
+        import zstandard
+
+        assert mode in CompressedArchiveConstants.MODES, f"Unsupported mode '{mode}'"
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.mode = mode
+        self.segment_size = segment_size
+        self.dict_id = 0
+        if dictionary is not None:
+            self.dict_id = DictionaryStore(self.directory).save(dictionary)
+        self.__compressor = zstandard.ZstdCompressor(
+            dict_data=dictionary, compression_params=_frame_parameters(zstandard, level)
+        )
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+
+        segments = CompressedArchiveReader(self.directory).segments()
+        self.segment_index = int(segments[-1].stem) if segments else 0
+        if (
+            segments
+            and os.path.getsize(segments[-1]) >= _HEADER_SIZE
+            and _segment_header(segments[-1]) != self.__header()
+        ):
+            self.segment_index += 1
+        self.file = None
+        self.__open_segment()
+
+    def __header(self) -> tuple[int, int]:
+        return CompressedArchiveConstants.MODES[self.mode], self.dict_id
+
+    def __open_segment(self):
+        suffix = CompressedArchiveConstants.SEGMENT_SUFFIX
+        path = self.directory / f"{self.segment_index:08d}{suffix}"
+        if path.exists():
+            size = os.path.getsize(path)
+            complete = _complete_length(path) if size >= _HEADER_SIZE else 0
+            if complete < size:
+                logger.warning(
+                    f"Truncating torn record at {path}:{complete} ({size - complete} bytes)"
+                )
+                os.truncate(path, complete)
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(CompressedArchiveConstants.SEGMENT_MAGIC)
+            self.file.write(
+                CompressedArchiveConstants.SEGMENT_HEADER.pack(*self.__header())
+            )
+
+    def append(self, block: Block) -> list[RecordPosition]:
+        """
+        Append the messages of a DCP block to the archive.
+
+        :param block: An LddsMessage DCP block, or the block data itself.
+        :return: The position of every message of the block, in order.
+        :raises ValueError: In mode ``"message"``, if the block holds a corrupt message.
+        """
+        data = _block_data(block)
+        # split first, so that a corrupt block leaves no partial record behind
+        messages = list(DcpMessage.split(data))
+        if self.file.tell() >= self.segment_size:
+            self.file.close()
+            self.segment_index += 1
+            self.__open_segment()
+
+        if self.mode == "block":
+            offset = self.__write(data)
+            return [
+                RecordPosition(self.segment_index, offset, index)
+                for index in range(len(messages))
+            ]
+        return [
+            RecordPosition(self.segment_index, self.__write(message))
+            for message in messages
+        ]
+
+    def __write(self, data: memoryview) -> int:
+        offset = self.file.tell()
+        frame = self.__compressor.compress(data)
+        self.file.write(CompressedArchiveConstants.RECORD_HEADER.pack(len(frame)))
+        self.file.write(frame)
+        self.raw_bytes += len(data)
+        self.compressed_bytes += (
+            len(frame) + CompressedArchiveConstants.RECORD_HEADER.size
+        )
+        return offset
+
+    @property
+    def ratio(self) -> float:
+        """Uncompressed bytes per stored byte of the records written so far."""
+        return self.raw_bytes / self.compressed_bytes if self.compressed_bytes else 0.0
+
+    def flush(self):
+        """
+        Flush buffered records to the current segment.
+
+        :return: None
+        """
+        self.file.flush()
+
+    def close(self):
+        """
+        Close the current segment.
+
+        :return: None
+        """
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class CompressedArchiveReader:
+    """
+    Read a zstd compressed archive through memory-mapped segments. Records are
+    located by reading their length prefixes only, and decompressed on demand.
+    Not safe to share between threads; use one reader per thread.
+
+    :param directory: The archive directory.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.dictionaries = DictionaryStore(self.directory)
+        self.__decompressors: dict[int, "zstandard.ZstdDecompressor"] = {}
+
+    def segments(self) -> list[Path]:
+        """
+        List the segment files of the archive in write order.
+
+        :return: Sorted list of segment paths.
+        """
+        suffix = CompressedArchiveConstants.SEGMENT_SUFFIX
+        return sorted(self.directory.glob(f"*{suffix}"))
+
+    def __segment_path(self, segment: int) -> Path:
+        suffix = CompressedArchiveConstants.SEGMENT_SUFFIX
+        return self.directory / f"{segment:08d}{suffix}"
+
+    def __decompressor(self, dict_id: int) -> "zstandard.ZstdDecompressor":
+        decompressor = self.__decompressors.get(dict_id)
+        if decompressor is None:
+            import zstandard
+
+            decompressor = zstandard.ZstdDecompressor(
+                dict_data=self.dictionaries.load(dict_id) if dict_id else None,
+                format=zstandard.FORMAT_ZSTD1_MAGICLESS,
+            )
+            self.__decompressors[dict_id] = decompressor
+        return decompressor
+
+    @staticmethod
+    def record_offsets(segment: memoryview) -> Iterator[tuple[int, int, int]]:
+        """
+        Iterate over the records of a segment.
+
+        :param segment: The contents of a segment file.
+        :return: Iterator of (record offset, frame start, frame end).
+        """
+        record_header = CompressedArchiveConstants.RECORD_HEADER
+        offset = _HEADER_SIZE
+        end_of_segment = len(segment)
+        while offset + record_header.size <= end_of_segment:
+            (length,) = record_header.unpack_from(segment, offset)
+            start = offset + record_header.size
+            if start + length > end_of_segment:
+                logger.debug("Truncated record at end of segment")
+                return
+            yield offset, start, start + length
+            offset = start + length
+
+    def iter_records(self) -> Iterator[tuple[RecordPosition, str, bytes]]:
+        """
+        Iterate over all records of the archive, decompressed.
+
+        :return: Iterator of (position, mode, data) tuples; data is a message in
+            mode ``"message"`` and a block in mode ``"block"``.
+        """
+        modes = {code: mode for mode, code in CompressedArchiveConstants.MODES.items()}
+        for path in self.segments():
+            if os.path.getsize(path) == 0:
+                continue
+            mode_code, dict_id = _segment_header(path)
+            decompressor = self.__decompressor(dict_id)
+            with open(path, "rb") as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            segment = memoryview(mapping)
+            try:
+                for offset, start, end in self.record_offsets(segment):
+                    data = decompressor.decompress(segment[start:end])
+                    yield RecordPosition(int(path.stem), offset), modes[mode_code], data
+            finally:
+                segment.release()
+                try:
+                    mapping.close()
+                except BufferError:
+                    # closed once the last slice is garbage collected
+                    pass
+
+    def iter_messages(
+        self, message_filter: "MessageFilter" = None
+    ) -> Iterator[tuple[RecordPosition, bytes]]:
+        """
+        Iterate over all DCP messages of the archive with their positions.
+
+        :param message_filter: Yield only messages passing this filter (default: all).
+        :return: Iterator of (position, message) tuples.
+        """
+        for position, mode, data in self.iter_records():
+            if mode == "message":
+                if message_filter is None or message_filter(
+                    data[: DcpMessage.HEADER_LENGTH]
+                ):
+                    yield position, data
+                continue
+            for index, message in enumerate(DcpMessage.split(data)):
+                if message_filter is None or message_filter(
+                    message[: DcpMessage.HEADER_LENGTH]
+                ):
+                    yield position._replace(message=index), bytes(message)
+
+    def __iter__(self) -> Iterator[bytes]:
+        return (message for _, message in self.iter_messages())
+
+    def read(self, position: RecordPosition) -> bytes:
+        """
+        Read a single DCP message. In mode ``"message"`` only that message is
+        decompressed; in mode ``"block"`` its block is.
+
+        :param position: Position returned by the writer or :meth:`iter_messages`.
+        :return: The DCP message.
+        :raises ValueError: If there is no record at the position.
+        :raises IndexError: If the block has no message at the position.
+        """
+        path = self.__segment_path(position.segment)
+        mode_code, dict_id = _segment_header(path)
+        record_header = CompressedArchiveConstants.RECORD_HEADER
+        with open(path, "rb") as f:
+            f.seek(position.offset)
+            head = f.read(record_header.size)
+            if len(head) < record_header.size:
+                raise ValueError(f"No record at {position}")
+            (length,) = record_header.unpack(head)
+            frame = f.read(length)
+        if len(frame) < length:
+            raise ValueError(f"Truncated record at {position}")
+        data = self.__decompressor(dict_id).decompress(frame)
+        if mode_code == CompressedArchiveConstants.MODES["message"]:
+            return data
+        message = next(
+            itertools.islice(DcpMessage.split(data), position.message, None), None
+        )
+        if message is None:
+            raise IndexError(f"No message at {position}")
+        return bytes(message)
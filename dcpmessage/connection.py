@@ -0,0 +1,264 @@
+import errno
+import logging
+import selectors
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+AddressInfo = tuple[int, int, int, str, tuple]
+
+
+@dataclass(frozen=True)
+class SocketOptions:
+    """
+    Options applied to the sockets of LDDS sessions, before they connect.
+
+    :param tcp_nodelay: Disable Nagle's algorithm, so that small requests are sent
+        immediately instead of waiting for the acknowledgement of the previous one.
+    :param receive_buffer: ``SO_RCVBUF`` size in bytes (default: system default). A
+        larger buffer keeps sustained block downloads from stalling the sender.
+    :param keepalive: Enable TCP keepalive probes on idle connections.
+    :param keepalive_idle: Seconds of idleness before the first probe (``TCP_KEEPIDLE``).
+    :param keepalive_interval: Seconds between probes (``TCP_KEEPINTVL``).
+    :param keepalive_count: Unanswered probes before the connection is dropped (``TCP_KEEPCNT``).
+    """
+
+    tcp_nodelay: bool = True
+    receive_buffer: Optional[int] = None
+    keepalive: bool = False
+    keepalive_idle: Optional[int] = None
+    keepalive_interval: Optional[int] = None
+    keepalive_count: Optional[int] = None
+
+    def apply(self, sock: socket.socket):
+        """
+        Set the options on a socket. Keepalive timings not supported by the
+        platform are ignored.
+
+        :param sock: The socket.
+        :return: None
+        """
+        if self.tcp_nodelay:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.receive_buffer is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.receive_buffer)
+        if self.keepalive:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            for name, value in (
+                ("TCP_KEEPIDLE", self.keepalive_idle),
+                ("TCP_KEEPINTVL", self.keepalive_interval),
+                ("TCP_KEEPCNT", self.keepalive_count),
+            ):
+                if value is not None and hasattr(socket, name):
+                    sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, name), value)
+
+
+class ResolverCache:
+    """
+    Thread-safe cache of ``getaddrinfo`` results, so that frequent sessions to the
+    same server do not resolve its name every time.
+
+    :param ttl: Seconds a resolution is reused.
+    :param max_entries: Maximum number of cached (host, port) entries.
+    """
+
+    def __init__(self, ttl: float = 300, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.__entries: dict[tuple[str, int], tuple[float, list[AddressInfo]]] = {}
+        self.__lock = threading.Lock()
+
+    def resolve(self, host: str, port: int) -> list[AddressInfo]:
+        """
+        Resolve the TCP addresses of a server, from the cache if not expired.
+
+        :param host: Hostname or IP address.
+        :param port: Port number.
+        :return: ``getaddrinfo`` results, IPv4 and IPv6.
+        :raises socket.gaierror: If the name cannot be resolved.
+        """
+        key = (host, port)
+        now = time.monotonic()
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        addresses = socket.getaddrinfo(host, port, socket.AF_UNSPEC, socket.SOCK_STREAM)
+        with self.__lock:
+            if len(self.__entries) >= self.max_entries:
+                self.__entries = {k: v for k, v in self.__entries.items() if v[0] > now}
+                while len(self.__entries) >= self.max_entries:
+                    del self.__entries[next(iter(self.__entries))]
+            self.__entries[key] = (now + self.ttl, addresses)
+        return addresses
+
+    def invalidate(self, host: str, port: int):
+        """
+        Forget the resolution of a server, e.g. after it could not be reached.
+
+        :param host: Hostname or IP address.
+        :param port: Port number.
+        :return: None
+        """
+        with self.__lock:
+            self.__entries.pop((host, port), None)
+
+
+DEFAULT_RESOLVER = ResolverCache()
+
+
+def interleave_families(addresses: list[AddressInfo]) -> list[AddressInfo]:
+    """
+    Order addresses alternating between address families, starting with the
+    family of the first (preferred) address, as in RFC 8305.
+
+    :param addresses: ``getaddrinfo`` results.
+    :return: The reordered addresses.
+    """
+    if not addresses:
+        return []
+    first_family = addresses[0][0]
+    preferred = [a for a in addresses if a[0] == first_family]
+    others = [a for a in addresses if a[0] != first_family]
+    ordered = []
+    for index in range(max(len(preferred), len(others))):
+        ordered.extend(
+            group[index] for group in (preferred, others) if index < len(group)
+        )
+    return ordered
+
+
+def connect_addresses(
+    addresses: list[AddressInfo],
+    timeout: Optional[float],
+    options: SocketOptions = None,
+    attempt_delay: float = 0.25,
+) -> socket.socket:
+    """
+    Connect to the first address that answers, Happy Eyeballs style: a new
+    attempt is started every ``attempt_delay`` seconds, or as soon as the previous
+    one fails, while earlier attempts keep running. The first connection
+    established wins and the other attempts are closed.
+
+    :param addresses: ``getaddrinfo`` results, in the order to try them.
+    :param timeout: Overall seconds to wait for a connection (None: no limit).
+    :param options: Socket options set before connecting (default: ``SocketOptions()``).
+    :param attempt_delay: Seconds before the next address is tried in parallel.
+    :return: The connected socket, in blocking mode.
+    :raises TimeoutError: If no connection was established in time.
+    :raises OSError: The last error if every address failed.
+    """
+    options = options or SocketOptions()
+    pending = list(addresses)
+    attempts: dict[socket.socket, AddressInfo] = {}
+    last_error: OSError = None
+    deadline = None if timeout is None else time.monotonic() + timeout
+    next_attempt = time.monotonic()
+    timed_out = False
+
+    with selectors.DefaultSelector() as selector:
+        try:
+            while pending or attempts:
+                now = time.monotonic()
+                if pending and (now >= next_attempt or not attempts):
+                    family, type_, proto, _, address = pending.pop(0)
+                    sock = socket.socket(family, type_, proto)
+                    try:
+                        options.apply(sock)
+                        sock.setblocking(False)
+                        code = sock.connect_ex(address)
+                    except OSError as ex:
+                        sock.close()
+                        last_error = ex
+                        continue
+                    if code == 0:
+                        return _connected(sock)
+                    if code not in (errno.EINPROGRESS, errno.EWOULDBLOCK):
+                        sock.close()
+                        last_error = OSError(code, errno.errorcode.get(code, ""))
+                        continue
+                    attempts[sock] = address
+                    selector.register(sock, selectors.EVENT_WRITE)
+                    next_attempt = now + attempt_delay
+                    continue
+
+                wait = None if deadline is None else deadline - now
+                if pending:
+                    wait = (
+                        next_attempt - now
+                        if wait is None
+                        else min(wait, next_attempt - now)
+                    )
+                if wait is not None and wait <= 0 and not pending:
+                    timed_out = True
+                    break
+                for key, _ in selector.select(
+                    max(wait, 0) if wait is not None else None
+                ):
+                    sock = key.fileobj
+                    selector.unregister(sock)
+                    address = attempts.pop(sock)
+                    code = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    if code == 0:
+                        return _connected(sock)
+                    logger.debug(
+                        f"Cannot connect to {address}: {errno.errorcode.get(code, code)}"
+                    )
+                    sock.close()
+                    last_error = OSError(code, errno.errorcode.get(code, ""))
+                    # a failed attempt starts the next one right away
+                    next_attempt = time.monotonic()
+                if deadline is not None and time.monotonic() >= deadline:
+                    timed_out = True
+                    break
+        finally:
+            for sock in attempts:
+                sock.close()
+
+    if timed_out:
+        raise TimeoutError("timed out")
+    if last_error is None:
+        raise OSError("No address to connect to")
+    raise last_error
+
+
+def _connected(sock: socket.socket) -> socket.socket:
+    sock.setblocking(True)
+    return sock
+
+
+def connect_tcp(
+    host: str,
+    port: int,
+    timeout: Optional[float],
+    options: SocketOptions = None,
+    resolver: ResolverCache = None,
+    attempt_delay: float = 0.25,
+) -> socket.socket:
+    """
+    Resolve a server through the resolver cache and connect to it over IPv4
+    or IPv6, see :func:`connect_addresses`.
+
+    :param host: Hostname or IP address.
+    :param port: Port number.
+    :param timeout: Overall seconds to wait for a connection (None: no limit).
+    :param options: Socket options set before connecting (default: ``SocketOptions()``).
+    :param resolver: Resolver cache (default: ``DEFAULT_RESOLVER``).
+    :param attempt_delay: Seconds before the next address is tried in parallel.
+    :return: The connected socket, in blocking mode.
+    :raises TimeoutError: If no connection was established in time.
+    :raises OSError: If the name cannot be resolved or every address failed.
+    """
+    resolver = resolver or DEFAULT_RESOLVER
+    addresses = interleave_families(resolver.resolve(host, port))
+    try:
+        return connect_addresses(addresses, timeout, options, attempt_delay)
+    except OSError:
+        # the server may have moved: resolve again on the next attempt
+        resolver.invalidate(host, port)
+        raise
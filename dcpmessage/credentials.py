@@ -1,6 +1,7 @@
 import hashlib
 from datetime import datetime
 
+from dcpmessage.ldds_message import LddsMessageConstants
 from dcpmessage.utils import ByteUtil
 
 
@@ -118,7 +119,12 @@ class Credentials:
         authenticator_bytes = md.digest()
         return ByteUtil.to_hex_string(authenticator_bytes)
 
-    def get_authenticated_hello(self, time: datetime, hash_algo: HashAlgo):
+    def get_authenticated_hello(
+        self,
+        time: datetime,
+        hash_algo: HashAlgo,
+        protocol_version: int = LddsMessageConstants.PROTOCOL_VERSION,
+    ):
         """
         Create an authenticated hello message for the user.
 
@@ -127,11 +133,11 @@ class Credentials:
 
         :param time: The current time as a datetime object.
         :param hash_algo: The hashing algorithm to use for the authenticator hash (e.g., Sha1, Sha256).
+        :param protocol_version: DDS protocol version announced to the server.
         :return: The authenticated hello message as a string.
         """
         authenticator_hash = self.get_authenticator_hash(time, hash_algo)
         time_str = time.strftime("%y%j%H%M%S")
-        protocol_version = 14
 
         authenticated_hello = (
             f"{self.username} {time_str} {authenticator_hash} {protocol_version}"
@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Union
+
+EPOCH_2000 = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class DcpHeader:
+    """
+    Fields of the fixed 37-byte header at the start of every DCP message.
+
+    :param address: DCP address (offset 0, 8 characters).
+    :param transmit_time: Transmit time in UTC (offset 8, ``YYDDDHHMMSS``).
+    :param failure_code: Failure code, e.g. ``G`` or ``?`` (offset 19).
+    :param signal_strength: Signal strength in dBm (offset 20, 2 digits).
+    :param frequency_offset: Frequency offset (offset 22, 2 characters).
+    :param modulation_index: Modulation index (offset 24).
+    :param data_quality: Data quality indicator (offset 25).
+    :param goes_channel: GOES channel number (offset 26, 3 digits).
+    :param spacecraft: GOES spacecraft, ``E`` or ``W`` (offset 29).
+    :param data_source: Data source code (offset 30, 2 characters).
+    :param message_length: Length of the message data after the header (offset 32, 5 digits).
+    """
+
+    address: str
+    transmit_time: datetime
+    failure_code: str
+    signal_strength: int
+    frequency_offset: str
+    modulation_index: str
+    data_quality: str
+    goes_channel: int
+    spacecraft: str
+    data_source: str
+    message_length: int
+
+    @classmethod
+    def parse(cls, message: Union[str, bytes, bytearray, memoryview]) -> "DcpHeader":
+        """
+        Parse the header of a DCP message.
+
+        :param message: The DCP message, or at least its first 37 bytes.
+        :return: A DcpHeader instance.
+        :raises ValueError: If a numeric field cannot be parsed.
+        """
+        if not isinstance(message, str):
+            message = str(message[:37], "ascii")
+        return cls(
+            address=message[0:8],
+            transmit_time=cls.parse_transmit_time(message[8:19]),
+            failure_code=message[19],
+            signal_strength=int(message[20:22]),
+            frequency_offset=message[22:24],
+            modulation_index=message[24],
+            data_quality=message[25],
+            goes_channel=int(message[26:29]),
+            spacecraft=message[29],
+            data_source=message[30:32],
+            message_length=int(message[32:37]),
+        )
+
+    @staticmethod
+    def parse_transmit_time(time_str: str) -> datetime:
+        """
+        Convert a ``YYDDDHHMMSS`` transmit time into a datetime.
+
+        :param time_str: Transmit time field of a DCP header.
+        :return: Timezone-aware datetime in UTC.
+        :raises ValueError: If the field is not numeric.
+        """
+        return EPOCH_2000.replace(year=2000 + int(time_str[0:2])) + timedelta(
+            days=int(time_str[2:5]) - 1,
+            hours=int(time_str[5:7]),
+            minutes=int(time_str[7:9]),
+            seconds=int(time_str[9:11]),
+        )
+
+    @staticmethod
+    def transmit_timestamp(message: Union[str, bytes, bytearray, memoryview]) -> int:
+        """
+        Return the transmit time of a DCP message as POSIX seconds.
+
+        Cheaper than a full parse when only the time is needed (e.g. for ordering).
+
+        :param message: The DCP message, or at least its first 19 bytes.
+        :return: Transmit time in seconds since the epoch.
+        """
+        if not isinstance(message, str):
+            message = str(message[8:19], "ascii")
+        else:
+            message = message[8:19]
+        return int(DcpHeader.parse_transmit_time(message).timestamp())
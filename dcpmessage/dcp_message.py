@@ -1,14 +1,50 @@
+import functools
 import logging
+import re
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Union
+from typing import TYPE_CHECKING, Callable, Iterator, Union
 
+from .dcp_header import DcpHeader
 from .ldds_client import LddsClient
 from .ldds_message import LddsMessage
+from .observers import SessionObserver
 from .search_criteria import SearchCriteria
+from .utils import TimeUtil
+
+if TYPE_CHECKING:
+    from .cache import ResultCache
+    from .connection import SocketOptions
+    from .events import LrgsEvent
+    from .filters import MessageFilter
+    from .store import MessageStore
 
 logger = logging.getLogger(__name__)
 
 
+class RetrievalResult(list):
+    """
+    List of the DCP messages returned by :meth:`DcpMessage.get`, telling whether
+    the retrieval was cut short by its deadline.
+
+    :param messages: The DCP messages.
+    :param complete: False if the deadline stopped the session before the server
+        reported the end of the messages.
+    :param resume_token: For an incomplete result, the ``DRS_SINCE`` time to
+        continue from (the latest transmit time of the last block received); the
+        messages of that second may be returned again. None if complete.
+    """
+
+    def __init__(
+        self, messages: list[str] = (), complete: bool = True, resume_token: str = None
+    ):
+        super().__init__(messages)
+        self.complete = complete
+        self.resume_token = resume_token
+
+
 class DcpMessage:
     """
     Class for handling DCP messages, including fetching and processing them
@@ -17,20 +53,42 @@ class DcpMessage:
 
     :param DATA_LENGTH: Standard length of the data field in a DCP message.
     :param: HEADER_LENGTH: Standard length of the header in a DCP message.
+    :param HEADER_START_PATTERN: Regular expression matching the address and transmit
+        time at the start of a header.
+    :param HEADER_PATTERN: Regular expression matching a structurally valid header.
     """
 
     DATA_LENGTH = 32
     HEADER_LENGTH = 37
+    # structure of a valid header: hex address, YYDDDHHMMSS, 13 other bytes, length
+    HEADER_START_PATTERN = re.compile(
+        rb"[0-9A-Fa-f]{8}"
+        rb"\d\d(?:00[1-9]|0[1-9]\d|[12]\d\d|3[0-5]\d|36[0-6])"
+        rb"(?:[01]\d|2[0-3])[0-5]\d[0-5]\d"
+    )
+    HEADER_PATTERN = re.compile(
+        HEADER_START_PATTERN.pattern + rb".{13}(\d{5})", re.DOTALL
+    )
 
     @staticmethod
     def get(
         username: str,
         password: str,
-        search_criteria: Union[dict, str, Path],
+        search_criteria: Union[dict, str, Path, SearchCriteria],
         host: str,
         port: int = 16003,
         timeout: int = 30,
-    ):
+        observer: SessionObserver = None,
+        capture: Union[str, Path] = None,
+        store: "MessageStore" = None,
+        cache: "ResultCache" = None,
+        message_filter: "MessageFilter" = None,
+        tolerant: bool = False,
+        deadline: float = None,
+        socket_options: "SocketOptions" = None,
+        secondary: str = None,
+        on_event: Callable[["LrgsEvent"], None] = None,
+    ) -> RetrievalResult:
         """
         Fetches DCP messages from a server based on provided search criteria.
 
@@ -40,79 +98,459 @@ class DcpMessage:
 
         :param username: Username for server authentication.
         :param password: Password for server authentication.
-        :param search_criteria: File path to search criteria or search criteria as a string.
+        :param search_criteria: File path to search criteria, search criteria as a dict,
+            or a SearchCriteria.
         :param host: Hostname or IP address of the server.
         :param port: Port number for server connection (default: 16003).
         :param timeout: Connection timeout in seconds (default: 30 seconds).
             Will be passed to `socket.settimeout <https://docs.python.org/3/library/socket.html#socket.socket.settimeout>`_
+        :param observer: Observer notified of session timings and volumes (default: no-op).
+        :param capture: Path of a capture file to append every sent and received frame to
+            (default: no recording). See :class:`dcpmessage.replay.ReplayClient`.
+        :param store: Local message store. Criteria already covered by the store are
+            answered without connecting; fetched messages are saved to it (default: no store).
+        :param cache: Result cache. Relative criteria times are resolved on the client and
+            identical criteria within the cache TTL are answered from the cache (default: no cache).
+        :param message_filter: Keep only messages passing this filter, evaluated on the raw
+            header bytes before decoding (default: keep all). The store and the cache
+            still receive every message of the criteria.
+        :param tolerant: Skip corrupt messages of a block instead of failing, see
+            :meth:`split` (default: False).
+        :param deadline: Seconds from now by which the call must return, e.g. the time
+            left before a function timeout (default: no limit). Every socket operation
+            is limited to the time left, and block requests stop early enough to end
+            the session with a goodbye. The messages received so far are then
+            returned with ``complete`` False and a ``resume_token``; incomplete
+            results are not saved to the store or the cache.
+        :param socket_options: Options of the socket, e.g. a larger receive buffer for
+            large retrievals (default: ``SocketOptions()``).
+        :param secondary: Backup server to fill the gaps of the result of ``host`` from,
+            see :func:`dcpmessage.reconcile.reconcile` (default: no reconciliation).
+            Cannot be combined with ``store``, ``cache`` or ``deadline``.
+        :param on_event: Called on a background thread with every LRGS server event
+            logged during the session (default: events are not requested). See
+            :class:`dcpmessage.events.EventDispatcher`.
         :return: List of DCP messages retrieved from the server.
+        :raises DeadlineExceeded: If the deadline passes before any block is requested.
         """
+        if secondary is not None:
+            if store is not None or cache is not None or deadline is not None:
+                raise ValueError(
+                    "A secondary server cannot be combined with store, cache or deadline."
+                )
+            from .reconcile import reconcile
 
-        client = LddsClient(host=host, port=port, timeout=timeout)
+            return reconcile(
+                username=username,
+                password=password,
+                search_criteria=search_criteria,
+                primary=host,
+                secondary=secondary,
+                port=port,
+                timeout=timeout,
+                observer=observer,
+                capture=capture,
+                message_filter=message_filter,
+                tolerant=tolerant,
+                socket_options=socket_options,
+                on_event=on_event,
+            )
 
-        try:
-            client.connect()
-        except Exception as e:
-            logger.error("Failed to connect to server.")
-            raise e
+        deadline_time = None
+        if deadline is not None:
+            deadline_time = time.monotonic() + deadline
+        criteria = SearchCriteria.load(search_criteria)
 
-        try:
-            client.authenticate_user(username, password)
-        except Exception as e:
-            logger.error("Failed to authenticate user.")
-            client.disconnect()
-            raise e
+        now = datetime.now(timezone.utc)
+        cache_key = None
+        if cache is not None:
+            try:
+                # only the key is rounded; the server gets the criteria as of now
+                cache_key = (
+                    host,
+                    port,
+                    criteria.resolve(now, cache.granularity).canonical_key(),
+                )
+                criteria = criteria.resolve(now)
+            except ValueError as ex:
+                logger.debug(f"Search criteria not cacheable: {ex}")
+            else:
+                cached_messages = cache.get(cache_key)
+                if cached_messages is not None:
+                    logger.info("Search criteria answered from result cache.")
+                    return RetrievalResult(
+                        DcpMessage.filter(cached_messages, message_filter)
+                    )
+
+        if store is not None:
+            stored_messages = store.lookup(criteria, now)
+            if stored_messages is not None:
+                return RetrievalResult(
+                    DcpMessage.filter(stored_messages, message_filter)
+                )
+
+        # the store and cache keep the complete result of the criteria
+        keep_all = store is not None or cache_key is not None
+
+        with DcpMessage._session(
+            username=username,
+            password=password,
+            criteria=criteria,
+            host=host,
+            port=port,
+            timeout=timeout,
+            observer=observer,
+            capture=capture,
+            deadline=deadline_time,
+            socket_options=socket_options,
+            on_event=on_event,
+        ) as client:
+            # Retrieve the DCP block and process it into individual messages
+            dcp_blocks = client.request_dcp_blocks()
+            start = time.perf_counter()
+            dcp_messages = DcpMessage.explode(
+                dcp_blocks, None if keep_all else message_filter, tolerant
+            )
+            client.observer.on_explode(
+                time.perf_counter() - start, len(dcp_blocks), len(dcp_messages)
+            )
+
+        if client.deadline_reached:
+            resume_token = DcpMessage.__resume_token(dcp_blocks, criteria, now)
+            logger.warning(
+                f"Deadline reached after {len(dcp_messages)} messages; "
+                f"resume from {resume_token}"
+            )
+            return RetrievalResult(
+                DcpMessage.filter(dcp_messages, message_filter)
+                if keep_all
+                else dcp_messages,
+                complete=False,
+                resume_token=resume_token,
+            )
+
+        if store is not None:
+            store.save(criteria, dcp_messages, now)
+        if cache_key is not None:
+            cache.put(cache_key, dcp_messages)
+        if keep_all:
+            return RetrievalResult(DcpMessage.filter(dcp_messages, message_filter))
+        return RetrievalResult(dcp_messages)
 
-        match search_criteria:
-            case str() | Path():
-                criteria = SearchCriteria.from_file(search_criteria)
-            case dict():
-                criteria = SearchCriteria.from_dict(search_criteria)
-            case _:
-                raise TypeError("search_criteria must be a filepath or a dict.")
+    @staticmethod
+    def __resume_token(
+        dcp_blocks: list[LddsMessage], criteria: SearchCriteria, now: datetime
+    ) -> str:
+        """The latest transmit time of the last block, or the start of the criteria."""
+        if not dcp_blocks:
+            try:
+                # a relative start would point elsewhere when the token is used
+                return TimeUtil.format_lrgs_time(criteria.window(now)[0])
+            except ValueError:
+                return criteria.lrgs_since
+        last_block = dcp_blocks[-1]
+        messages = DcpMessage.split(
+            memoryview(last_block.message_data)[: last_block.message_length],
+            tolerant=True,
+            on_skip=lambda start, end: None,
+        )
+        timestamps = [DcpHeader.transmit_timestamp(message) for message in messages]
+        if not timestamps:
+            return DcpMessage.__resume_token(dcp_blocks[:-1], criteria, now)
+        return TimeUtil.format_lrgs_time(
+            datetime.fromtimestamp(max(timestamps), timezone.utc)
+        )
+
+    @staticmethod
+    def stream(
+        username: str,
+        password: str,
+        search_criteria: Union[dict, str, Path, SearchCriteria],
+        host: str,
+        port: int = 16003,
+        timeout: int = 30,
+        observer: SessionObserver = None,
+        capture: Union[str, Path] = None,
+        message_filter: "MessageFilter" = None,
+        tolerant: bool = False,
+        socket_options: "SocketOptions" = None,
+        on_event: Callable[["LrgsEvent"], None] = None,
+    ) -> Iterator[str]:
+        """
+        Fetches DCP messages like :meth:`get`, yielding the messages of each DCP
+        block as soon as the block is received instead of collecting the whole
+        session in memory.
+
+        The session is closed when the iterator is exhausted or closed.
+
+        :param username: Username for server authentication.
+        :param password: Password for server authentication.
+        :param search_criteria: File path to search criteria, search criteria as a dict,
+            or a SearchCriteria.
+        :param host: Hostname or IP address of the server.
+        :param port: Port number for server connection (default: 16003).
+        :param timeout: Connection timeout in seconds (default: 30 seconds).
+        :param observer: Observer notified of session timings and volumes (default: no-op).
+        :param capture: Path of a capture file to append every sent and received frame to
+            (default: no recording).
+        :param message_filter: Keep only messages passing this filter, evaluated on the raw
+            header bytes before decoding (default: keep all).
+        :param tolerant: Skip corrupt messages of a block instead of failing, see
+            :meth:`split` (default: False).
+        :param socket_options: Options of the socket (default: ``SocketOptions()``).
+        :param on_event: Called on a background thread with every LRGS server event
+            logged during the session (default: events are not requested).
+        :return: Iterator of DCP messages.
+        """
+        criteria = SearchCriteria.load(search_criteria)
+        with DcpMessage._session(
+            username=username,
+            password=password,
+            criteria=criteria,
+            host=host,
+            port=port,
+            timeout=timeout,
+            observer=observer,
+            capture=capture,
+            socket_options=socket_options,
+            on_event=on_event,
+        ) as client:
+            for dcp_block in client.iter_dcp_blocks():
+                start = time.perf_counter()
+                dcp_messages = DcpMessage.explode([dcp_block], message_filter, tolerant)
+                client.observer.on_explode(
+                    time.perf_counter() - start, 1, len(dcp_messages)
+                )
+                yield from dcp_messages
+
+    @staticmethod
+    @contextmanager
+    def _session(
+        username: str,
+        password: str,
+        criteria: SearchCriteria,
+        host: str,
+        port: int,
+        timeout: int,
+        observer: SessionObserver,
+        capture: Union[str, Path],
+        deadline: float = None,
+        socket_options: "SocketOptions" = None,
+        on_event: Callable[["LrgsEvent"], None] = None,
+    ) -> Iterator[LddsClient]:
+        """
+        Open an authenticated LDDS session with the search criteria sent, and
+        say goodbye when the ``with`` block completes, unless the connection was
+        already closed by the deadline.
+        """
+        capture_writer = None
+        if capture is not None:
+            from .capture import CaptureWriter
+
+            capture_writer = CaptureWriter(capture)
+        dispatcher = None
+        if on_event is not None:
+            from .events import EventDispatcher
+
+            dispatcher = EventDispatcher(on_event)
+        client = LddsClient(
+            host=host,
+            port=port,
+            timeout=timeout,
+            observer=observer,
+            capture=capture_writer,
+            deadline=deadline,
+            socket_options=socket_options,
+            event_handler=None if dispatcher is None else dispatcher.dispatch,
+        )
 
         try:
-            client.send_search_criteria(criteria)
-        except Exception as e:
-            logger.error("Failed to send search criteria.")
-            client.disconnect()
-            raise e
+            try:
+                client.connect()
+            except Exception as e:
+                logger.error("Failed to connect to server.")
+                raise e
 
-        # Retrieve the DCP block and process it into individual messages
-        dcp_blocks = client.request_dcp_blocks()
-        dcp_messages = DcpMessage.explode(dcp_blocks)
+            try:
+                client.authenticate_user(username, password)
+            except Exception as e:
+                logger.error("Failed to authenticate user.")
+                client.disconnect()
+                raise e
 
-        client.send_goodbye()
-        client.disconnect()
-        return dcp_messages
+            try:
+                client.send_search_criteria(criteria)
+            except Exception as e:
+                logger.error("Failed to send search criteria.")
+                client.disconnect()
+                raise e
+
+            try:
+                yield client
+            except BaseException:
+                client.disconnect()
+                raise
+
+            if client.socket is not None:
+                client.send_goodbye()
+            client.disconnect()
+        finally:
+            if capture_writer is not None:
+                capture_writer.close()
+            if dispatcher is not None:
+                dispatcher.close()
 
     @staticmethod
     def explode(
         message_blocks: list[LddsMessage],
+        message_filter: "MessageFilter" = None,
+        tolerant: bool = False,
+        on_skip: Callable[[int, int, int], None] = None,
     ) -> list[str]:
         """
         Splits a message block bytes containing multiple DCP messages into individual messages.
 
         :param message_blocks: message block (concatenated response from the server).
+        :param message_filter: Keep only messages passing this filter; rejected messages
+            are never decoded (default: keep all). See :mod:`dcpmessage.filters`.
+        :param tolerant: Skip corrupt messages instead of failing, see :meth:`split`, and
+            decode invalid UTF-8 bytes as U+FFFD instead of raising UnicodeDecodeError.
+        :param on_skip: Called with the block index and the (start, end) offsets of
+            every byte range skipped in tolerant mode (default: log a warning).
         :return: A list of individual DCP messages.
         """
 
+        dcp_messages = []
+        errors = "replace" if tolerant else "strict"
+
+        for index, ldds_message in enumerate(message_blocks):
+            block = memoryview(ldds_message.message_data)[: ldds_message.message_length]
+            block_on_skip = None
+            if on_skip is not None:
+                block_on_skip = functools.partial(on_skip, index)
+            for dcp_message in DcpMessage.split(
+                block, message_filter, tolerant, block_on_skip
+            ):
+                dcp_messages.append(str(dcp_message, "utf-8", errors))
+
+        return dcp_messages
+
+    @staticmethod
+    def filter(
+        messages: list[str], message_filter: "MessageFilter" = None
+    ) -> list[str]:
+        """
+        Apply a filter to already decoded DCP messages.
+
+        :param messages: DCP messages.
+        :param message_filter: The filter (default: keep all).
+        :return: The messages passing the filter.
+        """
+        if message_filter is None:
+            return messages
+        header_length = DcpMessage.HEADER_LENGTH
+        return [
+            m for m in messages if message_filter(m[:header_length].encode("utf-8"))
+        ]
+
+    @staticmethod
+    def split(
+        data: Union[bytes, bytearray, memoryview],
+        message_filter: "MessageFilter" = None,
+        tolerant: bool = False,
+        on_skip: Callable[[int, int], None] = None,
+    ) -> Iterator[memoryview]:
+        """
+        Split the data of a DCP block into individual messages without copying.
+
+        By default the length field of every header is trusted. In tolerant mode
+        every header is checked against ``HEADER_PATTERN``, and a message is only
+        accepted if it ends at the end of the block, at another valid header, or at
+        a corrupt header that still starts with an address and a transmit time.
+        Otherwise its length field is taken as wrong and the message is skipped.
+        Corrupt bytes are skipped by searching for the next valid header with the
+        compiled pattern, and reported through ``on_skip``.
+
+        :param data: Concatenated DCP messages (e.g. ``LddsMessage.message_data``).
+        :param message_filter: Yield only messages passing this filter (default: all).
+        :param tolerant: Skip corrupt messages instead of failing (default: False).
+        :param on_skip: Called with the (start, end) offsets of every skipped byte
+            range in tolerant mode (default: log a warning).
+        :return: Iterator of memoryview slices of ``data``, one per DCP message.
+        """
+        if tolerant:
+            yield from DcpMessage.__split_tolerant(data, message_filter, on_skip)
+            return
+
         data_length = DcpMessage.DATA_LENGTH
         header_length = DcpMessage.HEADER_LENGTH
-        dcp_messages = []
+        block = memoryview(data)
+        end_of_block = len(block)
 
-        for ldds_message in message_blocks:
-            message = ldds_message.message_data.decode()
-            start_index = 0
-            while start_index < ldds_message.message_length:
-                # Extract the length of the current message
-                message_length = int(
-                    message[(start_index + data_length) : (start_index + header_length)]
+        start_index = 0
+        while start_index < end_of_block:
+            # Extract the length of the current message
+            message_length = int(
+                bytes(
+                    block[(start_index + data_length) : (start_index + header_length)]
                 )
-                # Extract the entire message using the determined length
-                end_index = start_index + header_length + message_length
-                dcp_message = message[start_index:end_index]
-                dcp_messages.append(dcp_message)
-                start_index += DcpMessage.HEADER_LENGTH + message_length
+            )
+            # Extract the entire message using the determined length
+            end_index = start_index + header_length + message_length
+            message = block[start_index:end_index]
+            if message_filter is None or message_filter(message):
+                yield message
+            start_index = end_index
 
-        return dcp_messages
+    @staticmethod
+    def __split_tolerant(
+        data: Union[bytes, bytearray, memoryview],
+        message_filter: "MessageFilter",
+        on_skip: Callable[[int, int], None],
+    ) -> Iterator[memoryview]:
+        if on_skip is None:
+
+            def on_skip(start: int, end: int):
+                logger.warning(f"Skipped corrupt DCP block bytes {start}-{end}")
+
+        header_length = DcpMessage.HEADER_LENGTH
+        pattern = DcpMessage.HEADER_PATTERN
+        block = memoryview(data)
+        end_of_block = len(block)
+
+        start_index = 0
+        header = pattern.match(block, 0)
+        while start_index < end_of_block:
+            if header is None:
+                # not at a valid header: resynchronize on the next one
+                header = pattern.search(block, start_index + 1)
+                resync_index = header.start() if header else end_of_block
+                on_skip(start_index, resync_index)
+                start_index = resync_index
+                continue
+
+            end_index = start_index + header_length + int(header.group(1))
+            next_header = None
+            if end_index < end_of_block:
+                next_header = pattern.match(block, end_index)
+            if end_index == end_of_block or next_header is not None:
+                message = block[start_index:end_index]
+                if message_filter is None or message_filter(message):
+                    yield message
+                start_index, header = end_index, next_header
+                continue
+
+            next_header = pattern.search(block, start_index + header_length)
+            resync_index = next_header.start() if next_header else end_of_block
+            if end_index < resync_index and DcpMessage.HEADER_START_PATTERN.match(
+                block, end_index
+            ):
+                # the next header is corrupt, not this message: keep it
+                message = block[start_index:end_index]
+                if message_filter is None or message_filter(message):
+                    yield message
+                start_index, header = end_index, None
+                continue
+            # the message does not end at a header: its length field is wrong
+            on_skip(start_index, resync_index)
+            start_index, header = resync_index, next_header
@@ -0,0 +1,325 @@
+import calendar
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Union
+
+Message = Union[str, bytes, bytearray, memoryview]
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class LogHistogram:
+    """
+    Streaming histogram with log-linear buckets, in the style of HdrHistogram.
+
+    Every power of two is split into ``sub_buckets`` equal buckets, so quantiles
+    are estimated with a relative error below ``1 / sub_buckets`` whatever the
+    range of the values. Only non-empty buckets are stored, and their number is
+    bounded by the range, so memory does not grow with the number of values.
+
+    :param sub_buckets: Buckets per power of two (a power of two).
+    :param lowest: Values below this are recorded in the first bucket.
+    """
+
+    __slots__ = ("sub_buckets", "lowest", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, sub_buckets: int = 16, lowest: float = 1.0):
+        self.sub_buckets = sub_buckets
+        self.lowest = lowest
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def record(self, value: float):
+        """
+        Record a value.
+
+        :param value: The value; negative values are recorded as 0.
+        :return: None
+        """
+        if value < 0:
+            value = 0
+        index = self.__index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def __index(self, value: float) -> int:
+        if value < self.lowest:
+            return 0
+        mantissa, exponent = math.frexp(value / self.lowest)
+        # mantissa in [0.5, 1): split each power of two into sub_buckets
+        return (
+            (exponent - 1) * self.sub_buckets
+            + int((mantissa - 0.5) * 2 * self.sub_buckets)
+            + 1
+        )
+
+    def __bound(self, index: int) -> float:
+        """Upper bound of a bucket."""
+        if index == 0:
+            return self.lowest
+        exponent, sub_bucket = divmod(index - 1, self.sub_buckets)
+        return self.lowest * 2.0**exponent * (1 + (sub_bucket + 1) / self.sub_buckets)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile.
+
+        :param q: The quantile, between 0 and 1.
+        :return: The upper bound of the bucket holding the quantile, clamped to the
+            observed minimum and maximum, or None if no value was recorded.
+        """
+        if self.count == 0:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(max(self.__bound(index), self.min), self.max)
+        return self.max
+
+    def merge(self, other: "LogHistogram"):
+        """
+        Add the values of another histogram with the same buckets.
+
+        :param other: The other histogram.
+        :return: None
+        """
+        assert (other.sub_buckets, other.lowest) == (self.sub_buckets, self.lowest), (
+            "Histograms have different buckets"
+        )
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def snapshot(self) -> dict:
+        """
+        Summarize the histogram.
+
+        :return: dict with ``count``, ``min``, ``max``, ``mean`` and the ``QUANTILES``
+            (e.g. ``p50``); values are None if nothing was recorded.
+        """
+        empty = self.count == 0
+        summary = {
+            "count": self.count,
+            "min": None if empty else self.min,
+            "max": None if empty else self.max,
+            "mean": None if empty else self.sum / self.count,
+        }
+        for q in QUANTILES:
+            summary[f"p{q * 100:g}"] = self.quantile(q)
+        return summary
+
+
+class DcpStats:
+    """
+    Metrics of one DCP address.
+
+    :param sub_buckets: Buckets per power of two of the latency and gap histograms.
+    """
+
+    __slots__ = (
+        "count",
+        "latency",
+        "gap",
+        "out_of_order",
+        "signal_strength",
+        "failure_codes",
+        "last_transmit",
+        "last_received",
+    )
+
+    def __init__(self, sub_buckets: int = 16):
+        self.count = 0
+        self.latency = LogHistogram(sub_buckets)
+        self.gap = LogHistogram(sub_buckets)
+        self.out_of_order = 0
+        self.signal_strength: dict[int, int] = {}
+        self.failure_codes: dict[str, int] = {}
+        self.last_transmit: Optional[int] = None
+        self.last_received: Optional[float] = None
+
+    def snapshot(self) -> dict:
+        """
+        Summarize the metrics of the address.
+
+        :return: dict of metric name to value.
+        """
+        return {
+            "count": self.count,
+            "latency_seconds": self.latency.snapshot(),
+            "gap_seconds": self.gap.snapshot(),
+            "out_of_order": self.out_of_order,
+            "signal_strength": dict(sorted(self.signal_strength.items())),
+            "failure_codes": dict(sorted(self.failure_codes.items())),
+            "last_transmit_time": _iso(self.last_transmit),
+            "last_received_time": _iso(self.last_received),
+        }
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(int(timestamp), timezone.utc).strftime(
+        "%Y-%m-%dT%H:%M:%SZ"
+    )
+
+
+class DcpMetrics:
+    """
+    Incremental per-DCP delivery metrics, fed with DCP messages as they are
+    received, e.g. from ``DcpMessage.stream``::
+
+        metrics = DcpMetrics()
+        for message in DcpMessage.stream(...):
+            metrics.observe(message)
+        metrics.snapshot()["addresses"]["CE4A3B2C"]["latency_seconds"]["p90"]
+
+    For every address it tracks the message count, the delivery latency (receive
+    time minus header transmit time), the gaps between consecutive transmit
+    times, and histograms of the signal strength and failure codes. Latencies and
+    gaps are kept in :class:`LogHistogram` estimators, so memory per address is
+    bounded. Only the header bytes are read; messages are not decoded. Safe to
+    share between threads.
+
+    :param sub_buckets: Buckets per power of two of the latency and gap histograms.
+    """
+
+    def __init__(self, sub_buckets: int = 16):
+        self.sub_buckets = sub_buckets
+        self.__lock = threading.Lock()
+        self.__reset()
+        # start of day (POSIX seconds) by YYDDD field, shared by all addresses
+        self.__days: dict[bytes, int] = {}
+
+    def __reset(self):
+        self.__addresses: dict[str, DcpStats] = {}
+        self.__latency = LogHistogram(self.sub_buckets)
+        self.__messages = 0
+        self.__invalid = 0
+
+    def observe(self, message: Message, received: float = None):
+        """
+        Add a DCP message.
+
+        :param message: The DCP message, or at least its 37-byte header.
+        :param received: POSIX time the message was received (default: now).
+        :return: None
+        """
+        self.observe_all((message,), received)
+
+    def observe_all(self, messages: Iterable[Message], received: float = None):
+        """
+        Add DCP messages received at the same time, e.g. the messages of a block.
+
+        :param messages: The DCP messages.
+        :param received: POSIX time the messages were received (default: now).
+        :return: None
+        """
+        if received is None:
+            received = time.time()
+        with self.__lock:
+            for message in messages:
+                if isinstance(message, str):
+                    header = message[:37].encode("ascii", "replace")
+                else:
+                    header = bytes(message[:37])
+                try:
+                    transmit = self.__transmit_timestamp(header)
+                except ValueError:
+                    self.__invalid += 1
+                    continue
+                self.__observe(header, transmit, received)
+
+    def __transmit_timestamp(self, header: bytes) -> int:
+        if len(header) < 19:
+            raise ValueError("Truncated header")
+        day = header[8:13]
+        day_start = self.__days.get(day)
+        if day_start is None:
+            day_of_year = int(day[2:5])
+            if not 1 <= day_of_year <= 366:
+                raise ValueError(f"Invalid day of year {day!r}")
+            day_start = (
+                calendar.timegm((2000 + int(day[0:2]), 1, 1, 0, 0, 0))
+                + (day_of_year - 1) * 86400
+            )
+            self.__days[day] = day_start
+        return (
+            day_start
+            + int(header[13:15]) * 3600
+            + int(header[15:17]) * 60
+            + int(header[17:19])
+        )
+
+    def __observe(self, header: bytes, transmit: int, received: float):
+        address = header[0:8].decode("ascii", "replace")
+        stats = self.__addresses.get(address)
+        if stats is None:
+            stats = self.__addresses[address] = DcpStats(self.sub_buckets)
+
+        latency = received - transmit
+        stats.latency.record(latency)
+        self.__latency.record(latency)
+        if stats.last_transmit is not None:
+            if transmit >= stats.last_transmit:
+                stats.gap.record(transmit - stats.last_transmit)
+            else:
+                stats.out_of_order += 1
+        if stats.last_transmit is None or transmit > stats.last_transmit:
+            stats.last_transmit = transmit
+        stats.last_received = received
+        stats.count += 1
+        self.__messages += 1
+
+        failure_code = header[19:20].decode("ascii", "replace")
+        stats.failure_codes[failure_code] = stats.failure_codes.get(failure_code, 0) + 1
+        signal = header[20:22]
+        if signal.isdigit():
+            signal = int(signal)
+            stats.signal_strength[signal] = stats.signal_strength.get(signal, 0) + 1
+
+    def addresses(self) -> list[str]:
+        """
+        Return the DCP addresses seen so far.
+
+        :return: Sorted list of addresses.
+        """
+        with self.__lock:
+            return sorted(self.__addresses)
+
+    def snapshot(self, reset: bool = False) -> dict:
+        """
+        Return a point-in-time summary of the metrics.
+
+        :param reset: Start over after the snapshot, so that successive snapshots
+            cover successive intervals (default: accumulate).
+        :return: dict with the totals (``messages``, ``invalid``, ``latency_seconds``)
+            and ``addresses``: address -> metrics of :meth:`DcpStats.snapshot`.
+        """
+        with self.__lock:
+            snapshot = {
+                "messages": self.__messages,
+                "invalid": self.__invalid,
+                "latency_seconds": self.__latency.snapshot(),
+                "addresses": {
+                    address: stats.snapshot()
+                    for address, stats in sorted(self.__addresses.items())
+                },
+            }
+            if reset:
+                self.__reset()
+        return snapshot
@@ -0,0 +1,192 @@
+import logging
+import queue
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = ("DEBUG3", "DEBUG2", "DEBUG1", "INFO", "WARNING", "FAILURE", "FATAL")
+
+# priority, one or two time tokens, then "Module:-code text" or plain text
+EVENT_PATTERN = re.compile(
+    r"^\s*(?P<priority>" + "|".join(PRIORITIES) + r")\s+"
+    r"(?P<time>\S+(?:\s+\d\d:\d\d:\d\d(?:\.\d+)?)?)\s+"
+    r"(?:(?P<module>[A-Za-z][\w.]*):(?P<code>-?\d+)\s+)?"
+    r"(?P<text>.*)$"
+)
+# seconds :meth:`EventDispatcher.close` waits for the queued events to be delivered
+CLOSE_TIMEOUT = 5.0
+
+TIME_FORMATS = (
+    "%Y/%m/%d-%H:%M:%S",
+    "%Y/%m/%d %H:%M:%S",
+    "%m/%d/%Y %H:%M:%S",
+    "%Y/%j %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class LrgsEvent:
+    """
+    An event reported by the LRGS server.
+
+    :param priority: Priority, one of ``PRIORITIES`` (None if the line has none).
+    :param time: Time of the event, if it could be parsed.
+    :param module: Server module that reported the event (e.g. ``DdsServer``).
+    :param code: Event number; LRGS uses negative numbers for problems.
+    :param text: Event text.
+    """
+
+    priority: Optional[str]
+    time: Optional[datetime]
+    module: Optional[str]
+    code: Optional[int]
+    text: str
+
+    @property
+    def is_problem(self) -> bool:
+        """True for WARNING and worse, or a negative event number."""
+        return (self.code is not None and self.code < 0) or self.priority in (
+            "WARNING",
+            "FAILURE",
+            "FATAL",
+        )
+
+
+def _parse_time(value: str) -> Optional[datetime]:
+    value = value.split(".")[0]
+    for time_format in TIME_FORMATS:
+        try:
+            return datetime.strptime(value, time_format).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_event(line: str) -> LrgsEvent:
+    """
+    Parse one line of an LRGS events response.
+
+    :param line: The event line.
+    :return: The event; lines in an unknown format are kept whole as ``text``.
+    """
+    match = EVENT_PATTERN.match(line)
+    if match is None:
+        return LrgsEvent(None, None, None, None, line.strip())
+    code = match.group("code")
+    return LrgsEvent(
+        priority=match.group("priority"),
+        time=_parse_time(match.group("time")),
+        module=match.group("module"),
+        code=None if code is None else int(code),
+        text=match.group("text").strip(),
+    )
+
+
+def parse_events(data: Union[bytes, bytearray, memoryview]) -> list[LrgsEvent]:
+    """
+    Parse the data of an LRGS events response: one event per line.
+
+    :param data: Message data of the response.
+    :return: List of events, oldest first.
+    """
+    text = str(data, "utf-8", "replace").replace("\0", "")
+    return [parse_event(line) for line in text.splitlines() if line.strip()]
+
+
+class EventDispatcher:
+    """
+    Deliver LRGS events to callbacks on a background thread.
+
+    :meth:`dispatch` never blocks: events are handed over through a bounded
+    queue, and events arriving while the queue is full are dropped and counted
+    in ``dropped``, so that slow callbacks cannot stall the retrieval. A
+    callback raising an exception is logged and does not stop the delivery.
+    Events still queued when :meth:`close` times out are counted in ``undelivered``.
+
+    :param callbacks: Functions called with every event.
+    :param queue_size: Maximum number of events waiting for delivery.
+    """
+
+    def __init__(
+        self,
+        callbacks: Union[Callable[[LrgsEvent], None], Iterable[Callable]],
+        queue_size: int = 1000,
+    ):
+        self.callbacks = [callbacks] if callable(callbacks) else list(callbacks)
+        self.delivered = 0
+        self.dropped = 0
+        self.undelivered = 0
+        self.__queued = 0
+        self.__queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.__closed = False
+        self.__abandoned = threading.Event()
+        self.__thread = threading.Thread(
+            target=self.__drain, name="lrgs-events", daemon=True
+        )
+        self.__thread.start()
+
+    def dispatch(self, events: Iterable[LrgsEvent]):
+        """
+        Queue events for delivery, without waiting.
+
+        :param events: The events.
+        :return: None
+        """
+        for event in events:
+            try:
+                self.__queue.put_nowait(event)
+                self.__queued += 1
+            except queue.Full:
+                self.dropped += 1
+
+    def close(self, timeout: float = CLOSE_TIMEOUT):
+        """
+        Deliver the queued events and stop the delivery thread.
+
+        A callback still busy after ``timeout`` is left to the daemon thread, which
+        delivers no further events.
+
+        :param timeout: Maximum number of seconds to wait for the delivery.
+        :return: None
+        """
+        if self.__closed:
+            return
+        self.__closed = True
+        deadline = time.monotonic() + timeout
+        try:
+            self.__queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self.__thread.join(max(0.0, deadline - time.monotonic()))
+        if self.__thread.is_alive():
+            self.__abandoned.set()
+            self.undelivered = self.__queued - self.delivered
+            logger.warning(
+                f"Gave up delivering {self.undelivered} LRGS events after {timeout} s"
+            )
+        if self.dropped:
+            logger.warning(f"Dropped {self.dropped} LRGS events (callbacks too slow)")
+
+    def __drain(self):
+        while not self.__abandoned.is_set():
+            event = self.__queue.get()
+            if event is None or self.__abandoned.is_set():
+                break
+            for callback in self.callbacks:
+                try:
+                    callback(event)
+                except Exception as ex:
+                    logger.error(f"LRGS event callback failed: {ex}")
+            self.delivered += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
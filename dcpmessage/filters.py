@@ -0,0 +1,176 @@
+import abc
+from typing import Iterable, Union
+
+Header = Union[bytes, bytearray, memoryview]
+
+
+class MessageFilter(abc.ABC):
+    """
+    Predicate on the fixed-offset header bytes of a DCP message.
+
+    Filters are evaluated on the raw bytes of a block, before a message is
+    decoded, and only read the first 37 bytes of a message. They compose with
+    ``&``, ``|`` and ``~``::
+
+        message_filter = Address("CE4A3B2C", "A081B07E") & ~FailureCode("?")
+        DcpMessage.explode(blocks, message_filter=message_filter)
+    """
+
+    @abc.abstractmethod
+    def __call__(self, message: Header) -> bool:
+        """
+        Check whether a message passes the filter.
+
+        :param message: The DCP message, or at least its 37-byte header.
+        :return: True if the message is kept.
+        """
+        raise NotImplementedError
+
+    def __and__(self, other: "MessageFilter") -> "MessageFilter":
+        return AllOf(self, other)
+
+    def __or__(self, other: "MessageFilter") -> "MessageFilter":
+        return AnyOf(self, other)
+
+    def __invert__(self) -> "MessageFilter":
+        return Not(self)
+
+
+class AllOf(MessageFilter):
+    """Keep messages passing every filter."""
+
+    def __init__(self, *filters: MessageFilter):
+        # flatten nested conjunctions so that a & b & c is a single level
+        self.filters = tuple(
+            g for f in filters for g in (f.filters if isinstance(f, AllOf) else (f,))
+        )
+
+    def __call__(self, message: Header) -> bool:
+        return all(f(message) for f in self.filters)
+
+    def __repr__(self):
+        return f"AllOf{self.filters!r}"
+
+
+class AnyOf(MessageFilter):
+    """Keep messages passing at least one filter."""
+
+    def __init__(self, *filters: MessageFilter):
+        self.filters = tuple(
+            g for f in filters for g in (f.filters if isinstance(f, AnyOf) else (f,))
+        )
+
+    def __call__(self, message: Header) -> bool:
+        return any(f(message) for f in self.filters)
+
+    def __repr__(self):
+        return f"AnyOf{self.filters!r}"
+
+
+class Not(MessageFilter):
+    """Keep messages failing a filter."""
+
+    def __init__(self, message_filter: MessageFilter):
+        self.filter = message_filter
+
+    def __call__(self, message: Header) -> bool:
+        return not self.filter(message)
+
+    def __repr__(self):
+        return f"Not({self.filter!r})"
+
+
+class FieldIn(MessageFilter):
+    """
+    Keep messages whose header field at ``[start:end]`` is one of the given values.
+
+    :param start: Offset of the field in the header.
+    :param end: End offset of the field in the header.
+    :param values: Accepted values of the field, as str or bytes.
+    """
+
+    def __init__(self, start: int, end: int, values: Iterable[Union[str, bytes]]):
+        self.start = start
+        self.end = end
+        self.values = frozenset(
+            v.encode("ascii") if isinstance(v, str) else bytes(v) for v in values
+        )
+        assert all(len(v) == end - start for v in self.values), (
+            f"Values must be {end - start} characters long"
+        )
+
+    def __call__(self, message: Header) -> bool:
+        return bytes(message[self.start : self.end]) in self.values
+
+    def __repr__(self):
+        return f"{type(self).__name__}({sorted(self.values)!r})"
+
+
+class Address(FieldIn):
+    """
+    Keep messages of the given DCP addresses.
+
+    :param addresses: DCP addresses (case-insensitive).
+    """
+
+    def __init__(self, *addresses: str):
+        super().__init__(0, 8, (a.upper() for a in addresses))
+
+    def __call__(self, message: Header) -> bool:
+        return bytes(message[:8]).upper() in self.values
+
+
+class FailureCode(FieldIn):
+    """
+    Keep messages with one of the given failure codes, e.g. ``G`` (good) or ``?``.
+
+    :param codes: Failure code characters.
+    """
+
+    def __init__(self, *codes: str):
+        super().__init__(19, 20, codes)
+
+
+class Channel(FieldIn):
+    """
+    Keep messages received on the given GOES channels.
+
+    :param channels: GOES channel numbers.
+    """
+
+    def __init__(self, *channels: int):
+        super().__init__(26, 29, (f"{c:03d}" for c in channels))
+
+
+class Spacecraft(FieldIn):
+    """
+    Keep messages received from the given spacecraft.
+
+    :param spacecraft: ``E`` (East) and/or ``W`` (West).
+    """
+
+    def __init__(self, *spacecraft: str):
+        super().__init__(29, 30, spacecraft)
+
+
+class SignalStrength(MessageFilter):
+    """
+    Keep messages whose signal strength (dBm) is within a range. Messages with a
+    non-numeric signal strength field are dropped.
+
+    :param minimum: Lowest accepted signal strength (inclusive).
+    :param maximum: Highest accepted signal strength (inclusive).
+    """
+
+    def __init__(self, minimum: int = 0, maximum: int = 99):
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def __call__(self, message: Header) -> bool:
+        tens, units = message[20] - 48, message[21] - 48
+        if not (0 <= tens <= 9 and 0 <= units <= 9):
+            return False
+        return self.minimum <= tens * 10 + units <= self.maximum
+
+    def __repr__(self):
+        return f"SignalStrength({self.minimum}, {self.maximum})"
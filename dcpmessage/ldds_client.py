@@ -1,12 +1,18 @@
 import logging
-import socket
+import time
 from datetime import datetime, timezone
-from typing import Union
+from typing import TYPE_CHECKING, Callable, Iterator, Optional, Union
 
-from .credentials import Credentials, Sha1, Sha256
+from .exceptions import DeadlineExceeded, ProtocolError
 from .ldds_message import LddsMessage, LddsMessageConstants, LddsMessageIds
+from .observers import SessionObserver
 from .search_criteria import SearchCriteria
 
+if TYPE_CHECKING:
+    from .capture import CaptureWriter
+    from .connection import ResolverCache, SocketOptions
+    from .events import LrgsEvent
+
 logger = logging.getLogger(__name__)
 
 
@@ -17,35 +23,118 @@ class BasicClient:
     :param host: The hostname or IP address of the remote server.
     :param port: The port number to connect to on the remote server.
     :param timeout: The timeout duration for the socket connection in seconds.
+    :param observer: Observer notified of session timings and volumes.
+    :param capture: Writer recording every sent and received frame.
+    :param deadline: ``time.monotonic()`` time by which the whole session must end.
+    :param socket_options: Options of the socket.
+    :param resolver: Cache of host name resolutions.
     """
 
-    def __init__(self, host: str, port: int, timeout: Union[float, int]):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        timeout: Union[float, int],
+        observer: SessionObserver = None,
+        capture: "CaptureWriter" = None,
+        deadline: float = None,
+        socket_options: "SocketOptions" = None,
+        resolver: "ResolverCache" = None,
+    ):
         """
         Initialize the BasicClient with the provided host, port, and timeout.
 
         :param host: The hostname or IP address of the remote server.
         :param port: The port number to connect to on the remote server.
         :param timeout: The timeout duration for the socket connection in seconds.
+        :param observer: Observer notified of session timings and volumes (default: no-op).
+        :param capture: Writer recording every sent and received frame (default: no recording).
+        :param deadline: ``time.monotonic()`` time by which the whole session must end.
+            Every socket operation is then limited to the time left (default: no deadline).
+        :param socket_options: Options of the socket, e.g. ``TCP_NODELAY``, ``SO_RCVBUF``
+            and keepalive (default: ``SocketOptions()``).
+        :param resolver: Cache of host name resolutions (default: a cache shared by
+            all clients).
         """
         self.host = host
         self.port = port
         self.timeout = timeout
         self.socket = None
+        self.observer = observer or SessionObserver()
+        self.capture = capture
+        self.deadline = deadline
+        self.socket_options = socket_options
+        self.resolver = resolver
+
+    def remaining(self) -> Optional[float]:
+        """
+        Seconds left before the deadline.
+
+        :return: The remaining seconds (negative once passed), or None without a deadline.
+        """
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def _apply_timeout(self):
+        """
+        With a deadline, limit the socket timeout of the next operation to the
+        time left before it.
+
+        :raises DeadlineExceeded: If the deadline has passed.
+        :return: None
+        """
+        if self.deadline is not None:
+            self.socket.settimeout(self._operation_timeout())
+
+    def _operation_timeout(self) -> Optional[float]:
+        """
+        Timeout of the next socket operation: the configured timeout, shortened to
+        the time left before the deadline.
+
+        :raises DeadlineExceeded: If the deadline has passed.
+        :return: Seconds, or None for no timeout.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return self.timeout
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Deadline passed for {self.host}:{self.port}")
+        if self.timeout is None:
+            return remaining
+        return min(self.timeout, remaining)
 
     def connect(self):
         """
         Establish a socket connection to the server using the provided host and port.
         Sets the socket to blocking mode and applies the specified timeout.
 
+        The host name is resolved through the resolver cache, and its IPv4 and IPv6
+        addresses are tried in parallel (see :func:`dcpmessage.connection.connect_tcp`).
+
         :raises IOError: If the connection attempt times out or fails for any reason.
         :return: None
         """
+        import socket
+
+        from .connection import connect_tcp
+
         try:
             logger.info(f"Connecting to {self.host}:{self.port}")
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            start = time.perf_counter()
+            self.socket = connect_tcp(
+                self.host,
+                self.port,
+                self._operation_timeout(),
+                self.socket_options,
+                self.resolver,
+            )
             self.socket.settimeout(self.timeout)
-            self.socket.connect((self.host, self.port))
+            self._apply_timeout()
+            self.observer.on_connect(self.host, self.port, time.perf_counter() - start)
             logger.info(f"Successfully connected to {self.host}:{self.port}")
+        except DeadlineExceeded:
+            raise
         except socket.timeout as ex:
             raise IOError(f"Connection to {self.host}:{self.port} timed out") from ex
         except socket.error as ex:
@@ -79,7 +168,12 @@ class BasicClient:
         """
         if self.socket is None:
             raise IOError("BasicClient socket closed.")
+        self._apply_timeout()
         self.socket.sendall(data)
+        if self.capture is not None:
+            from .capture import CaptureConstants
+
+            self.capture.record(CaptureConstants.SENT, data)
 
 
 class LddsClient(BasicClient):
@@ -88,38 +182,96 @@ class LddsClient(BasicClient):
     Inherits from BasicClient and adds LDDS-specific functionality.
     """
 
-    def __init__(self, host: str, port: int, timeout: Union[float, int]):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        timeout: Union[float, int],
+        observer: SessionObserver = None,
+        capture: "CaptureWriter" = None,
+        deadline: float = None,
+        deadline_reserve: float = 1.0,
+        socket_options: "SocketOptions" = None,
+        resolver: "ResolverCache" = None,
+        event_handler: Callable[[list["LrgsEvent"]], None] = None,
+        event_interval: float = 5.0,
+    ):
         """
         Initialize the LddsClient with the provided host, port, and timeout.
 
         :param host: The hostname or IP address of the LDDS server.
         :param port: The port number to connect to on the LDDS server.
         :param timeout: The timeout duration for the socket connection in seconds.
+        :param observer: Observer notified of session timings and volumes (default: no-op).
+        :param capture: Writer recording every sent and received frame (default: no recording).
+        :param deadline: ``time.monotonic()`` time by which the whole session must end
+            (default: no deadline). See :meth:`iter_dcp_blocks`.
+        :param deadline_reserve: Seconds kept before the deadline to say goodbye.
+        :param socket_options: Options of the socket (default: ``SocketOptions()``).
+        :param resolver: Cache of host name resolutions (default: shared cache).
+        :param event_handler: Called with the new server events polled while DCP blocks
+            are retrieved; it should not block, e.g. ``EventDispatcher.dispatch``
+            (default: events are not polled). See :meth:`iter_dcp_blocks`.
+        :param event_interval: Minimum seconds between two event polls.
         """
-        super().__init__(host=host, port=port, timeout=timeout)
+        super().__init__(
+            host=host,
+            port=port,
+            timeout=timeout,
+            observer=observer,
+            capture=capture,
+            deadline=deadline,
+            socket_options=socket_options,
+            resolver=resolver,
+        )
+        self.deadline_reserve = deadline_reserve
+        self.deadline_reached = False
+        # negotiated in authenticate_user
+        self.protocol_version = LddsMessageConstants.PROTOCOL_VERSION
+        self.server_protocol_version: Optional[int] = None
+        self.event_handler = event_handler
+        self.event_interval = event_interval
 
     def receive_data(
         self,
-        buffer_size: int = 1024,
+        buffer_size: int = LddsMessageConstants.RECEIVE_BUFFER_SIZE,
     ) -> bytes:
         """
-        Receive data from the socket.
+        Receive one LDDS message from the socket.
 
         :param buffer_size: The size of the buffer to use when receiving data.
         :return: The received byte data.
-        :raises IOError: If the socket is not connected.
+        :raises IOError: If the socket is not connected or closed by the server.
         """
         if self.socket is None:
             raise IOError("BasicClient socket closed.")
 
-        data = self.socket.recv(buffer_size)
-        if len(data) == 0:
-            raise IOError("BasicClient socket closed.")
-
-        ldds_message_length = LddsMessage.get_total_length(data)
-        while len(data) < ldds_message_length:
-            data += self.socket.recv(buffer_size)
-
+        header_length = LddsMessageConstants.VALID_HEADER_LENGTH
+        chunks = []
+        received = 0
+        ldds_message_length = None
+        while ldds_message_length is None or received < ldds_message_length:
+            self._apply_timeout()
+            # never read past the end of the message: the header, then the rest
+            if ldds_message_length is None:
+                size = header_length - received
+            else:
+                size = min(buffer_size, ldds_message_length - received)
+            chunk = self.socket.recv(size)
+            if len(chunk) == 0:
+                raise IOError("BasicClient socket closed.")
+            chunks.append(chunk)
+            received += len(chunk)
+            if ldds_message_length is None and received >= header_length:
+                header = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+                ldds_message_length = LddsMessage.get_total_length(header)
+        # join once: appending to bytes would copy the data for every chunk
+        data = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+
+        if self.capture is not None:
+            from .capture import CaptureConstants
+
+            self.capture.record(CaptureConstants.RECEIVED, data)
         return data
 
     def authenticate_user(
@@ -130,34 +282,79 @@ class LddsClient(BasicClient):
         """
         Authenticate a user with the LDDS server using the provided username and password.
 
+        The hello announces ``protocol_version``, and the server answers with its own
+        version. The lower of both is stored in ``protocol_version`` and announced
+        by a later hello, but is otherwise informational: the other requests and the
+        block format do not depend on it. Servers not reporting a version are
+        assumed to speak the client version.
+
         :param user_name: The username to authenticate with.
         :param password: The password to authenticate with.
-        :raises Exception: If authentication fails.
+        :raises ProtocolError: If authentication fails.
         :return: None
         """
+        from .credentials import Credentials, Sha1, Sha256
+
         msg_id = LddsMessageIds.auth_hello
         credentials = Credentials(username=user_name, password=password)
 
         is_authenticated = False
         for hash_algo in [Sha1, Sha256]:
+            algo = hash_algo()
             auth_str = credentials.get_authenticated_hello(
-                datetime.now(timezone.utc), hash_algo()
+                datetime.now(timezone.utc), algo, self.protocol_version
             )
             logger.debug(auth_str)
+            start = time.perf_counter()
             ldds_message = self.request_dcp_message(msg_id, auth_str)
             server_error = ldds_message.server_error
+            self.observer.on_auth_attempt(
+                algo.algorithm, time.perf_counter() - start, server_error is None
+            )
             if server_error is not None:
                 logger.debug(str(server_error))
             else:
                 is_authenticated = True
+                self.__negotiate(ldds_message)
 
         if is_authenticated:
             logger.info("Successfully authenticated user")
         else:
-            raise Exception(
-                f"Could not authenticate for user:{user_name}\n{server_error}"
+            raise ProtocolError(
+                f"Could not authenticate for user:{user_name}\n{server_error}",
+                server_error=server_error,
             )
 
+    @staticmethod
+    def parse_protocol_version(message_data: bytes) -> Optional[int]:
+        """
+        Read the protocol version of the server from its hello response,
+        ``<username> <YYDDDHHMMSS> <version>``.
+
+        :param message_data: Data of the hello response.
+        :return: The server version, or None if the response has none.
+        """
+        fields = str(message_data, "ascii", "replace").replace("\0", " ").split()
+        if len(fields) >= 3 and fields[2].isdigit():
+            return int(fields[2])
+        return None
+
+    def __negotiate(self, hello_response: LddsMessage):
+        server_version = self.parse_protocol_version(
+            hello_response.message_data[: hello_response.message_length]
+        )
+        if server_version is None:
+            logger.debug("Server did not report its protocol version")
+            return
+        self.server_protocol_version = server_version
+        self.protocol_version = min(
+            LddsMessageConstants.PROTOCOL_VERSION, server_version
+        )
+        logger.info(
+            f"Server protocol version {server_version}, "
+            f"using version {self.protocol_version}"
+        )
+
     def request_dcp_message(
         self,
         message_id,
@@ -176,7 +373,10 @@ class LddsClient(BasicClient):
         message_bytes = message.to_bytes()
         self.send_data(message_bytes)
         server_response = self.receive_data()
-        return LddsMessage.parse(server_response)
+        ldds_message = LddsMessage.parse(server_response)
+        if ldds_message.server_error is not None:
+            self.observer.on_server_error(ldds_message.server_error)
+        return ldds_message
 
     def send_search_criteria(
         self,
@@ -190,6 +390,7 @@ class LddsClient(BasicClient):
         """
         data_to_send = bytearray(50) + bytes(search_criteria)
         logger.debug(f"Sending criteria message (filesize = {len(data_to_send)} bytes)")
+        start = time.perf_counter()
         ldds_message = self.request_dcp_message(
             LddsMessageIds.search_criteria, data_to_send
         )
@@ -198,36 +399,114 @@ class LddsClient(BasicClient):
         if server_error is not None:
             server_error.raise_exception()
         else:
+            self.observer.on_criteria_sent(
+                time.perf_counter() - start, len(data_to_send)
+            )
             logger.info("Search criteria sent successfully.")
 
-    def request_dcp_blocks(
+    def iter_dcp_blocks(
         self,
-    ) -> list[LddsMessage]:
+    ) -> Iterator[LddsMessage]:
         """
-        Request a block of DCP messages from the LDDS server.
+        Request DCP blocks from the LDDS server one at a time, yielding each
+        block as soon as it is received.
 
-        :return: The received DCP block as bytearray.
+        With a deadline, no block is requested once the time left is shorter than
+        the slowest block so far plus ``deadline_reserve``, so that the session
+        can still end with a goodbye. If the deadline passes while a block is being
+        received, the connection is closed. In both cases the iterator stops early
+        and ``deadline_reached`` is set.
+
+        With an ``event_handler``, server events are polled in the same session
+        before the first block, at most every ``event_interval`` seconds between
+        blocks, and after the last block.
+
+        :return: Iterator of received DCP blocks.
         """
         msg_id = LddsMessageIds.dcp_block
-        max_data_length = LddsMessageConstants.MAX_DATA_LENGTH
-        dcp_messages = []
+        slowest_block = 0.0
+        next_events = time.monotonic()
         try:
             while True:
-                response = self.request_dcp_message(msg_id)
+                if self.event_handler is not None and time.monotonic() >= next_events:
+                    self.__poll_events()
+                    next_events = time.monotonic() + self.event_interval
+                remaining = self.remaining()
+                if (
+                    remaining is not None
+                    and remaining < slowest_block + self.deadline_reserve
+                ):
+                    logger.warning(
+                        f"Stopping before the deadline ({remaining:.1f} s left)"
+                    )
+                    self.deadline_reached = True
+                    break
+                start = time.perf_counter()
+                try:
+                    response = self.request_dcp_message(msg_id)
+                except TimeoutError:
+                    remaining = self.remaining()
+                    if remaining is None or remaining > 0:
+                        raise
+                    logger.warning("Deadline passed while receiving a DCP block")
+                    self.deadline_reached = True
+                    # the frame is incomplete: the session cannot be resumed
+                    self.disconnect()
+                    break
                 server_error = response.server_error
                 if server_error is not None:
                     if server_error.is_end_of_message:
                         logger.info(server_error.description)
+                        if self.event_handler is not None:
+                            self.__poll_events()
                         break
                     else:
                         server_error.raise_exception()
-                dcp_messages.append(response)
-
-            return dcp_messages
+                duration = time.perf_counter() - start
+                slowest_block = max(slowest_block, duration)
+                self.observer.on_block(duration, response.message_length)
+                yield response
         except Exception as err:
             logger.debug(f"Error receiving data: {err}")
             raise err
 
+    def request_events(self) -> list["LrgsEvent"]:
+        """
+        Request the events logged by the LDDS server since the previous request.
+
+        :return: List of parsed events, oldest first.
+        :raises ProtocolError: If the server refuses the request.
+        """
+        from .events import parse_events
+
+        response = self.request_dcp_message(LddsMessageIds.events)
+        if response.server_error is not None:
+            response.server_error.raise_exception()
+        return parse_events(
+            memoryview(response.message_data)[: response.message_length]
+        )
+
+    def __poll_events(self):
+        try:
+            events = self.request_events()
+        except ProtocolError as ex:
+            # e.g. events not permitted for this user: keep retrieving data
+            logger.info(f"Server events unavailable, polling disabled: {ex}")
+            self.event_handler = None
+            return
+        if events:
+            self.event_handler(events)
+
+    def request_dcp_blocks(
+        self,
+    ) -> list[LddsMessage]:
+        """
+        Request a block of DCP messages from the LDDS server.
+
+        :return: The received DCP block as bytearray.
+        """
+        return list(self.iter_dcp_blocks())
+
     def send_goodbye(self):
         """
         Send a goodbye message to the LDDS server to terminate the session.
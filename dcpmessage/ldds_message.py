@@ -1,16 +1,29 @@
 from dataclasses import dataclass
 
-from .exceptions import LddsMessageError, ProtocolError, ServerError, ServerErrorCode
+from .exceptions import (
+    END_OF_MESSAGE_CODES,
+    LddsMessageError,
+    ProtocolError,
+    ServerError,
+)
 
 
 @dataclass
 class LddsMessageConstants:
-    """Constants related to LDDS messages."""
+    """
+    Constants related to LDDS messages.
+
+    The length field of the header has five digits, so a message carries at most
+    99999 bytes of data whatever the protocol version.
+    """
 
     VALID_HEADER_LENGTH: int = 10
     SYNC_LENGTH: int = 4
     VALID_SYNC_CODE: bytes = b"FAF0"
     MAX_DATA_LENGTH: int = 99000
+    # highest DDS protocol version implemented by this client
+    PROTOCOL_VERSION: int = 14
+    RECEIVE_BUFFER_SIZE: int = 64 * 1024
     VALID_IDS: frozenset[str] = frozenset(
         (
             "a",
@@ -218,12 +231,7 @@ class LddsMessage:
 
     def is_end_of_message(self):
         server_error = ServerError.parse(self.message_data)
-        if server_error.server_code_no in (
-            ServerErrorCode.DUNTIL.value,
-            ServerErrorCode.DUNTILDRS.value,
-        ):
-            return True
-        return False
+        return server_error.server_code_no in END_OF_MESSAGE_CODES
 
     def is_success(self):
         server_error = ServerError.parse(self.message_data)
@@ -0,0 +1,205 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, TypeVar
+
+from .exceptions import DeadlineExceeded, ProtocolError, ServerErrorCode
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+THROTTLE_CODES = frozenset(
+    (
+        ServerErrorCode.DNOMOREPROC.value,
+        ServerErrorCode.DDDSINTERNAL.value,
+        ServerErrorCode.DDDSFATAL.value,
+        ServerErrorCode.DALREADYATTACHED.value,
+    )
+)
+
+
+def is_throttling_error(error: BaseException) -> bool:
+    """
+    Check whether an error means the server is overloaded: a ``ServerErrorCode`` asking
+    to retry later (see ``THROTTLE_CODES``) or a connect/read timeout. Running out of
+    the caller's own deadline (``DeadlineExceeded``) is not throttling.
+
+    :param error: The exception raised by a session.
+    :return: True if the caller should reduce its concurrency.
+    """
+    while error is not None:
+        if isinstance(error, DeadlineExceeded):
+            return False
+        if isinstance(error, TimeoutError):
+            return True
+        if isinstance(error, ProtocolError) and error.server_error is not None:
+            return error.server_error.server_code_no in THROTTLE_CODES
+        error = error.__cause__
+    return False
+
+
+def backoff_delays(base: float = 1.0, cap: float = 60.0) -> Iterator[float]:
+    """
+    Generate exponentially growing retry delays with full jitter.
+
+    The n-th delay is uniformly distributed between 0 and ``min(cap, base * 2**n)``.
+
+    :param base: Upper bound of the first delay in seconds.
+    :param cap: Maximum upper bound of any delay in seconds.
+    :return: Infinite iterator of delays in seconds.
+    """
+    attempt = 0
+    while True:
+        yield random.uniform(0, min(cap, base * 2**attempt))
+        attempt += 1
+
+
+class AimdLimiter:
+    """
+    Adaptive limit on the number of concurrent LRGS sessions.
+
+    The limit grows additively (by ``increase`` per ``limit`` successful sessions)
+    while sessions succeed and is multiplied by ``decrease`` when a session is
+    throttled (see :func:`is_throttling_error`). At most one decrease is applied
+    per ``cooldown`` seconds, so a burst of failures from sessions started under
+    the old limit only counts once. One limiter can be shared by any number of
+    backfills, schedulers and coalescers using the same server or account.
+
+    :param initial: Initial limit.
+    :param minimum: Lowest limit.
+    :param maximum: Highest limit.
+    :param increase: Additive increase per round of successful sessions.
+    :param decrease: Multiplicative decrease factor on throttling.
+    :param cooldown: Minimum seconds between two decreases.
+    """
+
+    def __init__(
+        self,
+        initial: int = 2,
+        minimum: int = 1,
+        maximum: int = 16,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        cooldown: float = 5.0,
+    ):
+        assert 1 <= minimum <= initial <= maximum, (
+            "expected 1 <= minimum <= initial <= maximum"
+        )
+        assert 0 < decrease < 1, "decrease must be between 0 and 1"
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.__limit = float(initial)
+        self.__in_use = 0
+        self.__last_decrease = float("-inf")
+        self.__condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current number of sessions allowed."""
+        return int(self.__limit)
+
+    @property
+    def in_use(self) -> int:
+        """Number of sessions currently running."""
+        return self.__in_use
+
+    def try_acquire(self) -> bool:
+        """
+        Take a session slot if one is free.
+
+        :return: True if a slot was taken.
+        """
+        with self.__condition:
+            if self.__in_use < int(self.__limit):
+                self.__in_use += 1
+                return True
+            return False
+
+    def acquire(self, timeout: float = None) -> bool:
+        """
+        Wait for a free session slot and take it.
+
+        :param timeout: Maximum seconds to wait (default: wait indefinitely).
+        :return: True if a slot was taken, False on timeout.
+        """
+        with self.__condition:
+            if not self.__condition.wait_for(
+                lambda: self.__in_use < int(self.__limit), timeout
+            ):
+                return False
+            self.__in_use += 1
+            return True
+
+    def release(self, error: BaseException = None):
+        """
+        Return a session slot and adjust the limit from the session outcome.
+
+        :param error: The exception that ended the session, or None on success.
+        :return: None
+        """
+        with self.__condition:
+            self.__in_use -= 1
+            if error is None:
+                self.__limit = min(
+                    self.maximum, self.__limit + self.increase / self.__limit
+                )
+            elif is_throttling_error(error):
+                now = time.monotonic()
+                if now - self.__last_decrease >= self.cooldown:
+                    self.__last_decrease = now
+                    self.__limit = max(self.minimum, self.__limit * self.decrease)
+                    logger.info(f"Server throttling; session limit now {self.limit}")
+            self.__condition.notify_all()
+
+    @contextmanager
+    def session(self, timeout: float = None):
+        """
+        Hold a session slot for the duration of a ``with`` block.
+
+        :param timeout: Maximum seconds to wait for a slot (default: wait indefinitely).
+        :raises TimeoutError: If no slot became free in time.
+        """
+        if not self.acquire(timeout):
+            raise TimeoutError("Timed out waiting for a session slot")
+        try:
+            yield
+        except BaseException as ex:
+            self.release(ex)
+            raise
+        else:
+            self.release()
+
+    def call(
+        self,
+        func: Callable[[], T],
+        retries: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ) -> T:
+        """
+        Run a session function under the limiter, retrying throttled attempts
+        after jittered exponential delays.
+
+        :param func: Function running one session.
+        :param retries: Number of retries after throttling errors.
+        :param base_delay: Upper bound of the first retry delay in seconds.
+        :param max_delay: Maximum upper bound of any retry delay in seconds.
+        :return: The result of ``func``.
+        """
+        delays = backoff_delays(base_delay, max_delay)
+        for attempt in range(retries + 1):
+            try:
+                with self.session():
+                    return func()
+            except Exception as ex:
+                if attempt == retries or not is_throttling_error(ex):
+                    raise
+                delay = next(delays)
+                logger.debug(f"Throttled ({ex}); retrying in {delay:.2f}s")
+                time.sleep(delay)
@@ -0,0 +1,301 @@
+import logging
+import threading
+from bisect import bisect_left
+from typing import Union
+
+from .exceptions import ServerError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+class SessionObserver:
+    """
+    Base class for observing the timings and volumes of an LDDS session.
+
+    Every hook is a no-op, so the default observer costs one method call per
+    event. Subclass and override only the hooks of interest.
+    """
+
+    def on_connect(self, host: str, port: int, duration: float):
+        """
+        Called after a socket connection has been established.
+
+        :param host: The hostname or IP address of the server.
+        :param port: The port number of the server.
+        :param duration: Time taken to connect in seconds.
+        """
+
+    def on_auth_attempt(self, algorithm: str, duration: float, success: bool):
+        """
+        Called after each authentication attempt.
+
+        :param algorithm: Name of the hash algorithm used (e.g., "sha1").
+        :param duration: Round trip time of the attempt in seconds.
+        :param success: True if the server accepted the attempt.
+        """
+
+    def on_criteria_sent(self, duration: float, size: int):
+        """
+        Called after the search criteria has been acknowledged by the server.
+
+        :param duration: Round trip time in seconds.
+        :param size: Number of bytes sent.
+        """
+
+    def on_block(self, duration: float, size: int):
+        """
+        Called after each DCP block round trip.
+
+        :param duration: Round trip time in seconds.
+        :param size: Number of data bytes received in the block.
+        """
+
+    def on_explode(self, duration: float, blocks: int, messages: int):
+        """
+        Called after DCP blocks have been split into individual messages.
+
+        :param duration: Time taken in seconds.
+        :param blocks: Number of blocks processed.
+        :param messages: Number of DCP messages produced.
+        """
+
+    def on_server_error(self, server_error: ServerError):
+        """
+        Called for every server error returned in a response, including the
+        "until time reached" codes that end a retrieval.
+
+        :param server_error: The parsed server error.
+        """
+
+
+class LoggingObserver(SessionObserver):
+    """
+    Observer that writes every session event to a logger.
+
+    :param log: Logger to write to (default: this module's logger).
+    :param level: Logging level for the events (default: ``logging.DEBUG``).
+    """
+
+    def __init__(self, log: logging.Logger = None, level: int = logging.DEBUG):
+        self.log = log or logger
+        self.level = level
+
+    def on_connect(self, host: str, port: int, duration: float):
+        self.log.log(self.level, f"connect {host}:{port} took {duration:.6f}s")
+
+    def on_auth_attempt(self, algorithm: str, duration: float, success: bool):
+        self.log.log(
+            self.level,
+            f"auth attempt ({algorithm}) took {duration:.6f}s success={success}",
+        )
+
+    def on_criteria_sent(self, duration: float, size: int):
+        self.log.log(self.level, f"search criteria ({size} bytes) took {duration:.6f}s")
+
+    def on_block(self, duration: float, size: int):
+        self.log.log(self.level, f"dcp block ({size} bytes) took {duration:.6f}s")
+
+    def on_explode(self, duration: float, blocks: int, messages: int):
+        self.log.log(
+            self.level,
+            f"explode {blocks} blocks into {messages} messages took {duration:.6f}s",
+        )
+
+    def on_server_error(self, server_error: ServerError):
+        self.log.log(
+            self.level,
+            f"server error {server_error.server_code_no}: {server_error.message}",
+        )
+
+
+class Histogram:
+    """
+    Prometheus-style cumulative histogram kept in memory.
+
+    :param buckets: Sorted upper bounds of the buckets in seconds.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: Union[float, int]):
+        """
+        Record a single observation.
+
+        :param value: The observed value.
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        """
+        Return the histogram with cumulative bucket counts.
+
+        :return: dict with ``buckets`` (upper bound -> cumulative count), ``sum`` and ``count``.
+        """
+        cumulative, buckets = 0, {}
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {"buckets": buckets, "sum": self.sum, "count": self.count}
+
+
+class MetricsObserver(SessionObserver):
+    """
+    Observer that aggregates session events into in-memory counters and
+    histograms. Safe to share between sessions running on several threads.
+
+    :param buckets: Upper bounds used for all latency histograms.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.__lock = threading.Lock()
+        self.connect_seconds = Histogram(buckets)
+        self.auth_seconds = Histogram(buckets)
+        self.criteria_seconds = Histogram(buckets)
+        self.block_seconds = Histogram(buckets)
+        self.explode_seconds = Histogram(buckets)
+        self.auth_failures = 0
+        self.bytes_received = 0
+        self.blocks = 0
+        self.messages = 0
+        self.server_errors: dict[int, int] = {}
+
+    def on_connect(self, host: str, port: int, duration: float):
+        with self.__lock:
+            self.connect_seconds.observe(duration)
+
+    def on_auth_attempt(self, algorithm: str, duration: float, success: bool):
+        with self.__lock:
+            self.auth_seconds.observe(duration)
+            if not success:
+                self.auth_failures += 1
+
+    def on_criteria_sent(self, duration: float, size: int):
+        with self.__lock:
+            self.criteria_seconds.observe(duration)
+
+    def on_block(self, duration: float, size: int):
+        with self.__lock:
+            self.block_seconds.observe(duration)
+            self.bytes_received += size
+            self.blocks += 1
+
+    def on_explode(self, duration: float, blocks: int, messages: int):
+        with self.__lock:
+            self.explode_seconds.observe(duration)
+            self.messages += messages
+
+    def on_server_error(self, server_error: ServerError):
+        code = server_error.server_code_no
+        with self.__lock:
+            self.server_errors[code] = self.server_errors.get(code, 0) + 1
+
+    def snapshot(self) -> dict:
+        """
+        Return a point-in-time copy of all counters and histograms.
+
+        :return: dict of metric name to value.
+        """
+        with self.__lock:
+            return {
+                "connect_seconds": self.connect_seconds.snapshot(),
+                "auth_seconds": self.auth_seconds.snapshot(),
+                "criteria_seconds": self.criteria_seconds.snapshot(),
+                "block_seconds": self.block_seconds.snapshot(),
+                "explode_seconds": self.explode_seconds.snapshot(),
+                "auth_failures": self.auth_failures,
+                "bytes_received": self.bytes_received,
+                "blocks": self.blocks,
+                "messages": self.messages,
+                "server_errors": dict(self.server_errors),
+            }
+
+
+class PrometheusObserver(SessionObserver):
+    """
+    Observer that exports session events through ``prometheus_client``.
+
+    Requires the optional ``prometheus`` extra (``pip install dcpmessage[prometheus]``).
+
+    :param registry: Registry to register the metrics with (default: the global registry).
+    :param namespace: Prefix for all metric names.
+    """
+
+    def __init__(self, registry=None, namespace: str = "dcpmessage"):
+        try:
+            from prometheus_client import REGISTRY, Counter, Histogram
+        except ImportError as ex:
+            raise ImportError(
+                "PrometheusObserver requires prometheus_client; "
+                "install with `pip install dcpmessage[prometheus]`"
+            ) from ex
+
+        registry = REGISTRY if registry is None else registry
+        kwargs = {"namespace": namespace, "registry": registry}
+        self.connect_seconds = Histogram(
+            "connect_seconds", "Time to connect to the LRGS server", **kwargs
+        )
+        self.auth_seconds = Histogram(
+            "auth_seconds",
+            "Round trip time of authentication attempts",
+            ["algorithm", "success"],
+            **kwargs,
+        )
+        self.criteria_seconds = Histogram(
+            "criteria_seconds", "Round trip time of search criteria", **kwargs
+        )
+        self.block_seconds = Histogram(
+            "block_seconds", "Round trip time of DCP block requests", **kwargs
+        )
+        self.explode_seconds = Histogram(
+            "explode_seconds", "Time to split DCP blocks into messages", **kwargs
+        )
+        self.bytes_received = Counter(
+            "received_bytes", "Bytes of DCP block data received", **kwargs
+        )
+        self.blocks = Counter("blocks", "DCP blocks received", **kwargs)
+        self.messages = Counter("messages", "DCP messages produced", **kwargs)
+        self.server_errors = Counter(
+            "server_errors", "Server errors by server code", ["code"], **kwargs
+        )
+
+    def on_connect(self, host: str, port: int, duration: float):
+        self.connect_seconds.observe(duration)
+
+    def on_auth_attempt(self, algorithm: str, duration: float, success: bool):
+        self.auth_seconds.labels(algorithm, str(success).lower()).observe(duration)
+
+    def on_criteria_sent(self, duration: float, size: int):
+        self.criteria_seconds.observe(duration)
+
+    def on_block(self, duration: float, size: int):
+        self.block_seconds.observe(duration)
+        self.bytes_received.inc(size)
+        self.blocks.inc()
+
+    def on_explode(self, duration: float, blocks: int, messages: int):
+        self.explode_seconds.observe(duration)
+        self.messages.inc(messages)
+
+    def on_server_error(self, server_error: ServerError):
+        self.server_errors.labels(str(server_error.server_code_no)).inc()
@@ -0,0 +1,263 @@
+import logging
+import mmap
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Union
+
+from .archive import BlockArchiveReader
+from .dcp_message import DcpMessage
+from .filters import MessageFilter
+from .ldds_message import LddsMessage
+
+logger = logging.getLogger(__name__)
+
+Decoder = Callable[[memoryview], Any]
+
+# RAM-backed directory for the temporary files of in-memory blocks, if available
+SHARED_MEMORY_DIRECTORY = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+def decode_message(message: memoryview) -> str:
+    """
+    Default decoder: the message as a string, like :meth:`DcpMessage.explode`.
+
+    :param message: A DCP message.
+    :return: The decoded message.
+    """
+    return str(message, "utf-8")
+
+
+def _explode_spans(
+    path: str,
+    spans: list[tuple[int, int]],
+    decoder: Decoder,
+    message_filter: MessageFilter = None,
+) -> list[Any]:
+    """Worker: explode and decode the blocks at the given offsets of a file."""
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapping)
+    results = []
+    try:
+        for start, end in spans:
+            for message in DcpMessage.split(view[start:end], message_filter):
+                result = decoder(message)
+                if result is not None:
+                    results.append(result)
+                message.release()
+    finally:
+        view.release()
+        try:
+            mapping.close()
+        except BufferError:
+            # a decoder kept a view of the mapping; closed once it is collected
+            pass
+    return results
+
+
+class ParallelExploder:
+    """
+    Explode and decode DCP blocks on a pool of processes.
+
+    Work is sent to the workers as byte ranges of a file rather than as block
+    bytes: archive segments are memory-mapped by the workers directly, and
+    in-memory blocks are first written to a temporary file in ``/dev/shm``
+    (when available) that the workers map. Only the decoded results are
+    pickled back.
+
+    The decoder runs in the workers on every message (a memoryview of the
+    mapping) and must return data that does not reference it, e.g. ``str``,
+    ``bytes`` or a :class:`~dcpmessage.dcp_header.DcpHeader`; messages for
+    which it returns None are dropped, so it can filter as well. It must be
+    picklable, i.e. a module-level function.
+
+    :param decoder: Function applied to every message (default: decode to ``str``).
+    :param message_filter: Header filter evaluated in the workers before decoding
+        (default: keep all). See :mod:`dcpmessage.filters`.
+    :param processes: Number of worker processes (default: number of CPUs).
+    :param chunk_size: Approximate number of block bytes per task.
+    :param ordered: Yield results in block order; otherwise in the order the
+        tasks complete.
+    """
+
+    def __init__(
+        self,
+        decoder: Decoder = decode_message,
+        message_filter: MessageFilter = None,
+        processes: int = None,
+        chunk_size: int = 8 * 1024 * 1024,
+        ordered: bool = True,
+    ):
+        self.decoder = decoder
+        self.message_filter = message_filter
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.ordered = ordered
+        self.__executor = ProcessPoolExecutor(max_workers=self.processes)
+
+    def explode_archive(
+        self, archive: Union[str, Path, BlockArchiveReader]
+    ) -> Iterator[Any]:
+        """
+        Explode and decode all messages of a block archive.
+
+        :param archive: A BlockArchiveReader or the archive directory.
+        :return: Iterator of decoded messages.
+        """
+        if not isinstance(archive, BlockArchiveReader):
+            archive = BlockArchiveReader(archive)
+        return self.__run(self.__archive_tasks(archive))
+
+    def explode_blocks(
+        self, blocks: Iterable[Union[LddsMessage, bytes, bytearray, memoryview]]
+    ) -> Iterator[Any]:
+        """
+        Explode and decode the messages of DCP blocks held in memory, e.g. the
+        result of ``LddsClient.request_dcp_blocks()``.
+
+        :param blocks: DCP blocks, as LddsMessage or block data.
+        :return: Iterator of decoded messages.
+        """
+        return self.__run(self.__block_tasks(blocks))
+
+    def __archive_tasks(self, archive: BlockArchiveReader):
+        for segment_path in archive.segments():
+            if os.path.getsize(segment_path) == 0:
+                continue
+            with open(segment_path, "rb") as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            with mapping, memoryview(mapping) as segment:
+                spans, size = [], 0
+                for start, end in archive.block_offsets(segment):
+                    spans.append((start, end))
+                    size += end - start
+                    if size >= self.chunk_size:
+                        yield str(segment_path), spans, None
+                        spans, size = [], 0
+                if spans:
+                    yield str(segment_path), spans, None
+
+    def __block_tasks(self, blocks: Iterable):
+        temp_file, spans = None, []
+        try:
+            for block in blocks:
+                if isinstance(block, LddsMessage):
+                    block = memoryview(block.message_data)[: block.message_length]
+                if temp_file is None:
+                    temp_file = tempfile.NamedTemporaryFile(
+                        prefix="dcpmessage-",
+                        suffix=".blocks",
+                        dir=SHARED_MEMORY_DIRECTORY,
+                        delete=False,
+                    )
+                start = temp_file.tell()
+                temp_file.write(block)
+                spans.append((start, temp_file.tell()))
+                if temp_file.tell() >= self.chunk_size:
+                    # the file belongs to the task from here on
+                    temp_file.close()
+                    task = (temp_file.name, spans, temp_file.name)
+                    temp_file, spans = None, []
+                    yield task
+            if temp_file is not None:
+                temp_file.close()
+                task = (temp_file.name, spans, temp_file.name)
+                temp_file = None
+                yield task
+        finally:
+            if temp_file is not None:
+                temp_file.close()
+                os.unlink(temp_file.name)
+
+    def __run(self, tasks: Iterator[tuple[str, list, str]]) -> Iterator[Any]:
+        # bound the tasks in flight, so that temporary files and results of
+        # tasks not yet consumed stay proportional to the number of workers
+        max_in_flight = 2 * self.processes
+        in_flight: deque[tuple[Future, str]] = deque()
+
+        def submit_next() -> bool:
+            task = next(tasks, None)
+            if task is None:
+                return False
+            path, spans, temp_path = task
+            future = self.__executor.submit(
+                _explode_spans, path, spans, self.decoder, self.message_filter
+            )
+            in_flight.append((future, temp_path))
+            return True
+
+        def finish(future: Future, temp_path: str) -> list:
+            try:
+                return future.result()
+            finally:
+                if temp_path is not None:
+                    os.unlink(temp_path)
+
+        try:
+            while len(in_flight) < max_in_flight and submit_next():
+                pass
+            while in_flight:
+                if self.ordered:
+                    future, temp_path = in_flight.popleft()
+                else:
+                    done, _ = wait(
+                        [f for f, _ in in_flight], return_when=FIRST_COMPLETED
+                    )
+                    future, temp_path = next(t for t in in_flight if t[0] in done)
+                    in_flight.remove((future, temp_path))
+                results = finish(future, temp_path)
+                submit_next()
+                yield from results
+        finally:
+            for future, temp_path in in_flight:
+                future.cancel()
+                wait([future])
+                if temp_path is not None:
+                    os.unlink(temp_path)
+            tasks.close()
+
+    def close(self):
+        """
+        Shut down the worker processes.
+
+        :return: None
+        """
+        self.__executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def parallel_explode(
+    source: Union[str, Path, BlockArchiveReader, Iterable[LddsMessage]],
+    decoder: Decoder = decode_message,
+    message_filter: MessageFilter = None,
+    processes: int = None,
+    ordered: bool = True,
+) -> list[Any]:
+    """
+    Explode and decode a block archive or in-memory DCP blocks on a process pool.
+    See :class:`ParallelExploder`.
+
+    :param source: A BlockArchiveReader, an archive directory, or DCP blocks.
+    :param decoder: Module-level function applied to every message (default: decode to ``str``).
+    :param message_filter: Header filter evaluated before decoding (default: keep all).
+    :param processes: Number of worker processes (default: number of CPUs).
+    :param ordered: Return results in block order; otherwise in completion order.
+    :return: List of decoded messages.
+    """
+    with ParallelExploder(
+        decoder=decoder,
+        message_filter=message_filter,
+        processes=processes,
+        ordered=ordered,
+    ) as p:
+        if isinstance(source, (str, Path, BlockArchiveReader)):
+            return list(p.explode_archive(source))
+        return list(p.explode_blocks(source))
@@ -0,0 +1,384 @@
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Union
+
+from .dcp_message import DcpMessage
+from .observers import SessionObserver
+from .search_criteria import SearchCriteria
+
+if TYPE_CHECKING:
+    from .connection import SocketOptions
+    from .events import LrgsEvent
+    from .filters import MessageFilter
+
+logger = logging.getLogger(__name__)
+
+# seconds between checks of the stop flag while waiting on a queue
+POLL_INTERVAL = 0.1
+
+_END = object()
+
+
+class Stage:
+    """
+    A step of a :class:`Pipeline`: ``function`` is called with every item of the
+    previous stage, on ``workers`` threads, and its result is passed on to the
+    next stage. A result of None is dropped.
+
+    With more than one worker, items may reach the next stage out of order.
+    Threads run Python code one at a time, so extra workers help stages that wait
+    (on disk, network or C code releasing the GIL), not pure-Python decoding; see
+    :class:`dcpmessage.parallel.ParallelExploder` for that.
+
+    :param name: Name of the stage, used in the statistics.
+    :param function: Function applied to every item.
+    :param workers: Number of threads running the stage.
+    :param queue_size: Maximum number of items waiting for the stage. A full queue
+        blocks the previous stage, and eventually the source.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        function: Callable[[Any], Any],
+        workers: int = 1,
+        queue_size: int = 16,
+    ):
+        assert workers >= 1, "A stage needs at least one worker"
+        self.name = name
+        self.function = function
+        self.workers = workers
+        self.queue_size = queue_size
+
+
+class StageStats:
+    """
+    Counters of a pipeline stage, updated while the pipeline runs.
+
+    :param name: Name of the stage.
+    :param workers: Number of threads running the stage.
+    """
+
+    __slots__ = ("name", "workers", "items", "busy", "blocked", "lock")
+
+    def __init__(self, name: str, workers: int = 1):
+        self.name = name
+        self.workers = workers
+        # items processed, seconds spent processing and waiting on a full queue
+        self.items = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, busy: float, blocked: float):
+        with self.lock:
+            self.items += 1
+            self.busy += busy
+            self.blocked += blocked
+
+
+class Pipeline:
+    """
+    Run a source and a chain of stages concurrently, connected by bounded queues,
+    so that a slow stage (e.g. a decoder or a disk write) does not stall the
+    reading of the source until its queue is full::
+
+        source -> queue -> stage 1 -> queue -> ... -> stage n
+
+    The source is iterated on its own thread. The first exception raised by the
+    source or a stage stops the pipeline and is raised again by :meth:`join`.
+    :meth:`stats` can be called from another thread while the pipeline runs.
+
+    :param source: Items to process, e.g. DCP blocks.
+    :param stages: The stages, in order; the result of the last one is discarded.
+    """
+
+    def __init__(self, source: Iterable[Any], stages: list[Stage]):
+        assert stages, "A pipeline needs at least one stage"
+        self.source = source
+        self.stages = list(stages)
+        self.__queues = [queue.Queue(maxsize=s.queue_size) for s in self.stages]
+        self.__stats = [StageStats("source")] + [
+            StageStats(s.name, s.workers) for s in self.stages
+        ]
+        self.__running = [s.workers for s in self.stages]
+        self.__lock = threading.Lock()
+        self.__stop = threading.Event()
+        self.__error: BaseException = None
+        self.__threads: list[threading.Thread] = []
+        self.__started: float = None
+        self.__finished: float = None
+
+    def start(self):
+        """
+        Start the threads of the source and the stages.
+
+        :return: None
+        """
+        assert self.__started is None, "Pipeline already started"
+        self.__started = time.monotonic()
+        self.__threads.append(
+            threading.Thread(target=self.__read, name="pipeline-source", daemon=True)
+        )
+        for index, stage in enumerate(self.stages):
+            for worker in range(stage.workers):
+                self.__threads.append(
+                    threading.Thread(
+                        target=self.__work,
+                        args=(index,),
+                        name=f"pipeline-{stage.name}-{worker}",
+                        daemon=True,
+                    )
+                )
+        for thread in self.__threads:
+            thread.start()
+
+    def join(self) -> dict:
+        """
+        Wait for the pipeline to process every item of the source, or to fail.
+
+        :return: The final statistics, see :meth:`stats`.
+        :raises Exception: The first exception raised by the source or a stage.
+        """
+        for thread in self.__threads:
+            thread.join()
+        if self.__finished is None:
+            self.__finished = time.monotonic()
+        if self.__error is not None:
+            raise self.__error
+        return self.stats()
+
+    def run(self) -> dict:
+        """
+        Start the pipeline and wait for it, see :meth:`join`.
+
+        :return: The final statistics.
+        """
+        self.start()
+        return self.join()
+
+    def stop(self):
+        """
+        Ask the source and the stages to stop; items still queued are discarded.
+
+        :return: None
+        """
+        self.__stop.set()
+
+    def stats(self) -> dict:
+        """
+        Return the statistics of the source and every stage.
+
+        :return: dict of stage name (``"source"`` first) to a dict with ``workers``,
+            ``items`` processed, ``queue_depth`` and ``queue_size`` of its input queue,
+            ``throughput`` (items per second since the start), ``busy_seconds`` spent
+            processing and ``blocked_seconds`` spent waiting on a full next queue.
+            A stage with a deep queue and a busy previous stage is the bottleneck.
+        """
+        if self.__started is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self.__finished or time.monotonic()) - self.__started
+        result = {}
+        for index, stats in enumerate(self.__stats):
+            input_queue = self.__queues[index - 1] if index else None
+            with stats.lock:
+                result[stats.name] = {
+                    "workers": stats.workers,
+                    "items": stats.items,
+                    "queue_depth": 0 if input_queue is None else input_queue.qsize(),
+                    "queue_size": 0 if input_queue is None else input_queue.maxsize,
+                    "throughput": stats.items / elapsed if elapsed > 0 else 0.0,
+                    "busy_seconds": stats.busy,
+                    "blocked_seconds": stats.blocked,
+                }
+        return result
+
+    def __fail(self, ex: BaseException):
+        with self.__lock:
+            if self.__error is None:
+                self.__error = ex
+        self.__stop.set()
+
+    def __put(self, index: int, item: Any) -> bool:
+        """Put an item in the queue of stage ``index``, unless the pipeline stops."""
+        target = self.__queues[index]
+        while not self.__stop.is_set():
+            try:
+                target.put(item, timeout=POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def __end(self, index: int):
+        """Tell every worker of stage ``index`` that no more items will come."""
+        if index < len(self.stages):
+            for _ in range(self.stages[index].workers):
+                self.__put(index, _END)
+
+    def __read(self):
+        stats = self.__stats[0]
+        items = iter(self.source)
+        try:
+            while not self.__stop.is_set():
+                start = time.perf_counter()
+                try:
+                    item = next(items)
+                except StopIteration:
+                    break
+                ready = time.perf_counter()
+                if not self.__put(0, item):
+                    break
+                stats.add(ready - start, time.perf_counter() - ready)
+        except BaseException as ex:
+            logger.error(f"Pipeline source failed: {ex}")
+            self.__fail(ex)
+        finally:
+            close = getattr(items, "close", None)
+            if close is not None:
+                # e.g. end the session of a generator stopped early
+                try:
+                    close()
+                except Exception as ex:
+                    logger.warning(f"Closing the pipeline source failed: {ex}")
+        self.__end(0)
+
+    def __work(self, index: int):
+        stage = self.stages[index]
+        stats = self.__stats[index + 1]
+        source = self.__queues[index]
+        last = index + 1 == len(self.stages)
+        try:
+            while not self.__stop.is_set():
+                try:
+                    item = source.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+                if item is _END:
+                    break
+                start = time.perf_counter()
+                result = stage.function(item)
+                ready = time.perf_counter()
+                if (
+                    result is not None
+                    and not last
+                    and not self.__put(index + 1, result)
+                ):
+                    break
+                stats.add(ready - start, time.perf_counter() - ready)
+        except BaseException as ex:
+            logger.error(f"Pipeline stage {stage.name} failed: {ex}")
+            self.__fail(ex)
+        with self.__lock:
+            self.__running[index] -= 1
+            finished = self.__running[index] == 0
+        if finished:
+            self.__end(index + 1)
+
+    @staticmethod
+    def session(
+        username: str,
+        password: str,
+        search_criteria: Union[dict, str, Path, SearchCriteria],
+        host: str,
+        sink: Callable[[Any], None],
+        transform: Callable[[str], Any] = None,
+        port: int = 16003,
+        timeout: int = 30,
+        explode_workers: int = 1,
+        transform_workers: int = 1,
+        sink_workers: int = 1,
+        queue_size: int = 16,
+        observer: SessionObserver = None,
+        capture: Union[str, Path] = None,
+        message_filter: "MessageFilter" = None,
+        tolerant: bool = False,
+        socket_options: "SocketOptions" = None,
+        on_event: Callable[["LrgsEvent"], None] = None,
+    ) -> "Pipeline":
+        """
+        Build a pipeline fetching DCP messages like :meth:`DcpMessage.stream`, in
+        four stages: the LDDS session reading blocks, ``explode`` splitting them into
+        messages, ``transform`` (e.g. decoding) and ``sink`` (e.g. a disk write)::
+
+            sink = MessageSink("out")
+            pipeline = Pipeline.session(..., transform=decode, sink=sink.write)
+            pipeline.run()
+
+        Items flow between stages as the messages of one block, so queue sizes count
+        blocks. Blocks keep being requested while the later stages catch up, until
+        ``queue_size`` blocks are waiting.
+
+        :param username: Username for server authentication.
+        :param password: Password for server authentication.
+        :param search_criteria: File path to search criteria, search criteria as a dict,
+            or a SearchCriteria.
+        :param host: Hostname or IP address of the server.
+        :param sink: Called with every transformed message.
+        :param transform: Applied to every message; messages for which it returns None
+            are dropped (default: messages are passed on unchanged).
+        :param port: Port number for server connection (default: 16003).
+        :param timeout: Connection timeout in seconds (default: 30 seconds).
+        :param explode_workers: Number of threads splitting blocks into messages.
+        :param transform_workers: Number of threads running ``transform``.
+        :param sink_workers: Number of threads running ``sink``; it must be thread-safe
+            if more than one.
+        :param queue_size: Maximum number of blocks waiting for each stage.
+        :param observer: Observer notified of session timings and volumes (default: no-op).
+        :param capture: Path of a capture file to append every sent and received frame to
+            (default: no recording).
+        :param message_filter: Keep only messages passing this filter, evaluated on the raw
+            header bytes before decoding (default: keep all).
+        :param tolerant: Skip corrupt messages of a block instead of failing, see
+            :meth:`DcpMessage.split` (default: False).
+        :param socket_options: Options of the socket (default: ``SocketOptions()``).
+        :param on_event: Called on a background thread with every LRGS server event
+            logged during the session (default: events are not requested).
+        :return: The pipeline, not started.
+        """
+        criteria = SearchCriteria.load(search_criteria)
+        sessions = []
+
+        def blocks() -> Iterator:
+            with DcpMessage._session(
+                username=username,
+                password=password,
+                criteria=criteria,
+                host=host,
+                port=port,
+                timeout=timeout,
+                observer=observer,
+                capture=capture,
+                socket_options=socket_options,
+                on_event=on_event,
+            ) as client:
+                sessions.append(client)
+                yield from client.iter_dcp_blocks()
+
+        def explode(block) -> list[str]:
+            start = time.perf_counter()
+            messages = DcpMessage.explode([block], message_filter, tolerant)
+            sessions[0].observer.on_explode(
+                time.perf_counter() - start, 1, len(messages)
+            )
+            return messages
+
+        def transform_all(messages: list[str]) -> list[Any]:
+            results = [transform(m) for m in messages]
+            return [r for r in results if r is not None]
+
+        def sink_all(results: list[Any]):
+            for result in results:
+                sink(result)
+
+        stages = [Stage("explode", explode, explode_workers, queue_size)]
+        if transform is not None:
+            stages.append(
+                Stage("transform", transform_all, transform_workers, queue_size)
+            )
+        stages.append(Stage("sink", sink_all, sink_workers, queue_size))
+        return Pipeline(blocks(), stages)
@@ -0,0 +1,265 @@
+import logging
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Union
+
+from .dcp_header import DcpHeader
+from .dcp_message import DcpMessage, RetrievalResult
+from .search_criteria import DcpAddress, SearchCriteria
+from .utils import TimeUtil
+
+logger = logging.getLogger(__name__)
+
+
+class MessageDigest:
+    """
+    Compact summary of a retrieval: the sorted transmit times of the messages
+    of every DCP address, used to find gaps and to recognize duplicates.
+
+    :param messages: DCP messages.
+    """
+
+    def __init__(self, messages: Iterable[str] = ()):
+        times: dict[str, list[int]] = {}
+        for message in messages:
+            self.__add(times, message)
+        self.times: dict[str, array] = {
+            address: array("q", sorted(set(values)))
+            for address, values in times.items()
+        }
+        self.keys = {
+            (address, t) for address, values in self.times.items() for t in values
+        }
+
+    @staticmethod
+    def __add(times: dict[str, list[int]], message: str):
+        try:
+            timestamp = DcpHeader.transmit_timestamp(message)
+        except ValueError:
+            return
+        times.setdefault(message[:8], []).append(timestamp)
+
+    @staticmethod
+    def key(message: str) -> tuple[str, int]:
+        """
+        Identity of a message across servers: its address and transmit time. The
+        other header fields (e.g. the data source) may differ between servers.
+
+        :param message: A DCP message.
+        :return: (address, transmit time in POSIX seconds)
+        :raises ValueError: If the transmit time is invalid.
+        """
+        return message[:8], DcpHeader.transmit_timestamp(message)
+
+    def __contains__(self, message: str) -> bool:
+        try:
+            return self.key(message) in self.keys
+        except ValueError:
+            return False
+
+    def gaps(
+        self,
+        since: int,
+        until: int,
+        addresses: Iterable[str] = (),
+        gap_factor: float = 2.5,
+        min_gap: int = 3600,
+    ) -> list[tuple[str, int, int]]:
+        """
+        Find the time windows in which a DCP probably has missing messages.
+
+        A window between consecutive messages (or between the window bounds and
+        the first or last message) is a gap when it is longer than ``gap_factor``
+        times the median interval of the address, and at least ``min_gap``
+        seconds. Addresses without any message are missing for the whole window.
+
+        :param since: Start of the retrieval window, POSIX seconds.
+        :param until: End of the retrieval window, POSIX seconds.
+        :param addresses: Addresses expected in the window, besides those seen.
+        :param gap_factor: Multiple of the median interval that makes a gap.
+        :param min_gap: Minimum length of a gap in seconds.
+        :return: List of (address, gap start, gap end), POSIX seconds.
+        """
+        gaps = []
+        for address in sorted(set(addresses) | set(self.times)):
+            times = self.times.get(address)
+            if not times:
+                gaps.append((address, since, until))
+                continue
+            intervals = sorted(b - a for a, b in zip(times, times[1:]) if b > a)
+            threshold = min_gap
+            if intervals:
+                threshold = max(min_gap, gap_factor * intervals[len(intervals) // 2])
+            bounds = [since, *times, until]
+            for start, end in zip(bounds, bounds[1:]):
+                if end - start > threshold:
+                    gaps.append((address, start, end))
+        return gaps
+
+
+def gap_criteria(
+    gaps: list[tuple[str, int, int]],
+    sources: list[int] = (),
+    max_addresses: int = 100,
+) -> list[SearchCriteria]:
+    """
+    Group gaps into few narrow search criteria: gaps overlapping in time share
+    a criteria with the union of their addresses and windows.
+
+    :param gaps: List of (address, gap start, gap end), POSIX seconds.
+    :param sources: Sources of the criteria (default: all).
+    :param max_addresses: Maximum number of addresses per criteria.
+    :return: List of SearchCriteria with absolute times.
+    """
+
+    def criteria(start: int, end: int, addresses: set[str]) -> SearchCriteria:
+        return SearchCriteria(
+            TimeUtil.format_lrgs_time(datetime.fromtimestamp(start, timezone.utc)),
+            TimeUtil.format_lrgs_time(datetime.fromtimestamp(end, timezone.utc)),
+            [DcpAddress(address) for address in sorted(addresses)],
+            list(sources),
+        )
+
+    result = []
+    group_start = group_end = None
+    addresses: set[str] = set()
+    for address, start, end in sorted(gaps, key=lambda gap: gap[1]):
+        if addresses and (
+            start > group_end
+            or (address not in addresses and len(addresses) >= max_addresses)
+        ):
+            result.append(criteria(group_start, group_end, addresses))
+            addresses = set()
+        if not addresses:
+            group_start, group_end = start, end
+        addresses.add(address)
+        group_end = max(group_end, end)
+    if addresses:
+        result.append(criteria(group_start, group_end, addresses))
+    return result
+
+
+class ReconciledResult(RetrievalResult):
+    """
+    Messages of a reconciled retrieval, see :func:`reconcile`.
+
+    :param messages: The merged DCP messages.
+    :param complete: False if a follow-up query to the secondary server failed.
+    :param filled: Number of messages added from the secondary server.
+    :param gap_criteria: The follow-up criteria sent to the secondary server.
+    """
+
+    def __init__(
+        self,
+        messages: list[str] = (),
+        complete: bool = True,
+        filled: int = 0,
+        gap_criteria: list[SearchCriteria] = (),
+    ):
+        super().__init__(messages, complete)
+        self.filled = filled
+        self.gap_criteria = list(gap_criteria)
+
+
+def reconcile(
+    username: str,
+    password: str,
+    search_criteria: Union[dict, str, Path, SearchCriteria],
+    primary: str,
+    secondary: str,
+    port: int = 16003,
+    timeout: int = 30,
+    gap_factor: float = 2.5,
+    min_gap: int = 3600,
+    max_addresses: int = 100,
+    now: datetime = None,
+    **get_kwargs,
+) -> ReconciledResult:
+    """
+    Fetch messages from a primary LRGS server and fill its gaps from a secondary
+    server, without pulling the whole window from both.
+
+    The primary result is summarized as a :class:`MessageDigest`; windows where a
+    DCP is silent much longer than usual (see :meth:`MessageDigest.gaps`) are
+    re-queried on the secondary server with narrowed criteria, and only messages
+    not already received (same address and transmit time) are added. If the
+    primary server fails, the whole criteria is fetched from the secondary.
+
+    Only DCPs listed in the criteria, or seen in the primary result, can be
+    checked for gaps.
+
+    :param username: Username for server authentication.
+    :param password: Password for server authentication.
+    :param search_criteria: File path to search criteria, search criteria as a dict,
+        or a SearchCriteria. Relative times are resolved once, so that both servers
+        are asked for the same window.
+    :param primary: Hostname or IP address of the primary server.
+    :param secondary: Hostname or IP address of the secondary server.
+    :param port: Port number of both servers (default: 16003).
+    :param timeout: Socket timeout in seconds (default: 30 seconds).
+    :param gap_factor: Multiple of the median interval of a DCP that makes a gap.
+    :param min_gap: Minimum length of a gap in seconds.
+    :param max_addresses: Maximum number of addresses per follow-up criteria.
+    :param now: Reference time for relative criteria times (default: now).
+    :param get_kwargs: Further keyword arguments passed to ``DcpMessage.get``.
+    :return: The merged messages: the primary messages, then the added ones.
+    :raises ValueError: If the criteria times cannot be resolved on the client.
+    """
+    criteria = SearchCriteria.load(search_criteria).resolve(now)
+    since, until = (int(t.timestamp()) for t in criteria.window())
+
+    def get(host: str, query: SearchCriteria) -> list[str]:
+        return DcpMessage.get(
+            username=username,
+            password=password,
+            search_criteria=query,
+            host=host,
+            port=port,
+            timeout=timeout,
+            **get_kwargs,
+        )
+
+    try:
+        messages = list(get(primary, criteria))
+    except Exception as ex:
+        logger.warning(f"Primary server {primary} failed ({ex}); using {secondary}")
+        messages = list(get(secondary, criteria))
+        return ReconciledResult(messages, filled=len(messages), gap_criteria=[criteria])
+
+    digest = MessageDigest(messages)
+    gaps = digest.gaps(
+        since,
+        until,
+        (a.address for a in criteria.dcp_address),
+        gap_factor=gap_factor,
+        min_gap=min_gap,
+    )
+    follow_ups = gap_criteria(
+        gaps, criteria.sources[: criteria.num_sources], max_addresses
+    )
+    logger.info(
+        f"{len(messages)} messages from {primary}; {len(gaps)} gaps in "
+        f"{len(follow_ups)} follow-up queries to {secondary}"
+    )
+
+    complete = True
+    filled = 0
+    for follow_up in follow_ups:
+        try:
+            secondary_messages = get(secondary, follow_up)
+        except Exception as ex:
+            logger.warning(f"Gap query to {secondary} failed: {ex}")
+            complete = False
+            continue
+        for message in secondary_messages:
+            try:
+                key = MessageDigest.key(message)
+            except ValueError:
+                continue
+            if key not in digest.keys:
+                digest.keys.add(key)
+                messages.append(message)
+                filled += 1
+
+    return ReconciledResult(messages, complete, filled, follow_ups)
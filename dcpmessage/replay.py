@@ -0,0 +1,92 @@
+import logging
+import time
+from pathlib import Path
+from typing import BinaryIO, Iterator, Union
+
+from .capture import CaptureConstants, CaptureRecord, read_capture
+from .ldds_client import LddsClient
+from .observers import SessionObserver
+
+logger = logging.getLogger(__name__)
+
+
+class ReplaySocket:
+    """
+    Socket stand-in that serves the received frames of a capture.
+
+    Sent data is discarded; each ``sendall`` releases the next received frame,
+    so request/response exchanges replay in their original order.
+
+    :param records: Records of a capture.
+    :param paced: Sleep to reproduce the original timing between frames.
+    """
+
+    def __init__(self, records: Iterator[CaptureRecord], paced: bool = False):
+        self.records = records
+        self.paced = paced
+        self.buffer = b""
+        self.__first_timestamp = None
+        self.__started = None
+
+    def __next_received(self) -> bytes:
+        for timestamp, direction, data in self.records:
+            if direction != CaptureConstants.RECEIVED:
+                continue
+            if self.paced:
+                if self.__first_timestamp is None:
+                    self.__first_timestamp = timestamp
+                    self.__started = time.monotonic()
+                delay = (timestamp - self.__first_timestamp) - (
+                    time.monotonic() - self.__started
+                )
+                if delay > 0:
+                    time.sleep(delay)
+            return data
+        return b""
+
+    def settimeout(self, timeout):
+        pass
+
+    def sendall(self, data: bytes):
+        pass
+
+    def recv(self, buffer_size: int) -> bytes:
+        if not self.buffer:
+            self.buffer = self.__next_received()
+        data, self.buffer = self.buffer[:buffer_size], self.buffer[buffer_size:]
+        return data
+
+    def close(self):
+        pass
+
+
+class ReplayClient(LddsClient):
+    """
+    LddsClient that replays a capture file instead of talking to a server.
+
+    All LddsClient methods (``authenticate_user``, ``request_dcp_blocks``, ...)
+    work unchanged, so recorded sessions can be re-parsed and profiled offline.
+
+    :param capture: Path of the capture file, or a binary file object.
+    :param paced: Reproduce the original pace instead of replaying at full speed.
+    :param observer: Observer notified of session timings and volumes.
+    """
+
+    def __init__(
+        self,
+        capture: Union[str, Path, BinaryIO],
+        paced: bool = False,
+        observer: SessionObserver = None,
+    ):
+        super().__init__(host=str(capture), port=0, timeout=0, observer=observer)
+        self.capture_source = capture
+        self.paced = paced
+
+    def connect(self):
+        """
+        Open the capture for replay.
+
+        :return: None
+        """
+        logger.info(f"Replaying capture {self.capture_source}")
+        self.socket = ReplaySocket(read_capture(self.capture_source), self.paced)
@@ -0,0 +1,349 @@
+import csv
+import heapq
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from .dcp_header import DcpHeader
+from .search_criteria import DcpAddress, DcpMessageSource, SearchCriteria
+from .utils import TimeUtil
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400
+
+
+def _seconds(value: Union[int, float, str]) -> int:
+    """Seconds from a number or an ``HH:MM:SS`` string."""
+    if isinstance(value, str) and ":" in value:
+        hours, minutes, seconds = (int(part) for part in value.split(":"))
+        return hours * 3600 + minutes * 60 + seconds
+    return int(value)
+
+
+@dataclass(frozen=True)
+class DcpSchedule:
+    """
+    Self-timed transmission schedule of a DCP: a window of ``window`` seconds
+    starting at ``first_transmission`` after midnight UTC and every ``interval``
+    seconds after it, restarting every day.
+
+    :param address: DCP address.
+    :param first_transmission: Seconds after midnight UTC of the first window of a day.
+    :param interval: Seconds between windows.
+    :param window: Length of the transmission window in seconds.
+    """
+
+    address: str
+    first_transmission: int
+    interval: int
+    window: int = 60
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DcpSchedule":
+        """
+        Create a schedule from a dict, with times in seconds or as ``HH:MM:SS``.
+
+        :param data: dict with ``address``, ``first_transmission``, ``interval`` and
+            optionally ``window``.
+        :return: A DcpSchedule.
+        :raises ValueError: If a field is missing or invalid.
+        """
+        try:
+            schedule = cls(
+                address=data["address"].upper(),
+                first_transmission=_seconds(data["first_transmission"]),
+                interval=_seconds(data["interval"]),
+                window=_seconds(data.get("window") or 60),
+            )
+        except (KeyError, TypeError, ValueError) as ex:
+            raise ValueError(f"Invalid schedule {data!r}: {ex}") from ex
+        if len(schedule.address) != 8 or schedule.interval <= 0:
+            raise ValueError(f"Invalid schedule {data!r}")
+        return schedule
+
+    def nearest_slot(self, timestamp: int) -> int:
+        """
+        Start of the transmission window closest to a time.
+
+        :param timestamp: POSIX seconds.
+        :return: POSIX seconds of the window start.
+        """
+        day_start = timestamp - timestamp % SECONDS_PER_DAY
+        index = round((timestamp - day_start - self.first_transmission) / self.interval)
+        slot = day_start + self.first_transmission + index * self.interval
+        if index < 0:
+            return self.__last_slot(day_start - SECONDS_PER_DAY)
+        if slot >= day_start + SECONDS_PER_DAY:
+            return self.__last_slot(day_start)
+        return slot
+
+    def next_slot(self, timestamp: int) -> int:
+        """
+        Start of the first transmission window strictly after a time.
+
+        :param timestamp: POSIX seconds.
+        :return: POSIX seconds of the window start.
+        """
+        day_start = timestamp - timestamp % SECONDS_PER_DAY
+        offset = timestamp - day_start - self.first_transmission
+        if offset < 0:
+            return day_start + self.first_transmission
+        slot = (
+            day_start
+            + self.first_transmission
+            + (offset // self.interval + 1) * self.interval
+        )
+        if slot >= day_start + SECONDS_PER_DAY:
+            return day_start + SECONDS_PER_DAY + self.first_transmission
+        return slot
+
+    def __last_slot(self, day_start: int) -> int:
+        count = (SECONDS_PER_DAY - 1 - self.first_transmission) // self.interval
+        return day_start + self.first_transmission + count * self.interval
+
+
+class ScheduleIndex:
+    """
+    Self-timed schedules keyed by DCP address.
+
+    :param schedules: The schedules.
+    """
+
+    def __init__(self, schedules: Iterable[DcpSchedule] = ()):
+        self.schedules: dict[str, DcpSchedule] = {s.address: s for s in schedules}
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "ScheduleIndex":
+        """
+        Load schedules from a JSON file (a list of objects) or a CSV file (with a
+        header row), with the fields of :meth:`DcpSchedule.from_dict`::
+
+            address,first_transmission,interval,window
+            CE4A3B2C,00:12:30,01:00:00,10
+
+        :param path: Path of the ``.json`` or ``.csv`` file.
+        :return: A ScheduleIndex.
+        :raises ValueError: If a schedule is invalid.
+        """
+        path = Path(path)
+        with open(path, "r", newline="") as f:
+            if path.suffix.lower() == ".csv":
+                records = list(csv.DictReader(f))
+            else:
+                import json
+
+                records = json.load(f)
+        return cls(DcpSchedule.from_dict(record) for record in records)
+
+    def get(self, address: str) -> Optional[DcpSchedule]:
+        """
+        Return the schedule of a DCP.
+
+        :param address: DCP address.
+        :return: The schedule, or None if the DCP is not scheduled.
+        """
+        return self.schedules.get(address)
+
+    def __len__(self) -> int:
+        return len(self.schedules)
+
+    def __contains__(self, address: str) -> bool:
+        return address in self.schedules
+
+
+@dataclass(frozen=True)
+class ScheduleEvent:
+    """
+    A missing or late transmission.
+
+    :param kind: ``"missing"`` when no message was received for a window by its
+        deadline, ``"late"`` when a message for a window already reported missing
+        arrives afterwards.
+    :param address: DCP address.
+    :param slot: Start of the transmission window, POSIX seconds.
+    :param transmit_time: Transmit time of the late message, POSIX seconds.
+    """
+
+    kind: str
+    address: str
+    slot: int
+    transmit_time: Optional[int] = None
+
+    @property
+    def slot_time(self) -> datetime:
+        """Start of the transmission window as a datetime."""
+        return datetime.fromtimestamp(self.slot, timezone.utc)
+
+
+class ScheduleChecker:
+    """
+    Compare received messages with the self-timed schedules of their DCPs and
+    report missing and late transmissions as they happen.
+
+    A transmission window is due ``grace`` seconds after it ends. :meth:`check`
+    reports every window due by then without a message as missing; a message for
+    a missing window arriving later is reported as late, and the window is no
+    longer a gap. Due windows are kept in a heap with one entry per DCP, so
+    feeding a message and checking cost O(log n) for n scheduled DCPs. Safe to
+    share between threads.
+
+    :param index: The schedules.
+    :param grace: Seconds after the end of a window before it is reported missing.
+    :param start: POSIX time from which windows are checked (default: now).
+    :param max_gaps: Missing windows kept per DCP for :meth:`gap_criteria`.
+    """
+
+    def __init__(
+        self,
+        index: ScheduleIndex,
+        grace: float = 900,
+        start: float = None,
+        max_gaps: int = 24,
+    ):
+        self.index = index
+        self.grace = grace
+        self.max_gaps = max_gaps
+        self.received = 0
+        self.unscheduled = 0
+        self.invalid = 0
+        self.__lock = threading.Lock()
+        start = int(time.time() if start is None else start)
+        # (deadline, address, slot) of the next window of every DCP
+        self.__due = []
+        for schedule in index.schedules.values():
+            slot = schedule.next_slot(start - 1)
+            self.__due.append((self.__deadline(schedule, slot), schedule.address, slot))
+        heapq.heapify(self.__due)
+        self.__seen: dict[str, set[int]] = {}
+        self.__gaps: dict[str, list[int]] = {}
+
+    def __deadline(self, schedule: DcpSchedule, slot: int) -> float:
+        return slot + schedule.window + self.grace
+
+    def observe(
+        self, message: Union[str, bytes, bytearray, memoryview]
+    ) -> Optional[ScheduleEvent]:
+        """
+        Record a received message.
+
+        :param message: The DCP message, or at least its header. A message with an
+            unreadable transmit time is counted in ``invalid``.
+        :return: A ``"late"`` event if the message fills a window already reported
+            missing, else None.
+        """
+        if not isinstance(message, str):
+            message = str(message[:19], "ascii", "replace")
+        address = message[:8]
+        schedule = self.index.get(address)
+        if schedule is None:
+            self.unscheduled += 1
+            return None
+        try:
+            transmit_time = DcpHeader.transmit_timestamp(message)
+        except ValueError:
+            with self.__lock:
+                self.invalid += 1
+            return None
+        slot = schedule.nearest_slot(transmit_time)
+        with self.__lock:
+            self.received += 1
+            gaps = self.__gaps.get(address)
+            if gaps and slot in gaps:
+                gaps.remove(slot)
+                return ScheduleEvent("late", address, slot, transmit_time)
+            self.__seen.setdefault(address, set()).add(slot)
+        return None
+
+    def check(self, now: float = None) -> list[ScheduleEvent]:
+        """
+        Report the windows that became due without a message.
+
+        :param now: POSIX time (default: now).
+        :return: ``"missing"`` events, oldest first.
+        """
+        now = time.time() if now is None else now
+        events = []
+        with self.__lock:
+            while self.__due and self.__due[0][0] <= now:
+                _, address, slot = self.__due[0]
+                schedule = self.index.schedules[address]
+                seen = self.__seen.get(address)
+                if not seen or slot not in seen:
+                    events.append(ScheduleEvent("missing", address, slot))
+                    gaps = self.__gaps.setdefault(address, [])
+                    gaps.append(slot)
+                    del gaps[: -self.max_gaps]
+                if seen:
+                    # forget this window and any earlier one
+                    seen.difference_update([s for s in seen if s <= slot])
+                next_slot = schedule.next_slot(slot)
+                heapq.heapreplace(
+                    self.__due,
+                    (self.__deadline(schedule, next_slot), address, next_slot),
+                )
+        return events
+
+    def gaps(self) -> dict[str, list[int]]:
+        """
+        Return the windows reported missing for which no message arrived since.
+
+        :return: dict of DCP address to window starts (POSIX seconds), oldest first.
+        """
+        with self.__lock:
+            return {
+                address: list(slots) for address, slots in self.__gaps.items() if slots
+            }
+
+    def gap_criteria(
+        self,
+        now: float = None,
+        merge: float = 3600,
+        max_addresses: int = 100,
+        clear: bool = True,
+    ) -> list[SearchCriteria]:
+        """
+        Build search criteria re-querying only the open gaps: the DCPs with missing
+        windows, from the earliest missing window until now, self-timed messages only.
+        Gaps starting within ``merge`` seconds of each other share a criteria.
+
+        :param now: POSIX time used as ``DRS_UNTIL`` (default: now).
+        :param merge: Seconds within which gaps are grouped into one criteria.
+        :param max_addresses: Maximum number of DCP addresses per criteria.
+        :param clear: Forget the gaps once criteria were built for them.
+        :return: List of SearchCriteria with absolute times.
+        """
+        now = time.time() if now is None else now
+        with self.__lock:
+            first_gaps = sorted(
+                (slots[0], address) for address, slots in self.__gaps.items() if slots
+            )
+            if clear:
+                self.__gaps.clear()
+
+        until = TimeUtil.format_lrgs_time(datetime.fromtimestamp(now, timezone.utc))
+        criteria = []
+        group: list[tuple[int, str]] = []
+        for gap in first_gaps + [None]:
+            if group and (
+                gap is None
+                or gap[0] - group[0][0] > merge
+                or len(group) >= max_addresses
+            ):
+                since = datetime.fromtimestamp(group[0][0], timezone.utc)
+                criteria.append(
+                    SearchCriteria(
+                        TimeUtil.format_lrgs_time(since),
+                        until,
+                        [DcpAddress(address) for _, address in group],
+                        [DcpMessageSource.GOES_SELFTIMED.value],
+                    )
+                )
+                group = []
+            if gap is not None:
+                group.append(gap)
+        return criteria
@@ -0,0 +1,308 @@
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Union
+
+from .dcp_message import DcpMessage
+from .limiter import AimdLimiter
+from .search_criteria import SearchCriteria
+
+logger = logging.getLogger(__name__)
+
+# seconds between retries of a run waiting for a slot of a shared limiter, whose
+# release by another user does not wake the scheduler
+LIMITER_POLL_INTERVAL = 0.1
+
+
+@dataclass
+class JobPriority:
+    """
+    Conventional job priorities; lower values run first.
+
+    :param REALTIME: Priority of real-time polls.
+    :param ROUTINE: Priority of regular polls.
+    :param BACKFILL: Priority of backfill work.
+    """
+
+    REALTIME: int = 0
+    ROUTINE: int = 5
+    BACKFILL: int = 10
+
+
+@dataclass
+class PollJob:
+    """
+    A recurring ``DcpMessage.get`` job.
+
+    :param name: Unique name of the job.
+    :param search_criteria: Path to a JSON file, a dict, or a SearchCriteria.
+    :param cadence: Seconds between runs.
+    :param priority: Lower values run first when sessions are scarce (see JobPriority).
+    :param host_group: Name of the group of servers the job may run on.
+    """
+
+    name: str
+    search_criteria: Union[dict, str, Path, SearchCriteria]
+    cadence: float
+    priority: int = JobPriority.ROUTINE
+    host_group: str = "default"
+
+
+@dataclass(order=True)
+class ScheduledRun:
+    """A due run of a job waiting for a session slot."""
+
+    priority: int
+    due: float
+    sequence: int
+    base: float = field(compare=False)
+    job: PollJob = field(compare=False)
+
+
+class PollScheduler:
+    """
+    Run recurring poll jobs with per-server and per-user session limits.
+
+    Due jobs wait in a priority queue and are started, highest priority first,
+    as soon as a server of their host group and the user have a free session.
+    A job never overlaps with itself; a run that falls behind skips the missed
+    slots. Every run is delayed by a random jitter of up to ``jitter`` times the
+    cadence so that jobs on the same cadence do not connect at the same instant.
+
+    :param username: Username for server authentication.
+    :param password: Password for server authentication.
+    :param host_groups: dict of host group name to its server hostnames.
+    :param jobs: Initial jobs.
+    :param max_sessions_per_host: Maximum concurrent sessions on one server.
+    :param max_sessions_per_user: Maximum concurrent sessions of the user over all servers.
+    :param jitter: Fraction of the cadence used as the maximum random delay.
+    :param on_result: Called with the job and its messages after each successful run.
+    :param on_error: Called with the job and the exception after each failed run.
+    :param limiter: Adaptive session limiter; when given, runs also need one of its slots,
+        so the user limit shrinks while the server pushes back (default: no limiter).
+    :param get_kwargs: Further keyword arguments passed to ``DcpMessage.get``.
+    """
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        host_groups: dict[str, list[str]],
+        jobs: list[PollJob] = (),
+        max_sessions_per_host: int = 1,
+        max_sessions_per_user: int = 4,
+        jitter: float = 0.1,
+        on_result: Callable[[PollJob, list[str]], None] = None,
+        on_error: Callable[[PollJob, Exception], None] = None,
+        limiter: AimdLimiter = None,
+        **get_kwargs,
+    ):
+        self.username = username
+        self.password = password
+        self.host_groups = host_groups
+        self.max_sessions_per_host = max_sessions_per_host
+        self.max_sessions_per_user = max_sessions_per_user
+        self.jitter = jitter
+        self.on_result = on_result
+        self.on_error = on_error
+        self.limiter = limiter
+        self.get_kwargs = get_kwargs
+
+        self.__condition = threading.Condition()
+        self.__sequence = itertools.count()
+        self.__timers: list[tuple[float, int, float, PollJob]] = []
+        self.__ready: list[ScheduledRun] = []
+        self.__running: set[str] = set()
+        self.__host_sessions: dict[str, int] = {}
+        self.__lag: dict[str, float] = {}
+        self.__runs = 0
+        self.__failures = 0
+        self.__stopped = True
+        self.__thread: threading.Thread = None
+        self.__executor: ThreadPoolExecutor = None
+
+        for job in jobs:
+            self.add_job(job)
+
+    def add_job(self, job: PollJob):
+        """
+        Add a job; its first run is due after a random jitter.
+
+        :param job: The job to add.
+        :return: None
+        """
+        assert job.host_group in self.host_groups, (
+            f"Unknown host group '{job.host_group}' for job '{job.name}'"
+        )
+        with self.__condition:
+            self.__schedule(job, time.monotonic())
+            self.__condition.notify_all()
+
+    def fetch(self, job: PollJob, host: str) -> list[str]:
+        """
+        Run one session for a job.
+
+        :param job: The job to run.
+        :param host: The server chosen for this run.
+        :return: List of DCP messages.
+        """
+        return DcpMessage.get(
+            username=self.username,
+            password=self.password,
+            search_criteria=job.search_criteria,
+            host=host,
+            **self.get_kwargs,
+        )
+
+    def start(self):
+        """
+        Start dispatching jobs on a background thread.
+
+        :return: None
+        """
+        with self.__condition:
+            if not self.__stopped:
+                return
+            self.__stopped = False
+        self.__executor = ThreadPoolExecutor(
+            max_workers=self.max_sessions_per_user, thread_name_prefix="dcp-poll"
+        )
+        self.__thread = threading.Thread(
+            target=self.__dispatch, name="dcp-poll-scheduler", daemon=True
+        )
+        self.__thread.start()
+
+    def stop(self, wait: bool = True):
+        """
+        Stop dispatching; running sessions are allowed to finish.
+
+        :param wait: Wait for running sessions to finish.
+        :return: None
+        """
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify_all()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=wait)
+            self.__executor = None
+
+    def metrics(self) -> dict:
+        """
+        Return scheduler metrics.
+
+        ``queue_depth`` is the number of due runs waiting for a session, and
+        ``lag`` the delay in seconds between the due time and the start of the
+        latest run of each job.
+
+        :return: dict of metric name to value.
+        """
+        now = time.monotonic()
+        with self.__condition:
+            waiting = [now - run.due for run in self.__ready]
+            return {
+                "queue_depth": len(self.__ready),
+                "oldest_waiting": max(waiting, default=0.0),
+                "running": len(self.__running),
+                "host_sessions": dict(self.__host_sessions),
+                "lag": dict(self.__lag),
+                "runs": self.__runs,
+                "failures": self.__failures,
+            }
+
+    def __schedule(self, job: PollJob, base: float):
+        due = base + random.uniform(0, self.jitter * job.cadence)
+        heapq.heappush(self.__timers, (due, next(self.__sequence), base, job))
+
+    def __free_host(self, job: PollJob) -> str:
+        hosts = self.host_groups[job.host_group]
+        host = min(hosts, key=lambda h: self.__host_sessions.get(h, 0))
+        if self.__host_sessions.get(host, 0) >= self.max_sessions_per_host:
+            return None
+        return host
+
+    def __dispatch(self):
+        with self.__condition:
+            while not self.__stopped:
+                now = time.monotonic()
+                while self.__timers and self.__timers[0][0] <= now:
+                    due, sequence, base, job = heapq.heappop(self.__timers)
+                    heapq.heappush(
+                        self.__ready,
+                        ScheduledRun(job.priority, due, sequence, base, job),
+                    )
+
+                deferred = []
+                limited = False
+                while self.__ready and len(self.__running) < self.max_sessions_per_user:
+                    run = heapq.heappop(self.__ready)
+                    host = self.__free_host(run.job)
+                    if host is None:
+                        deferred.append(run)
+                        continue
+                    if self.limiter is not None and not self.limiter.try_acquire():
+                        deferred.append(run)
+                        limited = True
+                        break
+                    self.__running.add(run.job.name)
+                    self.__host_sessions[host] = self.__host_sessions.get(host, 0) + 1
+                    self.__lag[run.job.name] = now - run.due
+                    self.__executor.submit(self.__run, run, host)
+                for run in deferred:
+                    heapq.heappush(self.__ready, run)
+
+                timeout = self.__timers[0][0] - now if self.__timers else None
+                if limited:
+                    timeout = min(
+                        timeout or LIMITER_POLL_INTERVAL, LIMITER_POLL_INTERVAL
+                    )
+                self.__condition.wait(timeout)
+
+    def __run(self, run: ScheduledRun, host: str):
+        job = run.job
+        failed = None
+        try:
+            messages = self.fetch(job, host)
+        except Exception as ex:
+            logger.warning(f"Poll job '{job.name}' failed on {host}: {ex}")
+            failed = ex
+        finally:
+            if self.limiter is not None:
+                self.limiter.release(failed)
+            with self.__condition:
+                self.__runs += 1
+                self.__running.discard(job.name)
+                self.__host_sessions[host] -= 1
+                # skip slots missed while waiting or running
+                now = time.monotonic()
+                base = run.base + job.cadence
+                if base < now:
+                    base += (now - base) // job.cadence * job.cadence + job.cadence
+                self.__schedule(job, base)
+                if failed is not None:
+                    self.__failures += 1
+                self.__condition.notify_all()
+
+        try:
+            if failed is None:
+                if self.on_result is not None:
+                    self.on_result(job, messages)
+            elif self.on_error is not None:
+                self.on_error(job, failed)
+        except Exception as ex:
+            logger.error(f"Callback of poll job '{job.name}' failed: {ex}")
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
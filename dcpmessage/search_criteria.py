@@ -1,8 +1,12 @@
-import json
 import logging
 import os
 from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from enum import UNIQUE, Enum, verify
+from pathlib import Path
+from typing import Optional, Union
+
+from .utils import TimeUtil
 
 logger = logging.getLogger(__name__)
 
@@ -62,6 +66,17 @@ class DcpAddress:
         """
         return self.address == other.address
 
+    def __hash__(self) -> int:
+        """
+        Hash of the address, so DcpAddress objects can be used in sets and as dict keys.
+
+        :return: Hash of the address string.
+        """
+        return hash(self.address)
+
+    def __repr__(self) -> str:
+        return f"DcpAddress({self.address!r})"
+
 
 class SearchCriteria:
     def __init__(
@@ -99,10 +114,36 @@ class SearchCriteria:
         :return: A SearchCriteria object.
         :raises Exception: If there is an issue parsing the JSON file.
         """
+        import json
+
         with open(file, "r") as json_file:
             json_data = json.load(json_file)
         return cls.from_dict(json_data)
 
+    @classmethod
+    def load(
+        cls,
+        search_criteria: Union[dict, str, Path, "SearchCriteria"],
+    ) -> "SearchCriteria":
+        """
+        Create a SearchCriteria object from any of the supported inputs.
+
+        :param search_criteria: Path to a JSON file, a dict, or a SearchCriteria (returned as is).
+        :return: A SearchCriteria object.
+        :raises TypeError: If the input type is not supported.
+        """
+        match search_criteria:
+            case str() | Path():
+                return cls.from_file(search_criteria)
+            case dict():
+                return cls.from_dict(search_criteria)
+            case SearchCriteria():
+                return search_criteria
+            case _:
+                raise TypeError(
+                    "search_criteria must be a filepath, a dict or a SearchCriteria."
+                )
+
     @classmethod
     def from_dict(
         cls,
@@ -140,6 +181,54 @@ class SearchCriteria:
         except Exception as ex:
             raise Exception(f"Unexpected exception parsing search-criteria: {ex}")
 
+    def resolve(
+        self,
+        now: datetime = None,
+        granularity: int = 0,
+    ) -> "SearchCriteria":
+        """
+        Resolve relative ``DRS_SINCE`` / ``DRS_UNTIL`` expressions (e.g. ``"now - 2 hour"``)
+        into absolute LRGS times.
+
+        :param now: The reference time (default: current UTC time).
+        :param granularity: Round ``now`` down to a multiple of this many seconds, so that
+            criteria resolved within the same interval are identical (default: no rounding).
+        :return: A new SearchCriteria with absolute times.
+        :raises ValueError: If a time cannot be resolved on the client (e.g. ``"last"``).
+        """
+        if now is None:
+            now = datetime.now(timezone.utc)
+        if granularity > 0:
+            epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+            seconds = int((now - epoch).total_seconds()) // granularity * granularity
+            now = epoch + timedelta(seconds=seconds)
+
+        lrgs_since = TimeUtil.parse_lrgs_time(self.lrgs_since, now)
+        lrgs_until = TimeUtil.parse_lrgs_time(self.lrgs_until, now)
+        return SearchCriteria(
+            TimeUtil.format_lrgs_time(lrgs_since),
+            TimeUtil.format_lrgs_time(lrgs_until),
+            list(self.dcp_address),
+            self.sources[: self.num_sources],
+        )
+
+    def canonical_key(self) -> tuple:
+        """
+        Return a hashable form of the criteria that does not depend on the order
+        of DCP addresses or sources.
+
+        Relative times are part of the key as written; call :meth:`resolve` first
+        to compare criteria created at different times.
+
+        :return: Tuple of (since, until, sorted addresses, sorted sources).
+        """
+        return (
+            self.lrgs_since,
+            self.lrgs_until,
+            tuple(sorted({dcp_address.address for dcp_address in self.dcp_address})),
+            tuple(sorted(set(self.sources[: self.num_sources]))),
+        )
+
     def __add_source(
         self,
         source: int,
@@ -196,11 +285,116 @@ class SearchCriteria:
         if self.lrgs_since != other.lrgs_since or self.lrgs_until != other.lrgs_until:
             return False
 
-        if len(self.dcp_address) != len(other.dcp_address):
-            return False
+        return set(self.dcp_address) == set(other.dcp_address)
+
+    def __hash__(self) -> int:
+        """
+        Hash consistent with :meth:`__eq__`.
 
-        for explicit_dcp_address in self.dcp_address:
-            if explicit_dcp_address not in other.dcp_address:
-                return False
+        :return: Hash of the times and the set of DCP addresses.
+        """
+        return hash((self.lrgs_since, self.lrgs_until, frozenset(self.dcp_address)))
+
+    def window(self, now: datetime = None) -> tuple[datetime, datetime]:
+        """
+        Resolve the time window of the criteria.
+
+        :param now: Reference time for relative expressions (default: current UTC time).
+        :return: Tuple of (since, until) as timezone-aware datetimes.
+        :raises ValueError: If a time cannot be resolved on the client (e.g. ``"last"``).
+        """
+        if now is None:
+            now = datetime.now(timezone.utc)
+        return (
+            TimeUtil.parse_lrgs_time(self.lrgs_since, now),
+            TimeUtil.parse_lrgs_time(self.lrgs_until, now),
+        )
+
+    def union(self, other: "SearchCriteria", now: datetime = None) -> "SearchCriteria":
+        """
+        Smallest criteria covering both criteria: the union of DCP addresses and
+        sources, and the widest time window. An empty address or source list means
+        "all", and stays "all" in the union.
+
+        :param other: The other SearchCriteria.
+        :param now: Reference time for relative expressions (default: current UTC time).
+        :return: A new SearchCriteria with absolute times.
+        :raises ValueError: If a time cannot be resolved on the client.
+        """
+        now = now or datetime.now(timezone.utc)
+        since, until = self.window(now)
+        other_since, other_until = other.window(now)
+        if not self.dcp_address or not other.dcp_address:
+            dcp_address = []
+        else:
+            dcp_address = list(set(self.dcp_address) | set(other.dcp_address))
+        sources, other_sources = self.__source_set(), other.__source_set()
+        return SearchCriteria(
+            TimeUtil.format_lrgs_time(min(since, other_since)),
+            TimeUtil.format_lrgs_time(max(until, other_until)),
+            dcp_address,
+            sorted(sources | other_sources) if sources and other_sources else [],
+        )
+
+    def intersection(
+        self, other: "SearchCriteria", now: datetime = None
+    ) -> Optional["SearchCriteria"]:
+        """
+        Criteria matching only what both criteria match.
+
+        :param other: The other SearchCriteria.
+        :param now: Reference time for relative expressions (default: current UTC time).
+        :return: A new SearchCriteria with absolute times, or None if the criteria do not overlap.
+        :raises ValueError: If a time cannot be resolved on the client.
+        """
+        now = now or datetime.now(timezone.utc)
+        since, until = self.window(now)
+        other_since, other_until = other.window(now)
+        since, until = max(since, other_since), min(until, other_until)
+        if since > until:
+            return None
+
+        if not self.dcp_address or not other.dcp_address:
+            dcp_address = list(set(self.dcp_address) or set(other.dcp_address))
+        else:
+            dcp_address = list(set(self.dcp_address) & set(other.dcp_address))
+            if not dcp_address:
+                return None
+
+        sources, other_sources = self.__source_set(), other.__source_set()
+        if sources and other_sources:
+            sources = sources & other_sources
+            if not sources:
+                return None
+        else:
+            sources = sources or other_sources
+        return SearchCriteria(
+            TimeUtil.format_lrgs_time(since),
+            TimeUtil.format_lrgs_time(until),
+            dcp_address,
+            sorted(sources),
+        )
+
+    def contains(self, other: "SearchCriteria", now: datetime = None) -> bool:
+        """
+        Check whether everything matched by ``other`` is also matched by this criteria.
+
+        :param other: The other SearchCriteria.
+        :param now: Reference time for relative expressions (default: current UTC time).
+        :return: True if this criteria is a superset of ``other``.
+        :raises ValueError: If a time cannot be resolved on the client.
+        """
+        now = now or datetime.now(timezone.utc)
+        since, until = self.window(now)
+        other_since, other_until = other.window(now)
+        if since > other_since or until < other_until:
+            return False
+        if self.dcp_address and (
+            not other.dcp_address or not set(other.dcp_address) <= set(self.dcp_address)
+        ):
+            return False
+        sources, other_sources = self.__source_set(), other.__source_set()
+        return not sources or (bool(other_sources) and other_sources <= sources)
 
-        return True
+    def __source_set(self) -> set[int]:
+        return set(self.sources[: self.num_sources])
@@ -0,0 +1,280 @@
+import csv
+import gzip
+import io
+import json
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Iterable, Union
+
+from .dcp_header import DcpHeader
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SinkConstants:
+    """
+    Constants of the message sink.
+
+    :param FORMATS: Supported output formats.
+    :param COMPRESSIONS: Supported compressions and their file suffix.
+    :param FIELDS: Columns of every record: the header fields followed by the message data.
+    """
+
+    FORMATS = ("ndjson", "csv")
+    COMPRESSIONS = {None: "", "gzip": ".gz", "zstd": ".zst"}
+    FIELDS = (
+        "address",
+        "transmit_time",
+        "failure_code",
+        "signal_strength",
+        "frequency_offset",
+        "modulation_index",
+        "data_quality",
+        "goes_channel",
+        "spacecraft",
+        "data_source",
+        "message_length",
+        "data",
+    )
+
+
+def message_record(message: str, header: DcpHeader = None) -> dict:
+    """
+    Build the record written for a DCP message: its parsed header fields, with the
+    transmit time in ISO 8601, and the message data (see ``SinkConstants.FIELDS``).
+
+    :param message: The DCP message.
+    :param header: The already parsed header of the message (default: parse it).
+    :return: dict of field name to value.
+    :raises ValueError: If the header cannot be parsed.
+    """
+    if header is None:
+        header = DcpHeader.parse(message)
+    return dict(
+        zip(
+            SinkConstants.FIELDS,
+            (
+                header.address,
+                header.transmit_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                header.failure_code,
+                header.signal_strength,
+                header.frequency_offset,
+                header.modulation_index,
+                header.data_quality,
+                header.goes_channel,
+                header.spacecraft,
+                header.data_source,
+                header.message_length,
+                message[37:],
+            ),
+        )
+    )
+
+
+class _PartitionFile:
+    """An open output file of one partition."""
+
+    def __init__(self, path: Path, compression: str, fmt: str):
+        self.path = path
+        self.opened = time.monotonic()
+        self.size = 0
+        raw = open(path, "wb")
+        if compression == "gzip":
+            binary = gzip.GzipFile(fileobj=raw, mode="wb")
+        elif compression == "zstd":
+            import zstandard
+
+            binary = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        else:
+            binary = raw
+        self.__raw = raw
+        self.text: IO[str] = io.TextIOWrapper(binary, encoding="utf-8", newline="")
+        if fmt == "csv":
+            csv.writer(self.text).writerow(SinkConstants.FIELDS)
+
+    def close(self):
+        self.text.close()
+        self.__raw.close()
+
+
+class MessageSink:
+    """
+    Persist a stream of DCP messages as NDJSON or CSV records with parsed header
+    fields, partitioned by DCP address and transmit day.
+
+    Messages are handed to a background thread through a bounded queue, so the
+    caller (typically the loop reading from LRGS) only waits on disk when the
+    writer falls ``queue_size`` messages behind. Files are written to
+    ``<directory>/<address>/<YYYY-MM-DD>/part-NNNNN.<format>[.gz|.zst]`` and
+    rotated when they exceed ``max_bytes`` of uncompressed output or were opened
+    more than ``max_age`` seconds ago.
+
+    :param directory: Root directory of the output (created if missing).
+    :param format: ``"ndjson"`` or ``"csv"``.
+    :param compression: ``"gzip"``, ``"zstd"`` (requires the ``zstandard`` package) or None.
+    :param max_bytes: Uncompressed size after which a file is rotated.
+    :param max_age: Seconds after which a file is rotated.
+    :param queue_size: Maximum number of messages waiting to be written.
+    :param max_open_files: Maximum number of partition files kept open at once.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        format: str = "ndjson",
+        compression: str = "gzip",
+        max_bytes: int = 64 * 1024 * 1024,
+        max_age: float = 3600,
+        queue_size: int = 10000,
+        max_open_files: int = 64,
+    ):
+        assert format in SinkConstants.FORMATS, f"Unsupported format '{format}'"
+        assert compression in SinkConstants.COMPRESSIONS, (
+            f"Unsupported compression '{compression}'"
+        )
+        if compression == "zstd":
+            import zstandard  # noqa: F401  fail early if the extra is missing
+
+        self.directory = Path(directory)
+        self.format = format
+        self.compression = compression
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.max_open_files = max_open_files
+        self.written = 0
+        self.skipped = 0
+
+        self.__queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.__files: OrderedDict[tuple[str, str], _PartitionFile] = OrderedDict()
+        self.__error: BaseException = None
+        self.__closed = False
+        self.__thread = threading.Thread(
+            target=self.__drain, name="dcp-sink", daemon=True
+        )
+        self.__thread.start()
+
+    def write(self, message: Union[str, bytes]):
+        """
+        Queue a DCP message to be written.
+
+        :param message: The DCP message.
+        :raises IOError: If the sink is closed or the writer thread failed.
+        :return: None
+        """
+        self.__check()
+        self.__queue.put(message)
+
+    def write_all(self, messages: Iterable[Union[str, bytes]]):
+        """
+        Queue every message of an iterable, e.g. ``DcpMessage.stream(...)``.
+
+        :param messages: DCP messages.
+        :return: None
+        """
+        for message in messages:
+            self.write(message)
+
+    def close(self):
+        """
+        Write the queued messages, close all files and stop the writer thread.
+
+        :raises IOError: If the writer thread failed.
+        :return: None
+        """
+        if not self.__closed:
+            self.__closed = True
+            self.__queue.put(None)
+            self.__thread.join()
+        if self.__error is not None:
+            raise IOError("Message sink writer failed") from self.__error
+
+    def __check(self):
+        if self.__closed:
+            raise IOError("Message sink closed.")
+        if self.__error is not None:
+            raise IOError("Message sink writer failed") from self.__error
+
+    def __drain(self):
+        try:
+            while True:
+                message = self.__queue.get()
+                if message is None:
+                    break
+                self.__write(message)
+        except BaseException as ex:
+            logger.error(f"Message sink writer failed: {ex}")
+            self.__error = ex
+            # keep draining so that producers blocked on a full queue are released
+            while self.__queue.get() is not None:
+                pass
+        finally:
+            for partition_file in self.__files.values():
+                partition_file.close()
+            self.__files.clear()
+
+    def __write(self, message: Union[str, bytes]):
+        if not isinstance(message, str):
+            message = str(message, "utf-8")
+        try:
+            header = DcpHeader.parse(message)
+        except (ValueError, IndexError) as ex:
+            logger.warning(f"Skipping message with invalid header: {ex}")
+            self.skipped += 1
+            return
+        if not header.address.isalnum():
+            logger.warning(f"Skipping message with invalid address {header.address!r}")
+            self.skipped += 1
+            return
+
+        partition_file = self.__file(
+            header.address, header.transmit_time.strftime("%Y-%m-%d")
+        )
+        fields = message_record(message, header)
+        if self.format == "csv":
+            line = io.StringIO()
+            csv.writer(line).writerow(fields.values())
+            record = line.getvalue()
+        else:
+            record = json.dumps(fields) + "\n"
+        partition_file.text.write(record)
+        partition_file.size += len(record)
+        self.written += 1
+
+    def __file(self, address: str, day: str) -> _PartitionFile:
+        key = (address, day)
+        partition_file = self.__files.get(key)
+        if partition_file is not None:
+            if (
+                partition_file.size < self.max_bytes
+                and time.monotonic() - partition_file.opened < self.max_age
+            ):
+                self.__files.move_to_end(key)
+                return partition_file
+            del self.__files[key]
+            partition_file.close()
+
+        while len(self.__files) >= self.max_open_files:
+            _, oldest = self.__files.popitem(last=False)
+            oldest.close()
+
+        partition = self.directory / address / day
+        partition.mkdir(parents=True, exist_ok=True)
+        suffix = f".{self.format}{SinkConstants.COMPRESSIONS[self.compression]}"
+        index = len(list(partition.glob(f"part-*{suffix}")))
+        while (path := partition / f"part-{index:05d}{suffix}").exists():
+            index += 1
+        partition_file = _PartitionFile(path, self.compression, self.format)
+        self.__files[key] = partition_file
+        return partition_file
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,319 @@
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from .dcp_header import DcpHeader
+from .search_criteria import SearchCriteria
+from .utils import TimeUtil
+
+logger = logging.getLogger(__name__)
+
+ALL_ADDRESSES = "*"
+ALL_SOURCES = "*"
+
+
+class MessageStore:
+    """
+    Local SQLite store of DCP messages indexed by DCP address and transmit time.
+
+    Besides the messages, the store remembers which (address, time window)
+    combinations have been fetched from LRGS, so that a repeated or overlapping
+    query can be answered locally. Time windows are compared with the header
+    transmit time, while LRGS selects messages by receive time; messages received
+    shortly after a window's ``DRS_UNTIL`` may therefore only appear on the next fetch.
+
+    The message type (e.g. self-timed or random) is not in the header, so messages
+    and coverage are kept per source set of the criteria, and a criteria is only
+    answered from messages fetched with the same sources.
+
+    :param path: Path of the SQLite database (default: in-memory).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS dcp_message (
+            address TEXT NOT NULL,
+            transmit_time INTEGER NOT NULL,
+            message TEXT NOT NULL,
+            sources TEXT NOT NULL,
+            PRIMARY KEY (address, transmit_time, message, sources)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS coverage (
+            address TEXT NOT NULL,
+            sources TEXT NOT NULL,
+            since INTEGER NOT NULL,
+            until INTEGER NOT NULL,
+            PRIMARY KEY (address, sources, since)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:"):
+        self.path = str(path)
+        self.__lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.executescript(self.SCHEMA)
+
+    @staticmethod
+    def source_key(sources: Iterable[int]) -> str:
+        """
+        Normalize the sources of a criteria.
+
+        :param sources: Source codes (see ``DcpMessageSource``), or empty for all.
+        :return: Sorted, comma-separated codes, or ``ALL_SOURCES``.
+        """
+        return ",".join(str(s) for s in sorted(set(sources))) or ALL_SOURCES
+
+    def insert(self, messages: Iterable[str], sources: str = ALL_SOURCES) -> int:
+        """
+        Insert DCP messages, ignoring messages that are already stored.
+
+        :param messages: DCP messages as returned by ``DcpMessage.get``.
+        :param sources: Source key of the criteria they were fetched with, see
+            :meth:`source_key`.
+        :return: Number of newly stored messages.
+        """
+        rows = (
+            (
+                message[:8].upper(),
+                DcpHeader.transmit_timestamp(message),
+                message,
+                sources,
+            )
+            for message in messages
+        )
+        with self.__lock, self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO dcp_message VALUES (?, ?, ?, ?)", rows
+            )
+            return self.connection.total_changes - before
+
+    def add_coverage(
+        self,
+        addresses: Iterable[str],
+        since: datetime,
+        until: datetime,
+        sources: str = ALL_SOURCES,
+    ):
+        """
+        Record that all messages of ``addresses`` between ``since`` and ``until``
+        have been fetched. Overlapping windows of an address are merged.
+
+        :param addresses: DCP addresses, or empty for a query over all DCPs.
+        :param since: Start of the fetched window.
+        :param until: End of the fetched window.
+        :param sources: Source key of the fetch, see :meth:`source_key`.
+        :return: None
+        """
+        since_ts, until_ts = int(since.timestamp()), int(until.timestamp())
+        with self.__lock, self.connection:
+            for address in [a.upper() for a in addresses] or [ALL_ADDRESSES]:
+                overlapping = self.connection.execute(
+                    "SELECT since, until FROM coverage "
+                    "WHERE address = ? AND sources = ? AND since <= ? AND until >= ?",
+                    (address, sources, until_ts, since_ts),
+                ).fetchall()
+                new_since = min([since_ts] + [s for s, _ in overlapping])
+                new_until = max([until_ts] + [u for _, u in overlapping])
+                self.connection.execute(
+                    "DELETE FROM coverage "
+                    "WHERE address = ? AND sources = ? AND since <= ? AND until >= ?",
+                    (address, sources, until_ts, since_ts),
+                )
+                self.connection.execute(
+                    "INSERT INTO coverage VALUES (?, ?, ?, ?)",
+                    (address, sources, new_since, new_until),
+                )
+
+    def is_covered(
+        self,
+        addresses: Iterable[str],
+        since: datetime,
+        until: datetime,
+        sources: str = ALL_SOURCES,
+    ) -> bool:
+        """
+        Check whether a time window has been fetched for all ``addresses`` with
+        the same sources.
+
+        :param addresses: DCP addresses, or empty for a query over all DCPs.
+        :param since: Start of the window.
+        :param until: End of the window.
+        :param sources: Source key of the query, see :meth:`source_key`.
+        :return: True if the window can be answered from the store.
+        """
+        since_ts, until_ts = int(since.timestamp()), int(until.timestamp())
+        with self.__lock:
+            for address in [a.upper() for a in addresses] or [ALL_ADDRESSES]:
+                row = self.connection.execute(
+                    "SELECT 1 FROM coverage WHERE address IN (?, ?) AND sources = ? "
+                    "AND since <= ? AND until >= ? LIMIT 1",
+                    (address, ALL_ADDRESSES, sources, since_ts, until_ts),
+                ).fetchone()
+                if row is None:
+                    return False
+        return True
+
+    def query(
+        self,
+        addresses: Iterable[str] = (),
+        since: datetime = None,
+        until: datetime = None,
+        sources: str = None,
+    ) -> list[str]:
+        """
+        Return stored messages ordered by address and transmit time.
+
+        :param addresses: DCP addresses to select (default: all).
+        :param since: Earliest transmit time (default: unbounded).
+        :param until: Latest transmit time (default: unbounded).
+        :param sources: Select only messages fetched with this source key, see
+            :meth:`source_key` (default: messages of any sources).
+        :return: List of DCP messages.
+        """
+        since_ts = int(since.timestamp()) if since is not None else -(2**63)
+        until_ts = int(until.timestamp()) if until is not None else 2**63 - 1
+        addresses = [a.upper() for a in addresses]
+        source_clause = "" if sources is None else "AND sources = ? "
+        source_parameters = () if sources is None else (sources,)
+        with self.__lock:
+            if not addresses:
+                rows = self.connection.execute(
+                    "SELECT DISTINCT address, transmit_time, message FROM dcp_message "
+                    "WHERE transmit_time BETWEEN ? AND ? "
+                    + source_clause
+                    + "ORDER BY address, transmit_time",
+                    (since_ts, until_ts) + source_parameters,
+                ).fetchall()
+                return [message for (_, _, message) in rows]
+
+            messages = []
+            for address in sorted(set(addresses)):
+                rows = self.connection.execute(
+                    "SELECT DISTINCT transmit_time, message FROM dcp_message "
+                    "WHERE address = ? AND transmit_time BETWEEN ? AND ? "
+                    + source_clause
+                    + "ORDER BY transmit_time",
+                    (address, since_ts, until_ts) + source_parameters,
+                ).fetchall()
+                messages.extend(message for (_, message) in rows)
+            return messages
+
+    def latest(self, addresses: Iterable[str] = ()) -> dict[str, str]:
+        """
+        Return the latest stored message of each DCP.
+
+        :param addresses: DCP addresses to look up (default: all stored DCPs).
+        :return: dict of DCP address to its latest message.
+        """
+        addresses = [a.upper() for a in addresses]
+        with self.__lock:
+            if not addresses:
+                addresses = [
+                    address
+                    for (address,) in self.connection.execute(
+                        "SELECT DISTINCT address FROM dcp_message"
+                    )
+                ]
+            latest = {}
+            for address in addresses:
+                row = self.connection.execute(
+                    "SELECT message FROM dcp_message WHERE address = ? "
+                    "ORDER BY transmit_time DESC LIMIT 1",
+                    (address,),
+                ).fetchone()
+                if row is not None:
+                    latest[address] = row[0]
+            return latest
+
+    @staticmethod
+    def resolve_window(
+        criteria: SearchCriteria, now: datetime = None
+    ) -> tuple[list[str], datetime, datetime]:
+        """
+        Resolve the addresses and absolute time window of a search criteria.
+
+        :param criteria: The search criteria.
+        :param now: Reference time for relative expressions (default: current UTC time).
+        :return: Tuple of (upper-case addresses, since, until).
+        :raises ValueError: If a time cannot be resolved (e.g. ``"last"``).
+        """
+        now = now or datetime.now(timezone.utc)
+        addresses = [
+            dcp_address.address.upper() for dcp_address in criteria.dcp_address
+        ]
+        since = TimeUtil.parse_lrgs_time(criteria.lrgs_since, now)
+        until = TimeUtil.parse_lrgs_time(criteria.lrgs_until, now)
+        return addresses, since, until
+
+    def lookup(
+        self, search_criteria: Union[dict, SearchCriteria], now: datetime = None
+    ) -> Optional[list[str]]:
+        """
+        Answer a search criteria from the store if its window has been fetched
+        with the same sources.
+
+        :param search_criteria: Search criteria as a dict (see ``SearchCriteria.from_dict``)
+            or a SearchCriteria.
+        :param now: Reference time for relative expressions (default: current UTC time).
+        :return: The stored messages, or None if the store does not cover the criteria.
+        """
+        if isinstance(search_criteria, dict):
+            search_criteria = SearchCriteria.from_dict(search_criteria)
+        try:
+            addresses, since, until = self.resolve_window(search_criteria, now)
+        except ValueError:
+            return None
+        sources = self.source_key(
+            search_criteria.sources[: search_criteria.num_sources]
+        )
+        if not self.is_covered(addresses, since, until, sources):
+            return None
+        logger.info("Search criteria answered from local message store.")
+        return self.query(addresses, since, until, sources)
+
+    def save(
+        self,
+        search_criteria: Union[dict, SearchCriteria],
+        messages: Iterable[str],
+        now: datetime = None,
+    ) -> int:
+        """
+        Store the messages fetched for a search criteria and record its window as covered.
+
+        :param search_criteria: The search criteria the messages were fetched with.
+        :param messages: The fetched DCP messages.
+        :param now: Reference time the criteria was resolved at (default: current UTC time).
+        :return: Number of newly stored messages.
+        """
+        if isinstance(search_criteria, dict):
+            search_criteria = SearchCriteria.from_dict(search_criteria)
+        sources = self.source_key(
+            search_criteria.sources[: search_criteria.num_sources]
+        )
+        inserted = self.insert(messages, sources)
+        try:
+            addresses, since, until = self.resolve_window(search_criteria, now)
+        except ValueError:
+            logger.debug(
+                "Search criteria window is not absolute; coverage not recorded."
+            )
+        else:
+            self.add_coverage(addresses, since, until, sources)
+        return inserted
+
+    def close(self):
+        """
+        Close the database connection.
+
+        :return: None
+        """
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,4 +1,6 @@
+import re
 from binascii import hexlify
+from datetime import datetime, timedelta, timezone
 from typing import Union
 
 
@@ -27,3 +29,72 @@ class ByteUtil:
         :return: Hex string of byte array.
         """
         return hexlify(b).decode("utf-8").upper()  # Use uppercase hexadecimal
+
+
+class TimeUtil:
+    UNITS = {
+        "second": 1,
+        "minute": 60,
+        "hour": 3600,
+        "day": 86400,
+        "week": 604800,
+    }
+    FORMATS = (
+        "%Y/%j %H:%M:%S",
+        "%Y/%j %H:%M",
+        "%Y-%m-%d %H:%M:%S",
+        "%Y-%m-%dT%H:%M:%S",
+        "%Y-%m-%d",
+        "%y%j%H%M%S",
+    )
+
+    @staticmethod
+    def parse_lrgs_time(time_str: str, now: datetime = None) -> datetime:
+        """
+        Resolve an LRGS search criteria time (e.g. ``"now - 2 hour"`` or
+        ``"2024/204 15:33:53"``) into an absolute time.
+
+        :param time_str: The time expression used in ``DRS_SINCE`` / ``DRS_UNTIL``.
+        :param now: The reference time for relative expressions (default: current UTC time).
+        :return: Timezone-aware datetime in UTC.
+        :raises ValueError: If the expression cannot be resolved.
+        """
+        if now is None:
+            now = datetime.now(timezone.utc)
+        text = " ".join(time_str.strip().lower().split())
+
+        if text.startswith("now"):
+            offset = text[3:].replace(" ", "")
+            if not offset:
+                return now
+            sign, offset = offset[0], offset[1:]
+            if sign not in "+-":
+                raise ValueError(f"Invalid LRGS time '{time_str}'")
+            seconds = 0
+            for amount, unit in re.findall(r"(\d+)([a-z]+)", offset):
+                unit = unit.rstrip("s") if unit != "s" else "second"
+                if unit not in TimeUtil.UNITS:
+                    raise ValueError(f"Invalid LRGS time unit '{unit}' in '{time_str}'")
+                seconds += int(amount) * TimeUtil.UNITS[unit]
+            delta = timedelta(seconds=seconds)
+            return now - delta if sign == "-" else now + delta
+
+        for time_format in TimeUtil.FORMATS:
+            try:
+                parsed = datetime.strptime(time_str.strip(), time_format)
+            except ValueError:
+                continue
+            return parsed.replace(tzinfo=timezone.utc)
+        raise ValueError(f"Invalid LRGS time '{time_str}'")
+
+    @staticmethod
+    def format_lrgs_time(time: datetime) -> str:
+        """
+        Format a datetime as an absolute LRGS search criteria time (``YYYY/DDD HH:MM:SS``).
+
+        :param time: The time to format; naive times are assumed to be UTC.
+        :return: The formatted time.
+        """
+        if time.tzinfo is not None:
+            time = time.astimezone(timezone.utc)
+        return time.strftime("%Y/%j %H:%M:%S")
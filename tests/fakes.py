@@ -0,0 +1,56 @@
+from unittest import mock
+
+from dcpmessage.ldds_client import LddsClient
+
+
+class FakeSocket:
+    """
+    Socket answering with ``responses``, one after the other, at most ``chunk``
+    bytes per recv. ``responses`` is consumed in place; an empty list reads as a
+    closed connection.
+
+    :param responses: The frames the server sends.
+    :param sent: List the sent data is appended to (default: a new list).
+    :param chunk: Maximum number of bytes returned by a recv (default: no limit).
+    """
+
+    def __init__(self, responses: list, sent: list = None, chunk: int = None):
+        self.responses = responses
+        self.sent = [] if sent is None else sent
+        self.chunk = chunk
+        self.recv_sizes = []
+        self.timeouts = []
+        self.pending = b""
+
+    def settimeout(self, timeout):
+        self.timeouts.append(timeout)
+
+    def sendall(self, data):
+        self.sent.append(bytes(data))
+
+    def recv(self, buffer_size):
+        self.recv_sizes.append(buffer_size)
+        if not self.pending and self.responses:
+            self.pending = self.responses.pop(0)
+        size = min(buffer_size, self.chunk or buffer_size)
+        data, self.pending = self.pending[:size], self.pending[size:]
+        return data
+
+    def close(self):
+        pass
+
+
+def fake_connect(*args, socket_class: type = FakeSocket, **kwargs):
+    """
+    Patch ``LddsClient.connect`` to give the client a fake socket.
+
+    :param args: Arguments of the socket, e.g. the responses.
+    :param socket_class: The socket class (default: :class:`FakeSocket`).
+    :param kwargs: Keyword arguments of the socket.
+    :return: The patch, to use as a context manager.
+    """
+
+    def connect(client):
+        client.socket = socket_class(*args, **kwargs)
+
+    return mock.patch.object(LddsClient, "connect", connect)
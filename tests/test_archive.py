@@ -0,0 +1,61 @@
+import shutil
+import tempfile
+import unittest
+
+from dcpmessage.archive import BlockArchiveReader, BlockArchiveWriter
+from dcpmessage.ldds_message import LddsMessage, LddsMessageIds
+
+BLOCK = (
+    b"A081B07E24204153353G30-0NN096WUB00012`BST@KZ@KZh "
+    b"A081B07E24204151853G30-0HN096WUB00012`BST@KZ@KYh "
+)
+
+
+class TestBlockArchive(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_write_read(self):
+        with BlockArchiveWriter(self.directory) as writer:
+            writer.append(LddsMessage.create(LddsMessageIds.dcp_block, BLOCK))
+            writer.append(BLOCK)
+
+        reader = BlockArchiveReader(self.directory)
+        self.assertEqual([bytes(b) for b in reader.iter_blocks()], [BLOCK, BLOCK])
+        messages = [bytes(m) for m in reader]
+        self.assertEqual(len(messages), 4)
+        self.assertEqual(messages[1], BLOCK[49:])
+
+    def test_segment_rotation_and_resume(self):
+        with BlockArchiveWriter(self.directory, segment_size=64) as writer:
+            for _ in range(3):
+                writer.append(BLOCK)
+        with BlockArchiveWriter(self.directory, segment_size=64) as writer:
+            writer.append(BLOCK)
+
+        reader = BlockArchiveReader(self.directory)
+        self.assertEqual(len(reader.segments()), 4)
+        self.assertEqual(len(list(reader.iter_messages())), 8)
+
+    def test_torn_record_truncated_on_resume(self):
+        with BlockArchiveWriter(self.directory) as writer:
+            writer.append(BLOCK)
+        # a crash while writing the next record leaves part of it
+        (segment,) = BlockArchiveReader(self.directory).segments()
+        with open(segment, "ab") as f:
+            f.write(b"\x00\x00\x00\x62A081B07E")
+        with BlockArchiveWriter(self.directory) as writer:
+            writer.append(BLOCK)
+
+        reader = BlockArchiveReader(self.directory)
+        self.assertEqual([bytes(b) for b in reader.iter_blocks()], [BLOCK, BLOCK])
+
+    def test_views_outlive_segment(self):
+        with BlockArchiveWriter(self.directory) as writer:
+            writer.append(BLOCK)
+
+        messages = list(BlockArchiveReader(self.directory))
+        self.assertEqual(bytes(messages[0]), BLOCK[:49])
@@ -0,0 +1,61 @@
+import importlib.util
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dcpmessage.dcp_header import DcpHeader
+from dcpmessage.ldds_message import LddsMessage, LddsMessageIds
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+MESSAGES = [
+    "A081B07E24204153353G30-0NN096WUB00012`BST@KZ@KZh ",
+    "A081B07E24204151853G30-0HN096WUB00012`BST@KZ@KYh ",
+    "CE4A3B2C24366235959G29-0HN096WUP00012`BST@KY@KYg ",
+]
+BLOCK = LddsMessage.create(LddsMessageIds.dcp_block, "".join(MESSAGES).encode())
+
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+class TestArrowExport(unittest.TestCase):
+    def test_record_batch_matches_header_parse(self):
+        from dcpmessage.arrow_export import block_to_record_batch
+
+        rows = block_to_record_batch(BLOCK).to_pylist()
+        self.assertEqual(len(rows), 3)
+        for row, message in zip(rows, MESSAGES):
+            header = DcpHeader.parse(message)
+            self.assertEqual(row["address"], header.address)
+            self.assertEqual(row["transmit_time"], header.transmit_time)
+            self.assertEqual(row["signal_strength"], header.signal_strength)
+            self.assertEqual(row["goes_channel"], header.goes_channel)
+            self.assertEqual(row["data_source"], header.data_source)
+            self.assertEqual(row["data"], message[37:].encode())
+        self.assertEqual(
+            rows[2]["transmit_time"],
+            datetime(2024, 12, 31, 23, 59, 59, tzinfo=timezone.utc),
+        )
+
+    def test_parquet_row_groups(self):
+        import pyarrow.parquet as pq
+
+        from dcpmessage.arrow_export import ParquetExporter, blocks_to_table
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "messages.parquet"
+            with ParquetExporter(path, row_group_size=3) as exporter:
+                exporter.write_blocks([BLOCK, BLOCK.to_bytes()[10:]])
+            parquet_file = pq.ParquetFile(path)
+            self.assertEqual(parquet_file.metadata.num_rows, 6)
+            self.assertEqual(parquet_file.metadata.num_row_groups, 2)
+            self.assertEqual(parquet_file.read(), blocks_to_table([BLOCK, BLOCK]))
+
+
+@unittest.skipIf(HAS_PYARROW, "pyarrow is installed")
+class TestArrowExportMissingDependency(unittest.TestCase):
+    def test_import_error_names_extra(self):
+        from dcpmessage.arrow_export import block_to_record_batch
+
+        with self.assertRaisesRegex(ImportError, r"dcpmessage\[arrow\]"):
+            block_to_record_batch(BLOCK)
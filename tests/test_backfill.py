@@ -0,0 +1,69 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from dcpmessage.backfill import BackfillPlanner
+from dcpmessage.utils import TimeUtil
+
+
+def message(address: str, time: datetime) -> str:
+    return f"{address}{time.strftime('%y%j%H%M%S')}G30-0NN096WUB00004TEST"
+
+
+class FakePlanner(BackfillPlanner):
+    """
+    Serves messages received every 10 minutes; A0000001 arrives 5 minutes and
+    A0000002 55 minutes after transmission, so adjacent windows interleave.
+    """
+
+    def __init__(self, failures: int = 0, **kwargs):
+        super().__init__("user", "pass", "localhost", retry_delay=0, **kwargs)
+        self.failures = failures
+        self.calls = 0
+
+    def fetch(self, criteria):
+        self.calls += 1
+        if self.failures:
+            self.failures -= 1
+            raise IOError("connection reset")
+        since = TimeUtil.parse_lrgs_time(criteria.lrgs_since)
+        until = TimeUtil.parse_lrgs_time(criteria.lrgs_until)
+        received = since.replace(minute=2, second=0)
+        messages = []
+        while received <= until:
+            if received >= since:
+                messages.append(message("A0000001", received - timedelta(minutes=5)))
+                messages.append(message("A0000002", received - timedelta(minutes=55)))
+            received += timedelta(minutes=10)
+        return messages
+
+
+class TestBackfill(unittest.TestCase):
+    since = datetime(2024, 7, 1, tzinfo=timezone.utc)
+    until = datetime(2024, 7, 2, tzinfo=timezone.utc)
+
+    def test_plan(self):
+        planner = FakePlanner(window=timedelta(hours=6))
+        windows = planner.plan(self.since, self.until)
+        self.assertEqual(len(windows), 5)
+        self.assertEqual(
+            windows[0], (self.since, self.since + timedelta(hours=6, seconds=-1))
+        )
+        self.assertEqual(windows[-1], (self.until, self.until))
+        # naive times are UTC, like in the LRGS criteria of the windows
+        naive = planner.plan(self.since.replace(tzinfo=None), self.until)
+        self.assertEqual(naive, windows)
+
+    def test_run_is_time_ordered(self):
+        planner = FakePlanner(window=timedelta(hours=5), max_sessions=3)
+        messages = list(
+            planner.run({"DCP_ADDRESS": ["A0000001"]}, self.since, self.until)
+        )
+        self.assertEqual(len(messages), 288)
+        times = [m[8:19] for m in messages]
+        self.assertEqual(times, sorted(times))
+
+    def test_failed_window_is_retried(self):
+        planner = FakePlanner(failures=1, window=timedelta(hours=12), retries=1)
+        messages = list(planner.run({}, self.since, self.until))
+        self.assertEqual(len(messages), 288)
+        self.assertEqual(planner.calls, 4)
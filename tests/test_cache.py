@@ -0,0 +1,118 @@
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from dcpmessage.cache import DiskResultCache, MemoryResultCache, ResultCache
+from dcpmessage.dcp_message import DcpMessage
+from dcpmessage.search_criteria import SearchCriteria
+
+MESSAGES = ["A081B07E24204153353G30-0NN096WUB00012`BST@KZ@KZh "]
+
+
+class TestSearchCriteriaResolve(unittest.TestCase):
+    def test_resolve_with_granularity(self):
+        criteria = SearchCriteria.from_dict(
+            {
+                "DRS_SINCE": "now - 2 hour",
+                "DRS_UNTIL": "now",
+                "DCP_ADDRESS": ["A081B07E"],
+            }
+        )
+        first = criteria.resolve(
+            datetime(2024, 7, 22, 12, 0, 5, tzinfo=timezone.utc), 60
+        )
+        second = criteria.resolve(
+            datetime(2024, 7, 22, 12, 0, 50, tzinfo=timezone.utc), 60
+        )
+        self.assertEqual(first.lrgs_since, "2024/204 10:00:00")
+        self.assertEqual(first.lrgs_until, "2024/204 12:00:00")
+        self.assertEqual(first.canonical_key(), second.canonical_key())
+
+    def test_canonical_key_ignores_order(self):
+        first = SearchCriteria.from_dict(
+            {"DCP_ADDRESS": ["A081B07E", "A0806A3E"], "SOURCE": ["GOES_RANDOM", "GOES"]}
+        )
+        second = SearchCriteria.from_dict(
+            {"DCP_ADDRESS": ["A0806A3E", "A081B07E"], "SOURCE": ["GOES", "GOES_RANDOM"]}
+        )
+        self.assertEqual(first.canonical_key(), second.canonical_key())
+
+
+class TestResultCache(unittest.TestCase):
+    def test_memory_cache_lru_and_ttl(self):
+        cache = MemoryResultCache(ttl=60, max_entries=2)
+        cache.put("a", MESSAGES)
+        cache.put("b", MESSAGES)
+        cache.get("a")
+        cache.put("c", MESSAGES)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), MESSAGES)
+
+        cache = MemoryResultCache(ttl=0)
+        cache.put("a", MESSAGES)
+        time.sleep(0.01)
+        self.assertIsNone(cache.get("a"))
+
+    def test_disk_cache(self):
+        directory = tempfile.mkdtemp()
+        try:
+            cache = DiskResultCache(directory, ttl=60)
+            cache.put(("host", 16003, ("a",)), MESSAGES)
+            self.assertEqual(
+                DiskResultCache(directory).get(("host", 16003, ("a",))), MESSAGES
+            )
+            self.assertIsNone(cache.get("missing"))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_base_class_is_abstract(self):
+        with self.assertRaises(TypeError):
+            ResultCache()
+
+    def test_server_criteria_not_rounded(self):
+        class FixedDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return datetime(2024, 7, 22, 12, 0, 50, tzinfo=timezone.utc)
+
+        session = mock.MagicMock()
+        client = session.return_value.__enter__.return_value
+        client.request_dcp_blocks.return_value = []
+        client.deadline_reached = False
+        cache = MemoryResultCache(ttl=60)
+        criteria = {"DRS_SINCE": "now - 2 hour", "DRS_UNTIL": "now"}
+        with (
+            mock.patch("dcpmessage.dcp_message.datetime", FixedDatetime),
+            mock.patch.object(DcpMessage, "_session", session),
+        ):
+            DcpMessage.get(
+                username="user",
+                password="pass",
+                search_criteria=criteria,
+                host="host",
+                cache=cache,
+            )
+        sent = session.call_args.kwargs["criteria"]
+        self.assertEqual(sent.lrgs_since, "2024/204 10:00:50")
+        self.assertEqual(sent.lrgs_until, "2024/204 12:00:50")
+        # the entry is stored under the rounded key
+        key = SearchCriteria.from_dict(criteria).resolve(FixedDatetime.now(), 60)
+        self.assertEqual(cache.get(("host", 16003, key.canonical_key())), [])
+
+    def test_get_answers_from_cache(self):
+        criteria = {"DRS_SINCE": "2024-07-22 10:00:00", "DRS_UNTIL": "2024/204 12:00"}
+        cache = MemoryResultCache(ttl=60)
+        key = SearchCriteria.from_dict(criteria).resolve().canonical_key()
+        cache.put(("10.255.255.1", 16003, key), MESSAGES)
+        messages = DcpMessage.get(
+            username="user",
+            password="pass",
+            search_criteria=criteria,
+            host="10.255.255.1",
+            timeout=0.1,
+            cache=cache,
+        )
+        self.assertEqual(messages, MESSAGES)
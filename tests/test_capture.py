@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+
+from fakes import FakeSocket
+
+from dcpmessage.capture import CaptureConstants, CaptureWriter, read_capture
+from dcpmessage.dcp_message import DcpMessage
+from dcpmessage.ldds_client import LddsClient
+from dcpmessage.ldds_message import LddsMessage, LddsMessageIds
+from dcpmessage.replay import ReplayClient
+
+BLOCK = LddsMessage.create(
+    LddsMessageIds.dcp_block,
+    b"A081B07E24204153353G30-0NN096WUB00012`BST@KZ@KZh "
+    b"A081B07E24204151853G30-0HN096WUB00012`BST@KZ@KYh ",
+).to_bytes()
+END = LddsMessage.create(
+    LddsMessageIds.dcp_block, b"?35,0,Until time reached"
+).to_bytes()
+
+
+class TestCapture(unittest.TestCase):
+    def setUp(self):
+        fd, self.capture_file = tempfile.mkstemp(suffix=".dcpcap")
+        os.close(fd)
+        os.remove(self.capture_file)
+
+    def tearDown(self):
+        if os.path.exists(self.capture_file):
+            os.remove(self.capture_file)
+
+    def record_session(self):
+        with CaptureWriter(self.capture_file) as capture:
+            client = LddsClient("localhost", 16003, 1, capture=capture)
+            client.socket = FakeSocket([BLOCK, BLOCK, END])
+            return client.request_dcp_blocks()
+
+    def test_capture_records_both_directions(self):
+        self.record_session()
+        records = list(read_capture(self.capture_file))
+        self.assertEqual(
+            [r.direction for r in records],
+            [CaptureConstants.SENT, CaptureConstants.RECEIVED] * 3,
+        )
+        self.assertEqual(records[1].data, BLOCK)
+        self.assertEqual(records[0].data, b"FAF0n00000")
+
+    def test_capture_is_appendable(self):
+        self.record_session()
+        self.record_session()
+        self.assertEqual(len(list(read_capture(self.capture_file))), 12)
+
+    def test_replay(self):
+        recorded_blocks = self.record_session()
+        client = ReplayClient(self.capture_file)
+        client.connect()
+        replayed_blocks = client.request_dcp_blocks()
+        client.disconnect()
+        self.assertEqual(replayed_blocks, recorded_blocks)
+        self.assertEqual(len(DcpMessage.explode(replayed_blocks)), 4)
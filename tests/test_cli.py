@@ -0,0 +1,115 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from dcpmessage.cli import ExitCode, exit_code_for, main
+from dcpmessage.dcp_message import DcpMessage
+from dcpmessage.exceptions import ProtocolError, ServerError
+
+MESSAGES = [
+    "A081B07E24204153353G30-0NN096WUB00012`BST@KZ@KZh ",
+    "A081B07E24204151853G30-0HN096WUB00012`BST@KZ@KYh ",
+]
+
+
+def server_error(code: int) -> ProtocolError:
+    return ProtocolError("error", server_error=ServerError("error", code, 0))
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temp_dir.name)
+        self.criteria = []
+        for name in ("first", "second"):
+            path = self.directory / f"{name}.json"
+            path.write_text(
+                json.dumps({"DRS_SINCE": "now - 1 hour", "DRS_UNTIL": "now"})
+            )
+            self.criteria.append(str(path))
+        self.hosts = []
+        environ = {"DCPMESSAGE_USERNAME": "user", "DCPMESSAGE_PASSWORD": "pass"}
+        patcher = mock.patch.dict(os.environ, environ)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def fake_stream(self, failing_hosts=(), error=IOError("Cannot connect")):
+        def stream(**kwargs):
+            self.hosts.append(kwargs["host"])
+            if kwargs["host"] in failing_hosts:
+                raise error
+            yield from MESSAGES
+
+        return mock.patch.object(DcpMessage, "stream", side_effect=stream)
+
+    def run_main(self, *args):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            code = main(list(args))
+        return code, stdout.getvalue()
+
+    def test_streams_raw_messages_to_stdout(self):
+        with self.fake_stream():
+            code, output = self.run_main(*self.criteria, "--host", "a", "--jobs", "2")
+        self.assertEqual(code, ExitCode.OK)
+        self.assertEqual(sorted(output.splitlines()), sorted(MESSAGES * 2))
+
+    def test_ndjson_files_and_round_robin(self):
+        with self.fake_stream():
+            code, output = self.run_main(
+                *self.criteria,
+                "--host",
+                "a",
+                "--host",
+                "b",
+                "--format",
+                "ndjson",
+                "--output-dir",
+                str(self.directory / "out"),
+            )
+        self.assertEqual((code, output), (ExitCode.OK, ""))
+        self.assertEqual(self.hosts, ["a", "b"])
+        with open(self.directory / "out" / "second.ndjson") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records[0]["address"], "A081B07E")
+        self.assertEqual(records[1]["transmit_time"], "2024-07-22T15:18:53Z")
+
+    def test_failover_to_next_host(self):
+        with self.fake_stream(failing_hosts=("a",)):
+            code, output = self.run_main(
+                self.criteria[0],
+                "--host",
+                "a",
+                "--host",
+                "b",
+                "--host-strategy",
+                "failover",
+            )
+        self.assertEqual(code, ExitCode.OK)
+        self.assertEqual(self.hosts, ["a", "b"])
+        self.assertEqual(output.splitlines(), MESSAGES)
+
+    def test_authentication_failure_is_not_retried(self):
+        with self.fake_stream(failing_hosts=("a", "b"), error=server_error(47)):
+            code, _ = self.run_main(self.criteria[0], "--host", "a", "--host", "b")
+        self.assertEqual(code, ExitCode.AUTHENTICATION)
+        self.assertEqual(self.hosts, ["a"])
+
+    def test_missing_criteria_file(self):
+        code, _ = self.run_main(str(self.directory / "missing.json"), "--host", "a")
+        self.assertEqual(code, ExitCode.USAGE)
+
+    def test_exit_code_for(self):
+        self.assertEqual(exit_code_for(server_error(17)), ExitCode.CRITERIA)
+        self.assertEqual(exit_code_for(server_error(24)), ExitCode.SERVER_BUSY)
+        self.assertEqual(exit_code_for(server_error(9)), ExitCode.SERVER_ERROR)
+        self.assertEqual(exit_code_for(TimeoutError()), ExitCode.CONNECTION)
+        self.assertEqual(exit_code_for(RuntimeError()), ExitCode.ERROR)
@@ -0,0 +1,83 @@
+import unittest
+from concurrent.futures import wait
+
+from dcpmessage.coalesce import RequestCoalescer
+from dcpmessage.search_criteria import DcpMessageSource
+
+MESSAGES = [
+    "A081B07E24204153353G30-0NN096WUB00012`BST@KZ@KZh ",
+    "A081B07E24204151853G30-0HN096WUB00012`BST@KZ@KYh ",
+    "A0806A3E24204150353G29-0HN096WUP00012`BST@KY@KYg ",
+]
+
+
+class FakeCoalescer(RequestCoalescer):
+    def __init__(self):
+        super().__init__("user", "pass", "localhost", window=60)
+        self.fetched = []
+
+    def fetch(self, criteria):
+        self.fetched.append(criteria)
+        return MESSAGES
+
+
+class TestRequestCoalescer(unittest.TestCase):
+    def test_requests_share_one_session(self):
+        coalescer = FakeCoalescer()
+        first = coalescer.submit(
+            {
+                "DRS_SINCE": "2024/204 15:00:00",
+                "DRS_UNTIL": "2024/204 15:20:00",
+                "DCP_ADDRESS": ["A081B07E"],
+            }
+        )
+        second = coalescer.submit(
+            {
+                "DRS_SINCE": "2024/204 15:00:00",
+                "DRS_UNTIL": "2024/204 16:00:00",
+                "DCP_ADDRESS": ["A0806A3E", "A081B07E"],
+            }
+        )
+        coalescer.close()
+        wait([first, second])
+
+        self.assertEqual(len(coalescer.fetched), 1)
+        combined = coalescer.fetched[0]
+        self.assertEqual(combined.lrgs_until, "2024/204 16:00:00")
+        self.assertEqual(first.result(), [MESSAGES[1]])
+        self.assertEqual(second.result(), MESSAGES)
+
+    def test_unresolvable_criteria_served_alone(self):
+        coalescer = FakeCoalescer()
+        future = coalescer.submit({"DRS_SINCE": "last", "DCP_ADDRESS": ["A081B07E"]})
+        coalescer.close()
+        self.assertEqual(future.result(), MESSAGES)
+        self.assertEqual(coalescer.fetched[0].lrgs_since, "last")
+
+    def test_requests_with_other_sources_not_merged(self):
+        coalescer = FakeCoalescer()
+        criteria = {
+            "DRS_SINCE": "2024/204 15:00:00",
+            "DRS_UNTIL": "2024/204 16:00:00",
+            "DCP_ADDRESS": ["a081b07e"],
+        }
+        selftimed = [
+            coalescer.submit(dict(criteria, SOURCE=["GOES_SELFTIMED"])),
+            coalescer.submit(dict(criteria, SOURCE=["GOES_SELFTIMED"])),
+        ]
+        random = coalescer.submit(dict(criteria, SOURCE=["GOES_RANDOM"]))
+        coalescer.close()
+        wait(selftimed + [random])
+
+        self.assertEqual(len(coalescer.fetched), 2)
+        self.assertEqual(
+            sorted(tuple(c.sources[: c.num_sources]) for c in coalescer.fetched),
+            sorted(
+                [
+                    (DcpMessageSource.GOES_SELFTIMED.value,),
+                    (DcpMessageSource.GOES_RANDOM.value,),
+                ]
+            ),
+        )
+        self.assertEqual(selftimed[0].result(), MESSAGES[:2])
+        self.assertEqual(random.result(), MESSAGES[:2])
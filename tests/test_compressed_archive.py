@@ -0,0 +1,141 @@
+import importlib.util
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from dcpmessage.ldds_message import LddsMessage, LddsMessageIds
+
+HAS_ZSTANDARD = importlib.util.find_spec("zstandard") is not None
+
+
+def make_blocks(count: int = 40, per_block: int = 50, seed: int = 1) -> list[bytes]:
+    rng = random.Random(seed)
+    addresses = [f"CE{i:06X}" for i in range(200)]
+    blocks = []
+    for _ in range(count):
+        messages = []
+        for _ in range(per_block):
+            data = "".join(rng.choice("@ABCDEFGHKXYZ") for _ in range(60))
+            header = (
+                f"{rng.choice(addresses)}24204{rng.randrange(24):02d}"
+                f"{rng.randrange(60):02d}{rng.randrange(60):02d}G"
+                f"{rng.randrange(25, 50)}-0NN096WUB{len(data):05d}"
+            )
+            messages.append(header + data)
+        blocks.append("".join(messages).encode())
+    return blocks
+
+
+@unittest.skipUnless(HAS_ZSTANDARD, "zstandard is not installed")
+class TestCompressedArchive(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temp_dir.name)
+        self.blocks = make_blocks()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_message_mode_random_access(self):
+        from dcpmessage.compressed_archive import (
+            CompressedArchiveReader,
+            CompressedArchiveWriter,
+            train_dictionary,
+        )
+
+        dictionary = train_dictionary(self.blocks[:30], size=4096)
+        positions = []
+        with CompressedArchiveWriter(self.directory, dictionary) as writer:
+            for block in self.blocks[:-1]:
+                positions.extend(writer.append(block))
+            positions.extend(
+                writer.append(
+                    LddsMessage.create(LddsMessageIds.dcp_block, self.blocks[-1])
+                )
+            )
+        # per-message frames with a dictionary beat the raw size clearly
+        self.assertGreater(writer.ratio, 1.5)
+
+        messages = [
+            block[i * 97 : (i + 1) * 97] for block in self.blocks for i in range(50)
+        ]
+        reader = CompressedArchiveReader(self.directory)
+        self.assertEqual(reader.read(positions[1234]), messages[1234])
+        self.assertEqual(list(reader), messages)
+        listed = list(reader.iter_messages(lambda header: header[:8] == b"CE000001"))
+        self.assertEqual(
+            [m for _, m in listed], [m for m in messages if m.startswith(b"CE000001")]
+        )
+        self.assertEqual(reader.read(listed[0][0]), listed[0][1])
+
+    def test_block_mode(self):
+        from dcpmessage.compressed_archive import (
+            CompressedArchiveReader,
+            CompressedArchiveWriter,
+        )
+
+        with CompressedArchiveWriter(self.directory, mode="block") as writer:
+            positions = writer.append(self.blocks[0])
+        self.assertEqual(len(positions), 50)
+        self.assertEqual(len({p.offset for p in positions}), 1)
+        reader = CompressedArchiveReader(self.directory)
+        self.assertEqual(reader.read(positions[3]), self.blocks[0][3 * 97 : 4 * 97])
+        self.assertEqual(b"".join(reader), self.blocks[0])
+
+    def test_dictionary_versions(self):
+        from dcpmessage.compressed_archive import (
+            CompressedArchiveReader,
+            CompressedArchiveWriter,
+            DictionaryStore,
+            train_dictionary,
+        )
+
+        first = train_dictionary(self.blocks[:20], size=4096)
+        second = train_dictionary(make_blocks(seed=2)[:20], size=4096)
+        with CompressedArchiveWriter(self.directory, first) as writer:
+            writer.append(self.blocks[0])
+        with CompressedArchiveWriter(self.directory, first) as writer:
+            writer.append(self.blocks[1])
+        # a new dictionary starts a new segment, the old one stays readable
+        with CompressedArchiveWriter(self.directory, second) as writer:
+            writer.append(self.blocks[2])
+
+        reader = CompressedArchiveReader(self.directory)
+        self.assertEqual(len(reader.segments()), 2)
+        self.assertEqual(
+            DictionaryStore(self.directory).ids(),
+            sorted([first.dict_id(), second.dict_id()]),
+        )
+        self.assertEqual(b"".join(reader), b"".join(self.blocks[:3]))
+
+    def test_corrupt_block_writes_nothing(self):
+        from dcpmessage.compressed_archive import (
+            CompressedArchiveReader,
+            CompressedArchiveWriter,
+        )
+
+        with CompressedArchiveWriter(self.directory) as writer:
+            with self.assertRaises(ValueError):
+                writer.append(self.blocks[0][:97] + b"not a DCP message header")
+        self.assertEqual(list(CompressedArchiveReader(self.directory)), [])
+
+    def test_torn_record_truncated_on_resume(self):
+        from dcpmessage.compressed_archive import (
+            CompressedArchiveReader,
+            CompressedArchiveWriter,
+        )
+
+        with CompressedArchiveWriter(self.directory, mode="block") as writer:
+            writer.append(self.blocks[0])
+            writer.append(self.blocks[1])
+        # a crash while writing the second record leaves part of it
+        (segment,) = CompressedArchiveReader(self.directory).segments()
+        with open(segment, "r+b") as f:
+            f.truncate(segment.stat().st_size - 5)
+        with CompressedArchiveWriter(self.directory, mode="block") as writer:
+            writer.append(self.blocks[2])
+
+        reader = CompressedArchiveReader(self.directory)
+        self.assertEqual(len(reader.segments()), 1)
+        self.assertEqual(b"".join(reader), self.blocks[0] + self.blocks[2])
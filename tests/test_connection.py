@@ -0,0 +1,130 @@
+import errno
+import socket
+import time
+import unittest
+from unittest import mock
+
+from dcpmessage.connection import (
+    ResolverCache,
+    SocketOptions,
+    connect_addresses,
+    interleave_families,
+)
+from dcpmessage.ldds_client import BasicClient
+
+
+def address(port: int, host: str = "127.0.0.1", family=socket.AF_INET):
+    return family, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (host, port)
+
+
+def closed_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class TestConnection(unittest.TestCase):
+    def setUp(self):
+        self.server = socket.socket()
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen()
+        self.port = self.server.getsockname()[1]
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_resolver_cache_reuses_until_ttl(self):
+        with mock.patch.object(
+            socket, "getaddrinfo", return_value=[address(16003)]
+        ) as getaddrinfo:
+            cache = ResolverCache(ttl=60)
+            self.assertEqual(cache.resolve("lrgs", 16003), [address(16003)])
+            cache.resolve("lrgs", 16003)
+            self.assertEqual(getaddrinfo.call_count, 1)
+            cache.invalidate("lrgs", 16003)
+            cache.resolve("lrgs", 16003)
+            self.assertEqual(getaddrinfo.call_count, 2)
+
+            expired = ResolverCache(ttl=0)
+            expired.resolve("lrgs", 16003)
+            expired.resolve("lrgs", 16003)
+            self.assertEqual(getaddrinfo.call_count, 4)
+
+    def test_resolver_cache_is_bounded(self):
+        with mock.patch.object(socket, "getaddrinfo", return_value=[address(1)]):
+            cache = ResolverCache(ttl=60, max_entries=2)
+            for port in range(5):
+                cache.resolve("lrgs", port)
+        with mock.patch.object(socket, "getaddrinfo") as getaddrinfo:
+            cache.resolve("lrgs", 4)
+            getaddrinfo.assert_not_called()
+            cache.resolve("lrgs", 0)
+            getaddrinfo.assert_called_once()
+
+    def test_interleave_families(self):
+        v4 = [address(1, "10.0.0.1"), address(1, "10.0.0.2")]
+        v6 = [address(1, "::1", socket.AF_INET6), address(1, "::2", socket.AF_INET6)]
+        self.assertEqual(interleave_families(v6 + v4), [v6[0], v4[0], v6[1], v4[1]])
+        self.assertEqual(interleave_families(v4), v4)
+
+    def test_connect_falls_back_to_next_address(self):
+        addresses = [address(closed_port()), address(self.port)]
+        sock = connect_addresses(addresses, timeout=5)
+        with sock:
+            self.assertEqual(sock.getpeername()[1], self.port)
+            self.assertTrue(sock.getblocking())
+            self.assertTrue(sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY))
+
+    def test_connect_skips_hanging_address(self):
+        # a listener with a full backlog drops new SYNs, so connecting hangs
+        hanging = socket.socket()
+        hanging.bind(("127.0.0.1", 0))
+        hanging.listen(0)
+        backlog = [socket.socket() for _ in range(4)]
+        try:
+            for sock in backlog:
+                sock.setblocking(False)
+                sock.connect_ex(hanging.getsockname())
+            time.sleep(0.1)
+            addresses = [address(hanging.getsockname()[1]), address(self.port)]
+            start = time.monotonic()
+            sock = connect_addresses(addresses, timeout=5, attempt_delay=0.3)
+            elapsed = time.monotonic() - start
+            with sock:
+                self.assertEqual(sock.getpeername()[1], self.port)
+            self.assertGreaterEqual(elapsed, 0.25)
+            self.assertLess(elapsed, 2)
+        finally:
+            for sock in backlog:
+                sock.close()
+            hanging.close()
+
+    def test_connect_raises_last_error(self):
+        with self.assertRaises(OSError) as context:
+            connect_addresses([address(closed_port())], timeout=5)
+        self.assertEqual(context.exception.errno, errno.ECONNREFUSED)
+
+    def test_client_applies_socket_options(self):
+        options = SocketOptions(
+            tcp_nodelay=False,
+            receive_buffer=256 * 1024,
+            keepalive=True,
+            keepalive_idle=30,
+        )
+        client = BasicClient("127.0.0.1", self.port, timeout=5, socket_options=options)
+        client.connect()
+        try:
+            sock = client.socket
+            self.assertFalse(sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY))
+            self.assertTrue(sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE))
+            self.assertGreaterEqual(
+                sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF), 256 * 1024
+            )
+            self.assertEqual(sock.gettimeout(), 5)
+        finally:
+            client.disconnect()
+
+    def test_client_connect_error_message(self):
+        client = BasicClient("127.0.0.1", closed_port(), timeout=5)
+        with self.assertRaisesRegex(IOError, "Cannot connect to 127.0.0.1"):
+            client.connect()
@@ -0,0 +1,26 @@
+import unittest
+from datetime import datetime, timezone
+
+from dcpmessage.dcp_header import DcpHeader
+
+
+class TestDcpHeader(unittest.TestCase):
+    def test_parse(self):
+        header = DcpHeader.parse(b"A081B07E24204153353G30-0NN096WUB00012`BST@KZ@KZh ")
+        self.assertEqual(header.address, "A081B07E")
+        self.assertEqual(
+            header.transmit_time, datetime(2024, 7, 22, 15, 33, 53, tzinfo=timezone.utc)
+        )
+        self.assertEqual(header.failure_code, "G")
+        self.assertEqual(header.signal_strength, 30)
+        self.assertEqual(header.goes_channel, 96)
+        self.assertEqual(header.spacecraft, "W")
+        self.assertEqual(header.data_source, "UB")
+        self.assertEqual(header.message_length, 12)
+
+    def test_transmit_timestamp(self):
+        message = "A081B07E24204153353G30-0NN096WUB00012`BST@KZ@KZh "
+        self.assertEqual(
+            DcpHeader.transmit_timestamp(message),
+            int(datetime(2024, 7, 22, 15, 33, 53, tzinfo=timezone.utc).timestamp()),
+        )
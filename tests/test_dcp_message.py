@@ -1,4 +1,9 @@
+import time
 import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from fakes import FakeSocket, fake_connect
 
 from dcpmessage.dcp_message import DcpMessage
 from dcpmessage.ldds_message import LddsMessage, LddsMessageIds
@@ -25,3 +30,222 @@ class TestDcpMessage(unittest.TestCase):
                 "A081B07E24204144853G30-0HN096WUP00012`BST@KY@KYg ",
             ],
         )
+
+    MESSAGES = [
+        b"A081B07E24204153353G30-0NN096WUB00012`BST@KZ@KZh ",
+        b"A081B07E24204151853G30-0HN096WUB00012`BST@KZ@KYh ",
+        b"A081B07E24204150353G29-0HN096WUP00012`BST@KY@KYg ",
+    ]
+
+    def split_tolerant(self, data: bytes):
+        skipped = []
+        messages = [
+            bytes(m)
+            for m in DcpMessage.split(
+                data, tolerant=True, on_skip=lambda *r: skipped.append(r)
+            )
+        ]
+        return messages, skipped
+
+    def test_split_tolerant_clean_block(self):
+        data = b"".join(self.MESSAGES)
+        self.assertEqual(self.split_tolerant(data), (self.MESSAGES, []))
+
+    def test_split_tolerant_non_numeric_length(self):
+        first, second, third = self.MESSAGES
+        corrupt = second[:32] + b"0x012" + second[37:]
+        messages, skipped = self.split_tolerant(first + corrupt + third)
+        self.assertEqual(messages, [first, third])
+        self.assertEqual(skipped, [(49, 98)])
+        with self.assertRaises(ValueError):
+            list(DcpMessage.split(first + corrupt + third))
+
+    def test_split_tolerant_length_too_large(self):
+        first, second, third = self.MESSAGES
+        corrupt = second[:32] + b"00040" + second[37:]
+        messages, skipped = self.split_tolerant(first + corrupt + third)
+        self.assertEqual(messages, [first, third])
+        self.assertEqual(skipped, [(49, 98)])
+
+    def test_split_tolerant_length_too_small(self):
+        first, second, third = self.MESSAGES
+        corrupt = second[:32] + b"00005" + second[37:]
+        messages, skipped = self.split_tolerant(first + corrupt + third)
+        # a message not ending at a header is corrupt, not truncated
+        self.assertEqual(messages, [first, third])
+        self.assertEqual(skipped, [(49, 98)])
+
+    def test_split_tolerant_garbage_between_messages(self):
+        first, second, third = self.MESSAGES
+        messages, skipped = self.split_tolerant(first + b"\x00garbage" + second + third)
+        # indistinguishable from a length field too small: the message is skipped
+        self.assertEqual(messages, [second, third])
+        self.assertEqual(skipped, [(0, 57)])
+
+    def test_split_tolerant_leading_garbage_and_truncated_tail(self):
+        first, second, third = self.MESSAGES
+        messages, skipped = self.split_tolerant(b"xx" + first + second + third[:40])
+        self.assertEqual(messages, [first, second])
+        self.assertEqual(skipped, [(0, 2), (100, 140)])
+
+    def test_explode_tolerant_reports_block_index(self):
+        first, second, third = self.MESSAGES
+        blocks = [
+            LddsMessage.create(LddsMessageIds.dcp_block, first + second),
+            LddsMessage.create(LddsMessageIds.dcp_block, first + b"junk" + third),
+        ]
+        skipped = []
+        messages = DcpMessage.explode(
+            blocks, tolerant=True, on_skip=lambda *r: skipped.append(r)
+        )
+        self.assertEqual(len(messages), 3)
+        self.assertEqual(skipped, [(1, 0, 53)])
+
+    def test_explode_tolerant_invalid_utf8(self):
+        first, second, _ = self.MESSAGES
+        invalid = second[:40] + b"\xff\xfe" + second[42:]
+        block = LddsMessage.create(LddsMessageIds.dcp_block, first + invalid)
+        with self.assertRaises(UnicodeDecodeError):
+            DcpMessage.explode([block])
+        messages = DcpMessage.explode([block], tolerant=True)
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(messages[1][:40], second[:40].decode())
+        self.assertEqual(messages[1][40:42], "\ufffd\ufffd")
+
+    def test_stream_yields_messages_per_block(self):
+        block = LddsMessage.create(
+            LddsMessageIds.dcp_block,
+            b"A081B07E24204153353G30-0NN096WUB00012`BST@KZ@KZh "
+            b"A081B07E24204151853G30-0HN096WUB00012`BST@KZ@KYh ",
+        ).to_bytes()
+        responses = [
+            LddsMessage.create(LddsMessageIds.auth_hello, b"user").to_bytes(),
+            LddsMessage.create(LddsMessageIds.auth_hello, b"user").to_bytes(),
+            LddsMessage.create(LddsMessageIds.search_criteria, b"").to_bytes(),
+            block,
+            block,
+            LddsMessage.create(
+                LddsMessageIds.dcp_block, b"?35,0,Until time reached"
+            ).to_bytes(),
+            LddsMessage.create(LddsMessageIds.goodbye, b"").to_bytes(),
+        ]
+        sent = []
+        with fake_connect(responses, sent):
+            stream = DcpMessage.stream(
+                "user",
+                "pass",
+                {"DRS_SINCE": "now - 1 hour", "DRS_UNTIL": "now"},
+                host="localhost",
+            )
+            self.assertEqual(next(stream)[:8], "A081B07E")
+            # only the first block has been requested so far
+            self.assertEqual(len(sent), 4)
+            self.assertEqual(len(list(stream)), 3)
+        self.assertEqual(responses, [])
+
+    def fake_session(self, responses, sent, block_delay=0.0):
+        """Patch LddsClient.connect with a socket answering with ``responses``."""
+        timeouts = []
+
+        class SlowSocket(FakeSocket):
+            def settimeout(self, timeout):
+                timeouts.append(timeout)
+
+            def recv(self, buffer_size):
+                if not self.pending and self.responses:
+                    if self.responses[0] is TimeoutError:
+                        self.responses.pop(0)
+                        time.sleep(timeouts[-1])
+                        raise TimeoutError("timed out")
+                    if len(self.sent) > 3:
+                        time.sleep(block_delay)
+                return super().recv(buffer_size)
+
+        return fake_connect(responses, sent, socket_class=SlowSocket), timeouts
+
+    def auth_responses(self):
+        return [
+            LddsMessage.create(LddsMessageIds.auth_hello, b"user").to_bytes(),
+            LddsMessage.create(LddsMessageIds.auth_hello, b"user").to_bytes(),
+            LddsMessage.create(LddsMessageIds.search_criteria, b"").to_bytes(),
+        ]
+
+    def test_get_stops_before_deadline_with_goodbye(self):
+        block = LddsMessage.create(
+            LddsMessageIds.dcp_block, self.MESSAGES[0] + self.MESSAGES[1]
+        ).to_bytes()
+        goodbye = LddsMessage.create(LddsMessageIds.goodbye, b"").to_bytes()
+        responses = self.auth_responses() + [block, goodbye]
+        sent = []
+        patch, timeouts = self.fake_session(responses, sent, block_delay=0.6)
+        with patch:
+            # after the first block, less than a block plus the 1 s reserve is left
+            result = DcpMessage.get(
+                "user",
+                "pass",
+                {"DRS_SINCE": "now - 1 hour", "DRS_UNTIL": "now"},
+                host="localhost",
+                deadline=2.0,
+            )
+        self.assertEqual(len(result), 2)
+        self.assertFalse(result.complete)
+        self.assertEqual(result.resume_token, "2024/204 15:33:53")
+        # one block requested, then goodbye
+        self.assertEqual(len(sent), 5)
+        self.assertEqual(responses, [])
+        self.assertTrue(all(0 < t <= 2.0 for t in timeouts))
+
+    def test_get_returns_partial_result_when_deadline_passes_mid_block(self):
+        responses = self.auth_responses() + [TimeoutError]
+        sent = []
+        patch, _ = self.fake_session(responses, sent)
+        with patch:
+            result = DcpMessage.get(
+                "user",
+                "pass",
+                {"DRS_SINCE": "2024/204 00:00:00", "DRS_UNTIL": "now"},
+                host="localhost",
+                deadline=1.2,
+            )
+        self.assertEqual(result, [])
+        self.assertFalse(result.complete)
+        self.assertEqual(result.resume_token, "2024/204 00:00:00")
+        # no goodbye on a connection closed mid-frame
+        self.assertEqual(len(sent), 4)
+
+    def test_resume_token_of_relative_criteria_is_absolute(self):
+        class FixedDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return datetime(2024, 7, 22, 12, 0, 0, tzinfo=timezone.utc)
+
+        responses = self.auth_responses() + [TimeoutError]
+        patch, _ = self.fake_session(responses, [])
+        with patch, mock.patch("dcpmessage.dcp_message.datetime", FixedDatetime):
+            result = DcpMessage.get(
+                "user",
+                "pass",
+                {"DRS_SINCE": "now - 1 hour", "DRS_UNTIL": "now"},
+                host="localhost",
+                deadline=1.2,
+            )
+        self.assertFalse(result.complete)
+        self.assertEqual(result.resume_token, "2024/204 11:00:00")
+
+    def test_get_without_deadline_is_complete(self):
+        end = LddsMessage.create(
+            LddsMessageIds.dcp_block, b"?35,0,Until time reached"
+        ).to_bytes()
+        goodbye = LddsMessage.create(LddsMessageIds.goodbye, b"").to_bytes()
+        block = LddsMessage.create(
+            LddsMessageIds.dcp_block, self.MESSAGES[0]
+        ).to_bytes()
+        responses = self.auth_responses() + [block, end, goodbye]
+        patch, _ = self.fake_session(responses, [])
+        with patch:
+            result = DcpMessage.get(
+                "user", "pass", {"DRS_SINCE": "now - 1 hour"}, host="localhost"
+            )
+        self.assertEqual(result, [self.MESSAGES[0].decode()])
+        self.assertTrue(result.complete)
+        self.assertIsNone(result.resume_token)
@@ -0,0 +1,84 @@
+import calendar
+import random
+import unittest
+
+from dcpmessage.dcp_metrics import DcpMetrics, LogHistogram
+
+# 2024 day 204 = 2024-07-22
+DAY_START = calendar.timegm((2024, 7, 22, 0, 0, 0))
+
+
+def message(address: str, hhmmss: str, failure: str = "G", signal: str = "30"):
+    return f"{address}24204{hhmmss}{failure}{signal}-0NN096WUB00012`BST@KZ@KZh "
+
+
+class TestLogHistogram(unittest.TestCase):
+    def test_quantiles_within_relative_error(self):
+        rng = random.Random(1)
+        values = [rng.lognormvariate(4, 1) for _ in range(10000)]
+        histogram = LogHistogram(sub_buckets=16)
+        for value in values:
+            histogram.record(value)
+        values.sort()
+        for q in (0.5, 0.9, 0.99):
+            exact = values[int(q * len(values)) - 1]
+            self.assertAlmostEqual(histogram.quantile(q) / exact, 1, delta=1 / 16)
+        self.assertEqual(histogram.count, 10000)
+        self.assertEqual(histogram.min, values[0])
+        self.assertEqual(histogram.max, values[-1])
+        # memory is bounded by the range of the values, not their number
+        self.assertLess(len(histogram.counts), 16 * 16)
+
+    def test_merge_and_empty_snapshot(self):
+        self.assertEqual(LogHistogram().snapshot()["p50"], None)
+        a, b = LogHistogram(), LogHistogram()
+        a.record(10)
+        b.record(1000)
+        b.record(-5)
+        a.merge(b)
+        self.assertEqual(a.count, 3)
+        self.assertEqual(a.min, 0)
+        self.assertEqual(a.quantile(1.0), 1000)
+
+
+class TestDcpMetrics(unittest.TestCase):
+    def test_per_address_metrics(self):
+        metrics = DcpMetrics()
+        received = DAY_START + 15 * 3600 + 35 * 60  # 15:35:00
+        metrics.observe_all(
+            [
+                message("A081B07E", "153000"),
+                message("A081B07E", "153100", failure="?", signal="45"),
+                message("A081B07E", "152900"),
+                message("CE4A3B2C", "153400").encode(),
+            ],
+            received=received,
+        )
+        metrics.observe(b"garbage", received=received)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["messages"], 4)
+        self.assertEqual(snapshot["invalid"], 1)
+        self.assertEqual(metrics.addresses(), ["A081B07E", "CE4A3B2C"])
+
+        stats = snapshot["addresses"]["A081B07E"]
+        self.assertEqual(stats["count"], 3)
+        self.assertEqual(stats["latency_seconds"]["min"], 240)
+        self.assertEqual(stats["latency_seconds"]["max"], 360)
+        self.assertEqual(stats["gap_seconds"]["count"], 1)
+        self.assertEqual(stats["gap_seconds"]["max"], 60)
+        self.assertEqual(stats["out_of_order"], 1)
+        self.assertEqual(stats["failure_codes"], {"?": 1, "G": 2})
+        self.assertEqual(stats["signal_strength"], {30: 2, 45: 1})
+        self.assertEqual(stats["last_transmit_time"], "2024-07-22T15:31:00Z")
+        self.assertEqual(stats["last_received_time"], "2024-07-22T15:35:00Z")
+        self.assertEqual(
+            snapshot["addresses"]["CE4A3B2C"]["latency_seconds"]["max"], 60
+        )
+
+    def test_snapshot_reset(self):
+        metrics = DcpMetrics()
+        metrics.observe(message("A081B07E", "153000"), received=DAY_START + 55800)
+        self.assertEqual(metrics.snapshot(reset=True)["messages"], 1)
+        self.assertEqual(metrics.snapshot()["messages"], 0)
+        self.assertEqual(metrics.addresses(), [])
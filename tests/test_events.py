@@ -0,0 +1,132 @@
+import threading
+import time
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from fakes import fake_connect
+
+from dcpmessage.dcp_message import DcpMessage
+from dcpmessage.events import EventDispatcher, parse_event, parse_events
+from dcpmessage.ldds_client import LddsClient
+from dcpmessage.ldds_message import LddsMessage, LddsMessageIds
+
+EVENTS = (
+    b"INFO 2024/07/22-15:33:53 DdsServer:20 Client user connected\n"
+    b"WARNING 2024/07/22-15:34:01 DdsServer:-34 Archive search slow\n"
+)
+
+
+class TestEvents(unittest.TestCase):
+    def test_parse_events(self):
+        first, second = parse_events(EVENTS + b"\0")
+        self.assertEqual(first.priority, "INFO")
+        self.assertEqual(
+            first.time, datetime(2024, 7, 22, 15, 33, 53, tzinfo=timezone.utc)
+        )
+        self.assertEqual((first.module, first.code), ("DdsServer", 20))
+        self.assertEqual(first.text, "Client user connected")
+        self.assertFalse(first.is_problem)
+        self.assertTrue(second.is_problem)
+
+        event = parse_event("FAILURE 07/22/2024 15:33:53 disk full")
+        self.assertEqual(event.time.day, 22)
+        self.assertIsNone(event.module)
+        self.assertEqual(event.text, "disk full")
+        self.assertEqual(parse_event("something else").text, "something else")
+
+    def test_dispatcher_never_blocks(self):
+        release = threading.Event()
+        received = []
+
+        def slow(event):
+            release.wait(5)
+            received.append(event)
+
+        dispatcher = EventDispatcher(slow, queue_size=2)
+        events = parse_events(EVENTS) * 3
+        dispatcher.dispatch(events)
+        release.set()
+        dispatcher.close()
+        # one event taken by the thread, two queued, the rest dropped
+        self.assertGreaterEqual(dispatcher.dropped, 2)
+        self.assertEqual(len(received) + dispatcher.dropped, len(events))
+
+    def test_dispatcher_close_times_out(self):
+        release = threading.Event()
+        received = []
+
+        def stuck(event):
+            release.wait(5)
+            received.append(event)
+
+        dispatcher = EventDispatcher(stuck)
+        dispatcher.dispatch(parse_events(EVENTS) * 2)
+        start = time.monotonic()
+        dispatcher.close(timeout=0.2)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(dispatcher.undelivered, 4)
+        release.set()
+        time.sleep(0.1)
+        # only the event being delivered at close completes
+        self.assertLessEqual(len(received), 1)
+
+    def test_dispatcher_survives_failing_callback(self):
+        received = []
+
+        def failing(event):
+            raise ValueError("bad callback")
+
+        with EventDispatcher([failing, received.append]) as dispatcher:
+            dispatcher.dispatch(parse_events(EVENTS))
+        self.assertEqual(len(received), 2)
+        self.assertEqual(dispatcher.delivered, 2)
+
+    def test_get_polls_events_in_session(self):
+        def frame(message_id, data=b""):
+            return LddsMessage.create(message_id, data).to_bytes()
+
+        block = frame(
+            LddsMessageIds.dcp_block,
+            b"A081B07E24204153353G30-0NN096WUB00012`BST@KZ@KZh ",
+        )
+        responses = [
+            frame(LddsMessageIds.auth_hello, b"user"),
+            frame(LddsMessageIds.auth_hello, b"user"),
+            frame(LddsMessageIds.search_criteria),
+            frame(LddsMessageIds.events, EVENTS),
+            block,
+            frame(LddsMessageIds.dcp_block, b"?35,0,Until time reached"),
+            frame(LddsMessageIds.events),
+            frame(LddsMessageIds.goodbye),
+        ]
+        sent = []
+        received = []
+        with fake_connect(responses, sent):
+            messages = DcpMessage.get(
+                "user",
+                "pass",
+                {"DRS_SINCE": "now - 1 hour"},
+                host="localhost",
+                on_event=received.append,
+            )
+        self.assertEqual(len(messages), 1)
+        self.assertEqual([e.code for e in received], [20, -34])
+        self.assertEqual(b"".join(s[4:5] for s in sent), b"mmgonnob")
+
+    def test_events_refused_by_server(self):
+        responses = [
+            LddsMessage.create(
+                LddsMessageIds.events, b"?17,0,Not permitted"
+            ).to_bytes(),
+            LddsMessage.create(
+                LddsMessageIds.dcp_block, b"?35,0,Until time reached"
+            ).to_bytes(),
+        ]
+        handler = mock.Mock()
+        with fake_connect(responses):
+            client = LddsClient("localhost", 16003, 30, event_handler=handler)
+            client.connect()
+            self.assertEqual(client.request_dcp_blocks(), [])
+        self.assertIsNone(client.event_handler)
+        handler.assert_not_called()
@@ -0,0 +1,60 @@
+import tempfile
+import unittest
+
+from dcpmessage.archive import BlockArchiveReader, BlockArchiveWriter
+from dcpmessage.dcp_message import DcpMessage
+from dcpmessage.filters import (
+    Address,
+    Channel,
+    FailureCode,
+    MessageFilter,
+    SignalStrength,
+    Spacecraft,
+)
+from dcpmessage.ldds_message import LddsMessage, LddsMessageIds
+
+MESSAGES = [
+    "A081B07E24204153353G30-0NN096WUB00012`BST@KZ@KZh ",
+    "A081B07E24204151853?41-0HN096WUB00012`BST@KZ@KYh ",
+    "CE4A3B2C24204150353G29-0HN123EUP00012`BST@KY@KYg ",
+    "CE4A3B2C24204144853G4H-0HN096WUP00012`BST@KY@KYg ",
+]
+BLOCKS = [LddsMessage.create(LddsMessageIds.dcp_block, "".join(MESSAGES).encode())]
+
+
+class TestMessageFilters(unittest.TestCase):
+    def explode(self, message_filter):
+        return [MESSAGES.index(m) for m in DcpMessage.explode(BLOCKS, message_filter)]
+
+    def test_field_filters(self):
+        self.assertEqual(self.explode(Address("a081b07e")), [0, 1])
+        self.assertTrue(Address("A081B07E")(MESSAGES[0].lower().encode()))
+        self.assertEqual(self.explode(FailureCode("?")), [1])
+        self.assertEqual(self.explode(Channel(123)), [2])
+        self.assertEqual(self.explode(Spacecraft("W")), [0, 1, 3])
+        # non-numeric signal strength is dropped
+        self.assertEqual(self.explode(SignalStrength(minimum=30)), [0, 1])
+
+    def test_composition(self):
+        self.assertEqual(self.explode(Address("CE4A3B2C") & Channel(96)), [3])
+        self.assertEqual(self.explode(FailureCode("?") | Channel(123)), [1, 2])
+        self.assertEqual(self.explode(~FailureCode("G")), [1])
+        combined = Address("A081B07E") & ~FailureCode("?") & SignalStrength(0, 35)
+        self.assertEqual(len(combined.filters), 3)
+        self.assertEqual(self.explode(combined), [0])
+
+    def test_base_class_is_abstract(self):
+        with self.assertRaises(TypeError):
+            MessageFilter()
+
+    def test_filter_decoded_messages(self):
+        self.assertEqual(DcpMessage.filter(MESSAGES, Channel(123)), [MESSAGES[2]])
+        self.assertIs(DcpMessage.filter(MESSAGES, None), MESSAGES)
+
+    def test_archive_messages(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with BlockArchiveWriter(directory) as writer:
+                writer.append(BLOCKS[0])
+            reader = BlockArchiveReader(directory)
+            messages = [bytes(m) for m in reader.iter_messages(FailureCode("?"))]
+        self.assertEqual(messages, [MESSAGES[1].encode()])
@@ -0,0 +1,82 @@
+import subprocess
+import sys
+import unittest
+
+# Generous budgets for ``import dcpmessage`` plus ``DcpMessage`` (stdlib modules
+# included, about 25 ms on an idle machine), leaving room for loaded CI runners.
+# The list of deferred modules below is the precise guard against eager imports.
+IMPORT_TIME_BUDGET_US = 300_000
+IMPORT_MEMORY_BUDGET_BYTES = 8 * 1024 * 1024
+
+# Modules only some code paths need, and optional extras that must never load
+# on import.
+DEFERRED_MODULES = (
+    "json",
+    "hashlib",
+    "socket",
+    "sqlite3",
+    "dcpmessage._server_error_codes",
+    "dcpmessage.cache",
+    "dcpmessage.capture",
+    "dcpmessage.connection",
+    "dcpmessage.store",
+    "numpy",
+    "pyarrow",
+    "zstandard",
+    "prometheus_client",
+)
+
+IMPORT_SCRIPT = """
+import sys
+import tracemalloc
+
+before = set(sys.modules)
+tracemalloc.start()
+import dcpmessage
+
+dcpmessage.DcpMessage
+print(tracemalloc.get_traced_memory()[1])
+print(" ".join(sorted(set(sys.modules) - before)))
+"""
+
+
+def run_import(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args, "-c", IMPORT_SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+class TestImportBudget(unittest.TestCase):
+    def test_deferred_modules_not_loaded(self):
+        lines = run_import().stdout.splitlines()
+        loaded = set(lines[1].split())
+        self.assertIn("dcpmessage.dcp_message", loaded)
+        for module in DEFERRED_MODULES:
+            self.assertNotIn(module, loaded)
+
+    def test_memory_budget(self):
+        peak = int(run_import().stdout.splitlines()[0])
+        self.assertLess(peak, IMPORT_MEMORY_BUDGET_BYTES)
+
+    def test_import_time_budget(self):
+        # best of a few runs, so that a busy machine does not fail the budget
+        best = min(self.import_time() for _ in range(3))
+        self.assertGreater(best, 0)
+        self.assertLess(best, IMPORT_TIME_BUDGET_US)
+
+    @staticmethod
+    def import_time() -> int:
+        stderr = run_import("-X", "importtime").stderr
+        total = 0
+        for line in stderr.splitlines():
+            # "import time: self [us] | cumulative | imported package"
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = line.split("|")
+            # top-level entries only; nested imports are part of their parent
+            if name.startswith(" dcpmessage"):
+                total += int(cumulative)
+        return total
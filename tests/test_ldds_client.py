@@ -1,6 +1,9 @@
 import unittest
 
+from fakes import FakeSocket
+
 from dcpmessage.ldds_client import LddsClient
+from dcpmessage.ldds_message import LddsMessage, LddsMessageIds
 
 
 class TestBasicClient(unittest.TestCase):
@@ -13,3 +16,58 @@ class TestBasicClient(unittest.TestCase):
             self.assertEqual(str(err), "Connection to 10.255.255.1:80 timed out")
 
         client.disconnect()
+
+
+class TestLddsClient(unittest.TestCase):
+    def client(self, fake_socket: FakeSocket) -> LddsClient:
+        client = LddsClient("localhost", 16003, 30)
+        client.socket = fake_socket
+        return client
+
+    def test_receive_data_in_chunks(self):
+        frames = [
+            LddsMessage.create(LddsMessageIds.dcp_block, b"x" * 5000).to_bytes(),
+            LddsMessage.create(LddsMessageIds.goodbye).to_bytes(),
+        ]
+        fake_socket = FakeSocket(list(frames), chunk=7)
+        client = self.client(fake_socket)
+        self.assertEqual(client.receive_data(), frames[0])
+        # the next message is not consumed by the previous one
+        self.assertEqual(client.receive_data(), frames[1])
+
+        # the header is read on its own, then the data in buffer_size chunks
+        fake_socket = FakeSocket(list(frames))
+        client = self.client(fake_socket)
+        self.assertEqual(client.receive_data(buffer_size=4096), frames[0])
+        self.assertEqual(fake_socket.recv_sizes, [10, 4096, 904])
+
+        fake_socket = FakeSocket([frames[0][:100]])
+        with self.assertRaises(IOError):
+            self.client(fake_socket).receive_data()
+
+    def test_parse_protocol_version(self):
+        self.assertEqual(LddsClient.parse_protocol_version(b"user 24204153353 16"), 16)
+        self.assertIsNone(LddsClient.parse_protocol_version(b"user"))
+        self.assertIsNone(LddsClient.parse_protocol_version(b"user 24204153353 x"))
+
+    def negotiate(self, response: bytes) -> tuple[LddsClient, FakeSocket]:
+        frame = LddsMessage.create(LddsMessageIds.auth_hello, response).to_bytes()
+        fake_socket = FakeSocket([frame, frame])
+        client = self.client(fake_socket)
+        client.authenticate_user("user", "pass")
+        return client, fake_socket
+
+    def test_negotiates_older_server_version(self):
+        client, fake_socket = self.negotiate(b"user 24204153353 12")
+        self.assertEqual(client.server_protocol_version, 12)
+        self.assertEqual(client.protocol_version, 12)
+        # the first hello announces the client version, the next one the agreed one
+        self.assertTrue(fake_socket.sent[0].endswith(b" 14"))
+        self.assertTrue(fake_socket.sent[1].endswith(b" 12"))
+
+    def test_newer_or_unknown_server_version(self):
+        client, _ = self.negotiate(b"user 24204153353 20")
+        self.assertEqual(client.protocol_version, 14)
+        client, _ = self.negotiate(b"user")
+        self.assertIsNone(client.server_protocol_version)
+        self.assertEqual(client.protocol_version, 14)
@@ -0,0 +1,80 @@
+import unittest
+
+from dcpmessage.exceptions import DeadlineExceeded, ProtocolError, ServerError
+from dcpmessage.limiter import AimdLimiter, backoff_delays, is_throttling_error
+
+
+def server_error(code: int) -> ProtocolError:
+    try:
+        ServerError("error", code, 0).raise_exception()
+    except ProtocolError as ex:
+        return ex
+
+
+class TestAimdLimiter(unittest.TestCase):
+    def test_is_throttling_error(self):
+        self.assertTrue(is_throttling_error(server_error(24)))
+        self.assertTrue(is_throttling_error(server_error(49)))
+        self.assertFalse(is_throttling_error(server_error(17)))
+        self.assertFalse(is_throttling_error(DeadlineExceeded()))
+        try:
+            raise IOError("Connection timed out") from TimeoutError()
+        except IOError as ex:
+            self.assertTrue(is_throttling_error(ex))
+        self.assertFalse(is_throttling_error(ValueError()))
+
+    def test_additive_increase_multiplicative_decrease(self):
+        limiter = AimdLimiter(initial=2, maximum=4, cooldown=0)
+        for _ in range(4):
+            self.assertTrue(limiter.try_acquire())
+            limiter.release()
+        self.assertEqual(limiter.limit, 3)
+
+        self.assertTrue(limiter.try_acquire())
+        limiter.release(server_error(24))
+        self.assertEqual(limiter.limit, 1)
+
+        limiter.try_acquire()
+        limiter.release(server_error(17))
+        self.assertEqual(limiter.limit, 1)
+
+    def test_slots_are_bounded(self):
+        limiter = AimdLimiter(initial=1)
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.try_acquire())
+        self.assertFalse(limiter.acquire(timeout=0.01))
+        limiter.release()
+        self.assertEqual(limiter.in_use, 0)
+
+    def test_call_retries_throttled_sessions(self):
+        limiter = AimdLimiter(initial=2, cooldown=0)
+        errors = [server_error(24), server_error(48)]
+
+        def session():
+            if errors:
+                raise errors.pop(0)
+            return ["message"]
+
+        self.assertEqual(limiter.call(session, base_delay=0), ["message"])
+        # halved to the minimum, then one successful session at limit 1 adds 1
+        self.assertEqual(limiter.limit, 2)
+        self.assertEqual(limiter.in_use, 0)
+
+    def test_call_does_not_retry_other_errors(self):
+        limiter = AimdLimiter(initial=2)
+        calls = []
+
+        def session():
+            calls.append(1)
+            raise server_error(17)
+
+        with self.assertRaises(ProtocolError):
+            limiter.call(session, base_delay=0)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(limiter.limit, 2)
+
+    def test_backoff_delays(self):
+        delays = backoff_delays(base=1, cap=4)
+        bounds = [1, 2, 4, 4, 4]
+        for bound in bounds:
+            self.assertTrue(0 <= next(delays) <= bound)
@@ -0,0 +1,42 @@
+import unittest
+
+from fakes import FakeSocket
+
+from dcpmessage.ldds_client import LddsClient
+from dcpmessage.ldds_message import LddsMessage, LddsMessageIds
+from dcpmessage.observers import Histogram, MetricsObserver, SessionObserver
+
+
+class TestObservers(unittest.TestCase):
+    def test_default_observer_is_noop(self):
+        client = LddsClient("localhost", 16003, 1)
+        self.assertIs(type(client.observer), SessionObserver)
+
+    def test_metrics_observer_counts_blocks(self):
+        block = LddsMessage.create(
+            LddsMessageIds.dcp_block,
+            b"A081B07E24204153353G30-0NN096WUB00012`BST@KZ@KZh ",
+        ).to_bytes()
+        end = LddsMessage.create(
+            LddsMessageIds.dcp_block, b"?35,0,Until time reached"
+        ).to_bytes()
+
+        observer = MetricsObserver()
+        client = LddsClient("localhost", 16003, 1, observer=observer)
+        client.socket = FakeSocket([block, block, end])
+        blocks = client.request_dcp_blocks()
+
+        snapshot = observer.snapshot()
+        self.assertEqual(len(blocks), 2)
+        self.assertEqual(snapshot["blocks"], 2)
+        self.assertEqual(snapshot["bytes_received"], 98)
+        self.assertEqual(snapshot["block_seconds"]["count"], 2)
+        self.assertEqual(snapshot["server_errors"], {35: 1})
+
+    def test_histogram_cumulative_buckets(self):
+        histogram = Histogram((1.0, 2.0))
+        for value in (0.5, 1.5, 1.7, 5.0):
+            histogram.observe(value)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["buckets"], {1.0: 1, 2.0: 3, float("inf"): 4})
+        self.assertEqual(snapshot["count"], 4)
@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from dcpmessage.archive import BlockArchiveWriter
+from dcpmessage.dcp_header import DcpHeader
+from dcpmessage.dcp_message import DcpMessage
+from dcpmessage.ldds_message import LddsMessage, LddsMessageIds
+from dcpmessage.parallel import (
+    SHARED_MEMORY_DIRECTORY,
+    ParallelExploder,
+    parallel_explode,
+)
+
+
+def make_block(index: int) -> bytes:
+    return b"".join(
+        f"{index:08X}24204{minute:02d}0000G30-0NN096WUB00012`BST@KZ@KZh ".encode()
+        for minute in range(10, 20)
+    )
+
+
+BLOCKS = [
+    LddsMessage.create(LddsMessageIds.dcp_block, make_block(i)) for i in range(50)
+]
+
+
+class TestParallelExploder(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_archive_matches_explode(self):
+        with BlockArchiveWriter(self.directory, segment_size=4096) as writer:
+            for block in BLOCKS:
+                writer.append(block)
+
+        with ParallelExploder(processes=2, chunk_size=1024) as exploder:
+            messages = list(exploder.explode_archive(self.directory))
+        self.assertEqual(messages, DcpMessage.explode(BLOCKS))
+
+    def test_blocks_with_decoder_unordered(self):
+        headers = parallel_explode(
+            BLOCKS, decoder=DcpHeader.parse, processes=2, ordered=False
+        )
+        self.assertEqual(len(headers), 500)
+        self.assertEqual(
+            sorted(h.address for h in headers),
+            sorted(m[:8] for m in DcpMessage.explode(BLOCKS)),
+        )
+
+    def test_temporary_files_removed(self):
+        with ParallelExploder(processes=2, chunk_size=1024) as exploder:
+            messages = exploder.explode_blocks(BLOCKS)
+            next(messages)
+            messages.close()
+            directory = SHARED_MEMORY_DIRECTORY or tempfile.gettempdir()
+            leftovers = [
+                name for name in os.listdir(directory) if name.startswith("dcpmessage-")
+            ]
+        self.assertEqual(leftovers, [])
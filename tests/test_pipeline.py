@@ -0,0 +1,104 @@
+import threading
+import time
+import unittest
+
+from fakes import fake_connect
+
+from dcpmessage.ldds_message import LddsMessage, LddsMessageIds
+from dcpmessage.pipeline import Pipeline, Stage
+
+MESSAGE = b"A081B07E24204153353G30-0NN096WUB00012`BST@KZ@KZh "
+
+
+class TestPipeline(unittest.TestCase):
+    def test_stages_in_order(self):
+        results = []
+        pipeline = Pipeline(
+            range(100),
+            [
+                Stage("double", lambda x: 2 * x),
+                Stage("odd", lambda x: None if x % 4 else x, workers=3),
+                Stage("sink", results.append),
+            ],
+        )
+        stats = pipeline.run()
+        self.assertEqual(sorted(results), list(range(0, 200, 4)))
+        self.assertEqual(list(stats), ["source", "double", "odd", "sink"])
+        self.assertEqual(stats["source"]["items"], 100)
+        self.assertEqual(stats["odd"]["workers"], 3)
+        self.assertEqual(stats["sink"]["items"], 50)
+        self.assertEqual(stats["sink"]["queue_depth"], 0)
+
+    def test_backpressure(self):
+        release = threading.Event()
+        pipeline = Pipeline(
+            range(20), [Stage("sink", lambda x: release.wait(5), queue_size=2)]
+        )
+        pipeline.start()
+        time.sleep(0.3)
+        stats = pipeline.stats()
+        # one item in the sink, two queued, the source waits for room
+        self.assertLessEqual(stats["source"]["items"], 3)
+        self.assertEqual(stats["sink"]["queue_depth"], 2)
+        release.set()
+        stats = pipeline.join()
+        self.assertEqual(stats["sink"]["items"], 20)
+        self.assertGreater(stats["source"]["blocked_seconds"], 0.1)
+
+    def test_failing_stage_stops_source(self):
+        closed = []
+
+        def source():
+            try:
+                for i in range(1000):
+                    yield i
+            finally:
+                closed.append(True)
+
+        def fail(x):
+            if x == 5:
+                raise ValueError("bad item")
+            return x
+
+        received = []
+        pipeline = Pipeline(
+            source(),
+            [Stage("check", fail, queue_size=1), Stage("sink", received.append)],
+        )
+        with self.assertRaises(ValueError):
+            pipeline.run()
+        self.assertEqual(closed, [True])
+        self.assertTrue(all(x < 5 for x in received))
+
+    def test_session(self):
+        def frame(message_id, data=b""):
+            return LddsMessage.create(message_id, data).to_bytes()
+
+        responses = [
+            frame(LddsMessageIds.auth_hello, b"user"),
+            frame(LddsMessageIds.auth_hello, b"user"),
+            frame(LddsMessageIds.search_criteria),
+            frame(LddsMessageIds.dcp_block, MESSAGE * 3),
+            frame(LddsMessageIds.dcp_block, MESSAGE),
+            frame(LddsMessageIds.dcp_block, b"?35,0,Until time reached"),
+            frame(LddsMessageIds.goodbye),
+        ]
+
+        received = []
+        with fake_connect(responses):
+            pipeline = Pipeline.session(
+                "user",
+                "pass",
+                {"DRS_SINCE": "now - 1 hour"},
+                host="localhost",
+                transform=lambda m: m[:8],
+                sink=received.append,
+                explode_workers=2,
+                transform_workers=2,
+            )
+            stats = pipeline.run()
+        self.assertEqual(received, ["A081B07E"] * 4)
+        self.assertEqual(responses, [])
+        self.assertEqual(stats["source"]["items"], 2)
+        self.assertEqual(stats["explode"]["workers"], 2)
+        self.assertEqual(stats["transform"]["items"], 2)
@@ -0,0 +1,89 @@
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from dcpmessage.dcp_message import DcpMessage
+from dcpmessage.reconcile import MessageDigest, gap_criteria, reconcile
+
+NOW = datetime(2024, 7, 22, 12, 0, 0, tzinfo=timezone.utc)
+CRITERIA = {
+    "DRS_SINCE": "2024/204 00:00:00",
+    "DRS_UNTIL": "2024/204 12:00:00",
+    "DCP_ADDRESS": ["A081B07E", "CE4A3B2C"],
+}
+
+
+def message(address: str, hour: int, source: str = "UB") -> str:
+    return f"{address}24204{hour:02d}0000G30-0NN096W{source}00012`BST@KZ@KZh "
+
+
+def hourly(address: str, hours, source: str = "UB") -> list[str]:
+    return [message(address, hour, source) for hour in hours]
+
+
+class TestReconcile(unittest.TestCase):
+    def test_digest_gaps(self):
+        digest = MessageDigest(hourly("A081B07E", [0, 1, 2, 6, 7, 8, 9, 10, 11]))
+        self.assertIn(message("A081B07E", 6), digest)
+        self.assertNotIn(message("A081B07E", 4), digest)
+        since = int(datetime(2024, 7, 22, tzinfo=timezone.utc).timestamp())
+        gaps = digest.gaps(since, since + 12 * 3600, ["CE4A3B2C"], min_gap=600)
+        self.assertEqual(
+            gaps,
+            [
+                ("A081B07E", since + 2 * 3600, since + 6 * 3600),
+                ("CE4A3B2C", since, since + 12 * 3600),
+            ],
+        )
+        criteria = gap_criteria(gaps, max_addresses=1)
+        self.assertEqual(len(criteria), 2)
+        self.assertEqual(len(gap_criteria(gaps)), 1)
+
+    def test_fills_gaps_from_secondary_without_duplicates(self):
+        primary = hourly("A081B07E", [0, 1, 2, 6, 7, 8, 9, 10, 11]) + hourly(
+            "CE4A3B2C", range(12)
+        )
+        # the secondary labels its messages with another data source
+        secondary = hourly("A081B07E", range(12), source="UP")
+        calls = []
+
+        def get(host, search_criteria, **kwargs):
+            calls.append((host, search_criteria))
+            return primary if host == "primary" else secondary
+
+        with mock.patch.object(DcpMessage, "get", side_effect=get):
+            result = reconcile(
+                "user", "pass", CRITERIA, "primary", "secondary", min_gap=600, now=NOW
+            )
+        self.assertEqual(result.filled, 3)
+        self.assertTrue(result.complete)
+        self.assertEqual(result[-3:], hourly("A081B07E", [3, 4, 5], source="UP"))
+        self.assertEqual(len(result), len(primary) + 3)
+
+        host, follow_up = calls[1]
+        self.assertEqual(host, "secondary")
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(follow_up.lrgs_since, "2024/204 02:00:00")
+        self.assertEqual(follow_up.lrgs_until, "2024/204 06:00:00")
+        self.assertEqual([a.address for a in follow_up.dcp_address], ["A081B07E"])
+
+    def test_primary_failure_uses_secondary(self):
+        def get(host, search_criteria, **kwargs):
+            if host == "primary":
+                raise IOError("Cannot connect")
+            return hourly("A081B07E", range(3))
+
+        with mock.patch.object(DcpMessage, "get", side_effect=get):
+            result = reconcile(
+                "user", "pass", CRITERIA, "primary", "secondary", now=NOW
+            )
+        self.assertEqual(len(result), 3)
+        self.assertEqual(result.filled, 3)
+
+    def test_get_with_secondary(self):
+        with mock.patch("dcpmessage.reconcile.reconcile", return_value=[]) as rec:
+            DcpMessage.get("user", "pass", CRITERIA, host="a", secondary="b")
+        self.assertEqual(rec.call_args.kwargs["primary"], "a")
+        self.assertEqual(rec.call_args.kwargs["secondary"], "b")
+        with self.assertRaises(ValueError):
+            DcpMessage.get("user", "pass", CRITERIA, "a", secondary="b", deadline=5)
@@ -0,0 +1,121 @@
+import calendar
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from dcpmessage.schedule import DcpSchedule, ScheduleChecker, ScheduleIndex
+
+# 2024 day 204 = 2024-07-22
+DAY_START = calendar.timegm((2024, 7, 22, 0, 0, 0))
+
+
+def message(address: str, hhmmss: str) -> str:
+    return f"{address}24204{hhmmss}G30-0NN096WUB00012`BST@KZ@KZh "
+
+
+class TestSchedule(unittest.TestCase):
+    def setUp(self):
+        self.hourly = DcpSchedule("A081B07E", first_transmission=750, interval=3600)
+        self.index = ScheduleIndex(
+            [self.hourly, DcpSchedule("CE4A3B2C", 0, 4 * 3600, window=10)]
+        )
+
+    def test_slots(self):
+        self.assertEqual(self.hourly.next_slot(DAY_START), DAY_START + 750)
+        self.assertEqual(self.hourly.next_slot(DAY_START + 750), DAY_START + 4350)
+        # the last window of the day is followed by the first of the next day
+        last = DAY_START + 750 + 23 * 3600
+        self.assertEqual(self.hourly.next_slot(last), DAY_START + 86400 + 750)
+        self.assertEqual(self.hourly.nearest_slot(DAY_START + 4400), DAY_START + 4350)
+        self.assertEqual(self.hourly.nearest_slot(DAY_START + 86390), last)
+
+    def test_load_json_and_csv(self):
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = Path(directory) / "schedules.json"
+            json_path.write_text(
+                json.dumps(
+                    [
+                        {
+                            "address": "a081b07e",
+                            "first_transmission": "00:12:30",
+                            "interval": "01:00:00",
+                        }
+                    ]
+                )
+            )
+            csv_path = Path(directory) / "schedules.csv"
+            csv_path.write_text(
+                "address,first_transmission,interval,window\n"
+                "A081B07E,750,3600,\n"
+                "CE4A3B2C,00:00:00,04:00:00,10\n"
+            )
+            self.assertEqual(ScheduleIndex.load(json_path).get("A081B07E"), self.hourly)
+            index = ScheduleIndex.load(csv_path)
+            self.assertEqual(len(index), 2)
+            self.assertEqual(index.get("CE4A3B2C").window, 10)
+            with self.assertRaises(ValueError):
+                DcpSchedule.from_dict({"address": "A081B07E", "interval": 60})
+
+    def test_invalid_header_counted(self):
+        checker = ScheduleChecker(self.index, grace=600, start=DAY_START)
+        self.assertIsNone(checker.observe(b"A081B07E24\xff04001235G30"))
+        self.assertIsNone(checker.observe(message("A081B07E", "0012XX")))
+        self.assertIsNone(checker.observe(message("A081B07E", "0012")[:15]))
+        self.assertEqual((checker.invalid, checker.received), (3, 0))
+
+    def test_missing_and_late(self):
+        checker = ScheduleChecker(self.index, grace=600, start=DAY_START)
+        self.assertIsNone(checker.observe(message("A081B07E", "001235")))
+        self.assertIsNone(checker.observe(message("FFFFFFFF", "001235")))
+        self.assertEqual(checker.unscheduled, 1)
+
+        # 02:00: A081B07E windows at 00:12:30 (received) and 01:12:30 (missing)
+        # are due, and the CE4A3B2C window at 00:00 is missing
+        events = checker.check(now=DAY_START + 7200)
+        self.assertEqual(
+            [(e.kind, e.address, e.slot) for e in events],
+            [
+                ("missing", "CE4A3B2C", DAY_START),
+                ("missing", "A081B07E", DAY_START + 4350),
+            ],
+        )
+        self.assertEqual(
+            checker.gaps(), {"CE4A3B2C": [DAY_START], "A081B07E": [DAY_START + 4350]}
+        )
+
+        late = checker.observe(message("A081B07E", "011240"))
+        self.assertEqual(late.kind, "late")
+        self.assertEqual(late.transmit_time, DAY_START + 4360)
+        self.assertEqual(checker.gaps(), {"CE4A3B2C": [DAY_START]})
+        self.assertEqual(checker.check(now=DAY_START + 7200), [])
+
+    def test_gap_criteria(self):
+        checker = ScheduleChecker(self.index, grace=600, start=DAY_START)
+        checker.check(now=DAY_START + 7200)
+        criteria = checker.gap_criteria(now=DAY_START + 7200, merge=3600)
+        self.assertEqual(len(criteria), 1)
+        self.assertEqual(criteria[0].lrgs_since, "2024/204 00:00:00")
+        self.assertEqual(criteria[0].lrgs_until, "2024/204 02:00:00")
+        self.assertEqual(
+            sorted(a.address for a in criteria[0].dcp_address),
+            ["A081B07E", "CE4A3B2C"],
+        )
+        self.assertIn("SOURCE: GOES_SELFTIMED", str(criteria[0]))
+        self.assertEqual(checker.gaps(), {})
+
+        checker = ScheduleChecker(self.index, grace=600, start=DAY_START)
+        checker.check(now=DAY_START + 7200)
+        self.assertEqual(len(checker.gap_criteria(now=DAY_START + 7200, merge=60)), 2)
+
+    def test_scales_to_many_platforms(self):
+        index = ScheduleIndex(
+            DcpSchedule(f"{i:08X}", i % 3000, 3600) for i in range(20000)
+        )
+        checker = ScheduleChecker(index, grace=600, start=DAY_START)
+        for i in range(0, 20000, 2):
+            hhmmss = "00%02d%02d" % divmod(i % 3000, 60)
+            checker.observe(message(f"{i:08X}", hhmmss))
+        # every first window is due, no second window is
+        events = checker.check(now=DAY_START + 3000 + 660)
+        self.assertEqual(len(events), 10000)
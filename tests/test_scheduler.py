@@ -0,0 +1,74 @@
+import threading
+import time
+import unittest
+
+from dcpmessage.limiter import AimdLimiter
+from dcpmessage.scheduler import JobPriority, PollJob, PollScheduler
+
+
+class FakeScheduler(PollScheduler):
+    def __init__(self, jobs, **kwargs):
+        self.started = []
+        self.done = threading.Event()
+        super().__init__(
+            "user", "pass", {"default": ["lrgs1", "lrgs2"]}, jobs, **kwargs
+        )
+
+    def fetch(self, job, host):
+        self.started.append((job.name, host))
+        time.sleep(0.02)
+        if len(self.started) == 3:
+            self.done.set()
+        return [job.name]
+
+
+class TestPollScheduler(unittest.TestCase):
+    def test_priority_and_user_limit(self):
+        jobs = [
+            PollJob("backfill", {}, cadence=3600, priority=JobPriority.BACKFILL),
+            PollJob("routine", {}, cadence=3600),
+            PollJob("realtime", {}, cadence=3600, priority=JobPriority.REALTIME),
+        ]
+        scheduler = FakeScheduler(jobs, max_sessions_per_user=1, jitter=0)
+        with scheduler:
+            self.assertTrue(scheduler.done.wait(5))
+        self.assertEqual(
+            [name for name, _ in scheduler.started], ["realtime", "routine", "backfill"]
+        )
+        metrics = scheduler.metrics()
+        self.assertEqual(metrics["runs"], 3)
+        self.assertEqual(metrics["queue_depth"], 0)
+        self.assertGreater(metrics["lag"]["backfill"], metrics["lag"]["realtime"])
+
+    def test_per_host_limit(self):
+        jobs = [PollJob(f"job{i}", {}, cadence=3600) for i in range(3)]
+        results = []
+        scheduler = FakeScheduler(
+            jobs,
+            max_sessions_per_host=1,
+            max_sessions_per_user=4,
+            jitter=0,
+            on_result=lambda job, messages: results.append(messages),
+        )
+        with scheduler:
+            self.assertTrue(scheduler.done.wait(5))
+            time.sleep(0.05)
+        hosts = [host for _, host in scheduler.started]
+        self.assertEqual(sorted(hosts[:2]), ["lrgs1", "lrgs2"])
+        self.assertEqual(len(results), 3)
+
+    def test_waits_for_shared_limiter(self):
+        limiter = AimdLimiter(initial=1, maximum=1)
+        self.assertTrue(limiter.try_acquire())  # held by another caller
+        jobs = [PollJob("realtime", {}, cadence=3600, priority=JobPriority.REALTIME)]
+        scheduler = FakeScheduler(jobs, jitter=0, limiter=limiter)
+        with scheduler:
+            time.sleep(0.2)
+            self.assertEqual(scheduler.metrics()["queue_depth"], 1)
+            self.assertEqual(scheduler.started, [])
+            limiter.release()
+            deadline = time.monotonic() + 5
+            while scheduler.metrics()["runs"] < 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self.assertEqual(scheduler.started, [("realtime", "lrgs1")])
+        self.assertEqual(scheduler.metrics()["queue_depth"], 0)
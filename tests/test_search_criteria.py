@@ -1,6 +1,7 @@
 import json
 import os
 import unittest
+from datetime import datetime, timezone
 
 from dcpmessage.search_criteria import DcpAddress, DcpMessageSource, SearchCriteria
 
@@ -37,3 +38,46 @@ class TestSearchCriteria(unittest.TestCase):
         ):
             self.assertEqual(x, DcpAddress(y))
         os.remove(criteria_file)
+
+    def test_dcp_address_hashable(self):
+        addresses = {DcpAddress("A081B07E"), DcpAddress("A081B07E")}
+        self.assertEqual(addresses, {DcpAddress("A081B07E")})
+
+    def test_eq_ignores_address_order(self):
+        first = SearchCriteria.from_dict({"DCP_ADDRESS": ["A081B07E", "A0806A3E"]})
+        second = SearchCriteria.from_dict({"DCP_ADDRESS": ["A0806A3E", "A081B07E"]})
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+
+    def test_set_operations(self):
+        now = datetime(2024, 7, 22, 12, 0, 0, tzinfo=timezone.utc)
+        first = SearchCriteria.from_dict(
+            {
+                "DRS_SINCE": "now - 2 hour",
+                "DRS_UNTIL": "now - 1 hour",
+                "DCP_ADDRESS": ["A081B07E", "A0806A3E"],
+            }
+        )
+        second = SearchCriteria.from_dict(
+            {
+                "DRS_SINCE": "now - 90 minutes",
+                "DRS_UNTIL": "now",
+                "DCP_ADDRESS": ["A0806A3E", "A0000001"],
+            }
+        )
+
+        union = first.union(second, now)
+        self.assertEqual(union.lrgs_since, "2024/204 10:00:00")
+        self.assertEqual(union.lrgs_until, "2024/204 12:00:00")
+        self.assertEqual(
+            set(union.dcp_address),
+            {DcpAddress("A081B07E"), DcpAddress("A0806A3E"), DcpAddress("A0000001")},
+        )
+        self.assertTrue(union.contains(first, now))
+        self.assertTrue(union.contains(second, now))
+        self.assertFalse(first.contains(second, now))
+
+        intersection = first.intersection(second, now)
+        self.assertEqual(intersection.lrgs_since, "2024/204 10:30:00")
+        self.assertEqual(intersection.lrgs_until, "2024/204 11:00:00")
+        self.assertEqual(intersection.dcp_address, [DcpAddress("A0806A3E")])
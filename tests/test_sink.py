@@ -0,0 +1,78 @@
+import csv
+import gzip
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from dcpmessage.sink import MessageSink
+
+MESSAGES = [
+    "A081B07E24204153353G30-0NN096WUB00012`BST@KZ@KZh ",
+    "A081B07E24204151853G30-0HN096WUB00012`BST@KZ@KYh ",
+    "A081B07E24205000353G29-0HN096WUP00012`BST@KY@KYg ",
+    "CE4A3B2C24204144853G30-0HN096WUP00012`BST@KY@KYg ",
+]
+
+
+class TestMessageSink(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_ndjson_partitioned_by_address_and_day(self):
+        with MessageSink(self.directory) as sink:
+            sink.write_all(MESSAGES)
+
+        files = sorted(self.directory.rglob("*.ndjson.gz"))
+        self.assertEqual(
+            [f.relative_to(self.directory).as_posix() for f in files],
+            [
+                "A081B07E/2024-07-22/part-00000.ndjson.gz",
+                "A081B07E/2024-07-23/part-00000.ndjson.gz",
+                "CE4A3B2C/2024-07-22/part-00000.ndjson.gz",
+            ],
+        )
+        with gzip.open(files[0], "rt") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]["transmit_time"], "2024-07-22T15:33:53Z")
+        self.assertEqual(records[0]["goes_channel"], 96)
+        self.assertEqual(records[0]["data"], "`BST@KZ@KZh ")
+        self.assertEqual(sink.written, 4)
+
+    def test_csv_uncompressed(self):
+        with MessageSink(self.directory, format="csv", compression=None) as sink:
+            sink.write(MESSAGES[0].encode())
+
+        (path,) = self.directory.rglob("*.csv")
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(rows[0]["address"], "A081B07E")
+        self.assertEqual(rows[0]["signal_strength"], "30")
+
+    def test_rotation_by_size(self):
+        with MessageSink(self.directory, compression=None, max_bytes=1) as sink:
+            sink.write_all(MESSAGES[:2])
+        partition = self.directory / "A081B07E" / "2024-07-22"
+        self.assertEqual(len(list(partition.glob("part-*.ndjson"))), 2)
+
+        # a new sink continues the numbering instead of overwriting
+        with MessageSink(self.directory, compression=None) as sink:
+            sink.write(MESSAGES[0])
+        self.assertTrue((partition / "part-00002.ndjson").exists())
+
+    def test_invalid_messages_are_skipped(self):
+        with MessageSink(self.directory) as sink:
+            sink.write("not a DCP message")
+            sink.write(MESSAGES[0])
+        self.assertEqual((sink.written, sink.skipped), (1, 1))
+
+    def test_write_after_close(self):
+        sink = MessageSink(self.directory)
+        sink.close()
+        with self.assertRaises(IOError):
+            sink.write(MESSAGES[0])
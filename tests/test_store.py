@@ -0,0 +1,98 @@
+import unittest
+from datetime import datetime, timezone
+
+from dcpmessage.dcp_message import DcpMessage
+from dcpmessage.store import MessageStore
+
+MESSAGES = [
+    "A081B07E24204153353G30-0NN096WUB00012`BST@KZ@KZh ",
+    "A081B07E24204151853G30-0HN096WUB00012`BST@KZ@KYh ",
+    "A0806A3E24204150353G29-0HN096WUP00012`BST@KY@KYg ",
+]
+NOW = datetime(2024, 7, 22, 16, 0, 0, tzinfo=timezone.utc)
+CRITERIA = {
+    "DRS_SINCE": "now - 1 hour",
+    "DRS_UNTIL": "now",
+    "DCP_ADDRESS": ["A081B07E", "A0806A3E"],
+}
+
+
+class TestMessageStore(unittest.TestCase):
+    def setUp(self):
+        self.store = MessageStore()
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_insert_deduplicates(self):
+        self.assertEqual(self.store.insert(MESSAGES), 3)
+        self.assertEqual(self.store.insert(MESSAGES[:2]), 0)
+        self.assertEqual(len(self.store.query()), 3)
+
+    def test_query_by_address_and_time(self):
+        self.store.insert(MESSAGES)
+        messages = self.store.query(
+            ["A081B07E"],
+            since=datetime(2024, 7, 22, 15, 10, tzinfo=timezone.utc),
+            until=datetime(2024, 7, 22, 15, 40, tzinfo=timezone.utc),
+        )
+        self.assertEqual(messages, [MESSAGES[1], MESSAGES[0]])
+
+    def test_latest(self):
+        self.store.insert(MESSAGES)
+        self.assertEqual(
+            self.store.latest(),
+            {"A081B07E": MESSAGES[0], "A0806A3E": MESSAGES[2]},
+        )
+
+    def test_lookup_requires_coverage(self):
+        self.assertIsNone(self.store.lookup(CRITERIA, NOW))
+        self.store.save(CRITERIA, MESSAGES, NOW)
+        self.assertEqual(len(self.store.lookup(CRITERIA, NOW)), 3)
+        narrower = dict(
+            CRITERIA, DCP_ADDRESS=["A0806A3E"], DRS_SINCE="now - 58 minutes"
+        )
+        self.assertEqual(self.store.lookup(narrower, NOW), [MESSAGES[2]])
+        later = dict(CRITERIA, DRS_UNTIL="now + 1 minute")
+        self.assertIsNone(self.store.lookup(later, NOW))
+
+    def test_get_answers_from_store(self):
+        criteria = {
+            "DRS_SINCE": "2024/204 15:00:00",
+            "DRS_UNTIL": "2024/204 16:00:00",
+            "DCP_ADDRESS": ["A081B07E"],
+        }
+        self.store.save(criteria, MESSAGES, NOW)
+        messages = DcpMessage.get(
+            username="user",
+            password="pass",
+            search_criteria=criteria,
+            host="10.255.255.1",
+            timeout=0.1,
+            store=self.store,
+        )
+        self.assertEqual(messages, [MESSAGES[1], MESSAGES[0]])
+
+    def test_lookup_requires_same_sources(self):
+        selftimed = dict(CRITERIA, SOURCE=["GOES_SELFTIMED"])
+        self.store.save(selftimed, MESSAGES, NOW)
+        self.assertEqual(len(self.store.lookup(selftimed, NOW)), 3)
+        self.assertIsNone(
+            self.store.lookup(dict(CRITERIA, SOURCE=["GOES_RANDOM"]), NOW)
+        )
+        self.assertIsNone(self.store.lookup(CRITERIA, NOW))
+
+        random_messages = [MESSAGES[0]]
+        random = dict(CRITERIA, SOURCE=["GOES_RANDOM"])
+        self.store.save(random, random_messages, NOW)
+        self.assertEqual(self.store.lookup(random, NOW), random_messages)
+        self.assertEqual(len(self.store.query()), 3)
+
+    def test_addresses_are_case_insensitive(self):
+        criteria = dict(CRITERIA, DCP_ADDRESS=["a081b07e"])
+        self.store.save(criteria, MESSAGES[:2], NOW)
+        self.assertEqual(
+            self.store.lookup(dict(CRITERIA, DCP_ADDRESS=["A081B07E"]), NOW),
+            [MESSAGES[1], MESSAGES[0]],
+        )
+        self.assertEqual(len(self.store.lookup(criteria, NOW)), 2)
@@ -1,6 +1,7 @@
 import unittest
+from datetime import datetime, timezone
 
-from dcpmessage.utils import ByteUtil
+from dcpmessage.utils import ByteUtil, TimeUtil
 
 
 class TestUtils(unittest.TestCase):
@@ -13,3 +14,27 @@ class TestUtils(unittest.TestCase):
         b = b"?55,0,Server requires \x00SHA-256."
         s = "Server requires "
         self.assertEqual(ByteUtil.extract_string(b, 6), s)
+
+
+class TestTimeUtil(unittest.TestCase):
+    def test_parse_relative(self):
+        now = datetime(2024, 7, 22, 12, 0, 0, tzinfo=timezone.utc)
+        self.assertEqual(TimeUtil.parse_lrgs_time("now", now), now)
+        self.assertEqual(
+            TimeUtil.parse_lrgs_time("now - 2 hour", now),
+            datetime(2024, 7, 22, 10, 0, 0, tzinfo=timezone.utc),
+        )
+        self.assertEqual(
+            TimeUtil.parse_lrgs_time("now - 1 day 30 minutes", now),
+            datetime(2024, 7, 21, 11, 30, 0, tzinfo=timezone.utc),
+        )
+
+    def test_parse_absolute(self):
+        expected = datetime(2024, 7, 22, 15, 33, 53, tzinfo=timezone.utc)
+        self.assertEqual(TimeUtil.parse_lrgs_time("2024/204 15:33:53"), expected)
+        self.assertEqual(TimeUtil.parse_lrgs_time("2024-07-22 15:33:53"), expected)
+        self.assertEqual(TimeUtil.format_lrgs_time(expected), "2024/204 15:33:53")
+
+    def test_parse_invalid(self):
+        with self.assertRaises(ValueError):
+            TimeUtil.parse_lrgs_time("last")